@@ -0,0 +1,102 @@
+"""
+Offline benchmark suite: decode throughput, `on_tick` latency and end-to-end ticks per
+second, on a recording or on a synthetic game.
+
+    python -m bench.bot_bench
+    python -m bench.bot_bench -f game.rec --repeat 3
+"""
+import argparse
+import time
+
+from bench.decoder_bench import bench, read_positions_and_coins
+from bench.replay import play_as
+from bench.synthetic import game_frames
+from core import logger
+from core.message import MessageType
+from core.telemetry import Histogram
+from network.decoder import JDISDecoder
+from network.lazy_state import LazyGameState
+from network.network import Socket
+from network.recording import read_frames
+from network.replay import Replayer
+from src.bot import MyBot
+
+
+DECODER = JDISDecoder()
+
+
+def bench_decode(messages, repeat: int) -> None:
+    size = sum(len(message) for message in messages)
+    for name, decode in [
+        ("fast", lambda message: DECODER.decode_game_state_fast(message, 1)),
+        ("lazy", lambda message: read_positions_and_coins(LazyGameState(message, 1))),
+    ]:
+        elapsed = bench(name, decode, messages, repeat)
+        print(f"{'':<8} {size * repeat / elapsed / 1e6:>10.1f} MB/s")
+
+
+def bench_on_tick(frames, name: str, repeat: int) -> None:
+    latency = Histogram()
+    for _ in range(repeat):
+        bot = MyBot()
+        bot.name = name
+        for frame in frames:
+            message_type = frame.data[0]
+            if message_type == MessageType.GameStart.value:
+                bot.on_start(DECODER.decode_map_state(frame.data[1:]))
+            elif message_type == MessageType.GameState.value:
+                game_state = LazyGameState(frame.data, 1)
+                start = time.perf_counter()
+                bot.scheduler.begin_tick(game_state.current_tick, start)
+                bot.on_tick(game_state)
+                bot.scheduler.end_tick()
+                latency.record((time.perf_counter() - start) * 1e6)
+
+    summary = latency.summary()
+    print(f"on_tick  p50 {summary['p50']:>8} us  p99 {summary['p99']:>8} us  max {summary['max']:>8} us")
+
+
+def bench_end_to_end(frames, name, repeat: int) -> None:
+    ticks, elapsed = 0, 0.0
+    for _ in range(repeat):
+        socket = Socket("replay", "")
+        play_as(socket, frames, name)
+        result = Replayer(socket, frames).run()
+        ticks += result.ticks
+        elapsed += result.elapsed
+    print(f"replay   {ticks / elapsed:>10.0f} ticks/s {elapsed / ticks * 1e6:>10.1f} us/tick")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the decoder and the bot")
+    parser.add_argument("-f", "--frames", help="A recording to replay, a synthetic game is used otherwise")
+    parser.add_argument("-n", "--count", type=int, default=300, help="Number of synthetic ticks")
+    parser.add_argument("--players", type=int, default=10)
+    parser.add_argument("--projectiles", type=int, default=20, help="Live projectiles per player")
+    parser.add_argument("--name", help="The player the bot plays as")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    # Telemetry summaries and bot errors would only add noise to the measurements.
+    logger.configure("CRITICAL")
+
+    if args.frames:
+        frames = read_frames(args.frames)
+    else:
+        frames = game_frames(args.count, args.players, args.projectiles)
+
+    messages = [frame.data for frame in frames if frame.data[0] == MessageType.GameState.value]
+    print(f"{len(messages)} GameState frames, {sum(map(len, messages)) / max(len(messages), 1):.0f} bytes on average")
+
+    socket = Socket("replay", "")
+    play_as(socket, frames, args.name)
+
+    bench_decode(messages, args.repeat)
+    bench_on_tick(frames, socket.bot.name, args.repeat)
+    bench_end_to_end(frames, args.name, args.repeat)
+
+    logger.shutdown()
+
+
+if __name__ == "__main__":
+    main()
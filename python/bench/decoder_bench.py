@@ -0,0 +1,75 @@
+"""
+Replays recorded GameState frames through both decoder paths.
+
+    python -m bench.decoder_bench -f game.rec
+    python -m bench.decoder_bench --players 10 --projectiles 50
+"""
+import argparse
+import time
+
+from bench.synthetic import game_state_frames
+from core.message import MessageType
+from network.decoder import JDISDecoder
+from network.lazy_state import LazyGameState
+from network.recording import read_frames
+
+
+def bench(name: str, decode, payloads, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            decode(payload)
+    elapsed = time.perf_counter() - start
+
+    count = repeat * len(payloads)
+    print(f"{name:<8} {count / elapsed:>10.0f} frames/s {elapsed / count * 1e6:>10.1f} us/frame")
+    return elapsed
+
+
+def read_positions_and_coins(game_state) -> None:
+    for player in game_state.players:
+        player.name, player.pos
+    game_state.coins
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the GameState decoders")
+    parser.add_argument("-f", "--frames", help="A recording to replay, synthetic frames are used otherwise")
+    parser.add_argument("-n", "--count", type=int, default=200, help="Number of synthetic frames")
+    parser.add_argument("--players", type=int, default=10)
+    parser.add_argument("--projectiles", type=int, default=20, help="Live projectiles per player")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.frames:
+        frames = read_frames(args.frames)
+    else:
+        frames = game_state_frames(args.count, args.players, args.projectiles)
+
+    messages = [frame.data for frame in frames if frame.data[0] == MessageType.GameState.value]
+    if not messages:
+        print("No GameState frames to replay")
+        return
+
+    decoder = JDISDecoder()
+    for message in messages:
+        expected = decoder.decode_game_state(message[1:])
+        if expected != decoder.decode_game_state_fast(message, 1) or expected != LazyGameState(message, 1):
+            raise SystemExit(f"Decoders disagree on tick {expected.current_tick}")
+
+    size = sum(len(message) for message in messages) / len(messages)
+    print(f"{len(messages)} GameState frames, {size:.0f} bytes on average")
+
+    legacy = bench("legacy", lambda message: decoder.decode_game_state(message[1:]), messages, args.repeat)
+    fast = bench("fast", lambda message: decoder.decode_game_state_fast(message, 1), messages, args.repeat)
+    print(f"speedup  {legacy / fast:.2f}x")
+
+    arrays = bench("arrays", lambda message: decoder.decode_game_state_arrays(message, 1), messages, args.repeat)
+    print(f"speedup  {legacy / arrays:.2f}x")
+
+    lazy = bench("lazy", lambda message: read_positions_and_coins(LazyGameState(message, 1)), messages, args.repeat)
+    print(f"speedup  {legacy / lazy:.2f}x (positions and coins only)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Replays a recording (or a synthetic game) through the bot, as fast as possible or
+at the recorded pace.
+
+    python -m bench.replay -f game.rec
+    python -m bench.replay -f game.rec --realtime --speed 2
+"""
+import argparse
+from typing import List, Optional
+
+from bench.synthetic import game_frames
+from core import logger
+from core.message import MessageType
+from network.lazy_state import LazyGameState
+from network.network import Socket
+from network.recording import Frame, read_frames
+from network.replay import Replayer
+
+
+def play_as(socket: Socket, frames: List[Frame], name: Optional[str] = None) -> None:
+    """
+    Makes the bot play as `name`, or as the first player of the recording when its own
+    name is not in it (synthetic games).
+    """
+    if name:
+        socket.bot.name = name
+        return
+
+    for frame in frames:
+        if frame.data[0] == MessageType.GameState.value:
+            names = [player.name for player in LazyGameState(frame.data, 1).players]
+            if names and socket.bot.name not in names:
+                socket.bot.name = names[0]
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays a recording through the bot")
+    parser.add_argument("-f", "--frames", help="A recording made with `run_bot.py --record`, a synthetic game otherwise")
+    parser.add_argument("-n", "--count", type=int, default=900, help="Number of synthetic ticks")
+    parser.add_argument("--name", help="The player the bot plays as")
+    parser.add_argument("--realtime", action="store_true", help="If set, frames are paced on their timestamps")
+    parser.add_argument("--speed", type=float, default=1.0, help="How many times faster than real time")
+    parser.add_argument("--telemetry", metavar="PATH", help="Appends the per-tick telemetry to PATH")
+    parser.add_argument("-l", "--log-level", default="INFO")
+    args = parser.parse_args()
+
+    logger.configure(args.log_level)
+
+    if args.frames:
+        frames = read_frames(args.frames)
+    else:
+        frames = game_frames(args.count)
+
+    socket = Socket("replay", "")
+    socket.telemetry_path = args.telemetry
+    play_as(socket, frames, args.name)
+
+    result = Replayer(socket, frames).run(args.realtime, args.speed)
+    logger.shutdown()
+    print(f"{result.frames} frames, {result.ticks} ticks, {result.messages} messages in {result.elapsed:.2f}s "
+          f"({result.ticks_per_second:.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
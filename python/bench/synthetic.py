@@ -0,0 +1,81 @@
+import math
+import random
+import uuid
+from typing import List
+
+from core.consts import Consts
+from core.game_state import PlayerInfo, PlayerWeapon, Projectile, Blade, GameState, Coin
+from core.map_state import Point
+from core.message import MessageType
+from network.encoder import JDISEncoder
+from network.recording import Frame
+from server.maps import random_map
+
+
+MAP_SIZE = Consts.Map.WIDTH * Consts.Map.CELL_WIDTH
+
+
+def random_point(rng: random.Random) -> Point:
+    return Point(rng.uniform(0, MAP_SIZE), rng.uniform(0, MAP_SIZE))
+
+
+def random_uid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128)))
+
+
+def random_game_state(rng: random.Random, tick: int, players: int, projectiles: int, coins: int) -> GameState:
+    """
+    Builds a plausible `GameState` with `projectiles` live shots per player.
+    """
+    g = GameState(current_tick=tick, current_round=1)
+
+    for i in range(players):
+        pos = random_point(rng)
+        rotation = rng.uniform(0, 2 * math.pi)
+        g.players.append(PlayerInfo(
+            name=f'bot-{i}',
+            color=rng.getrandbits(24),
+            health=rng.randint(1, Consts.Player.MAX_HEALTH),
+            score=rng.randint(0, 5000),
+            pos=pos,
+            dest=random_point(rng),
+            playerWeapon=PlayerWeapon.PlayerWeaponCanon,
+            projectiles=[
+                Projectile(random_uid(rng), random_point(rng), random_point(rng)) for _ in range(projectiles)
+            ],
+            blade=Blade(
+                pos,
+                Point(pos.x + Consts.Blade.LENGTH * math.cos(rotation), pos.y + Consts.Blade.LENGTH * math.sin(rotation)),
+                rotation,
+            ),
+        ))
+
+    g.coins = [Coin(random_uid(rng), Consts.Coin.VALUE, random_point(rng)) for _ in range(coins)]
+    return g
+
+
+def game_state_frames(count: int, players: int = 10, projectiles: int = 20, coins: int = Consts.Coin.QUANTITY,
+                      seed: int = 0) -> List[Frame]:
+    """
+    Encodes `count` consecutive synthetic GameState ticks, spaced 300 ms apart.
+    """
+    rng = random.Random(seed)
+    encoder = JDISEncoder()
+    return [
+        Frame(tick * 0.3, encoder.encode_game_state(random_game_state(rng, tick, players, projectiles, coins)))
+        for tick in range(count)
+    ]
+
+
+def game_frames(count: int, players: int = 10, projectiles: int = 20, coins: int = Consts.Coin.QUANTITY,
+                seed: int = 0) -> List[Frame]:
+    """
+    A whole synthetic game: the GameStart map, `count` GameState ticks and the GameEnd.
+    """
+    map_state, _ = random_map(random.Random(seed))
+    frames = game_state_frames(count, players, projectiles, coins, seed)
+    return (
+        [Frame(0.0, JDISEncoder().encode_map_state(map_state))]
+        + frames
+        + [Frame(count * 0.3, bytes([MessageType.GameEnd.value]))]
+    )
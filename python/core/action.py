@@ -1,6 +1,8 @@
-from dataclasses import dataclass
-from typing import Tuple, Union
+import bisect
+from dataclasses import dataclass, field
+from typing import List, Tuple, Union
 
+from core.consts import Consts
 from core.game_state import PlayerWeapon
 
 import base64
@@ -119,3 +121,70 @@ class RotateBladeAction:
 Action = Union[
     MoveAction, ShootAction, SwitchWeaponAction, SaveAction, RotateBladeAction
 ]
+
+
+# (fr) Le serveur applique les actions reçues à chacune de ses 10 boucles par tick.
+# (en) The server applies the received actions at each of its 10 loops per tick.
+ACTION_LOOPS = 10
+LOOP_DURATION = Consts.Game.TICK_DURATION / ACTION_LOOPS
+
+
+@dataclass
+class ActionPlan:
+    """
+    (fr) Un échéancier d'actions pour un tick, que `on_tick` peut retourner au lieu d'une liste. Chaque
+         étape est envoyée `offset` secondes après la réception du GameState et s'applique donc à partir
+         de la boucle d'actions correspondante du serveur (voir `loop`). Les actions d'une étape sont
+         fusionnées comme une liste ordinaire. Une étape plus tardive remplace celles de même type.
+         Un nouveau GameState annule les étapes pas encore envoyées.
+    (en) A timeline of actions for one tick, that `on_tick` can return instead of a list. Every step is
+         sent `offset` seconds after the GameState was received, so it applies from the matching action
+         loop of the server onward (see `loop`). The actions of a step are merged like a plain list. A
+         later step overrides the actions of the same kind. A new GameState cancels the steps that were
+         not sent yet.
+
+    Attributes:
+        steps (List[Tuple[float, List[Action]]]) : (fr) Les étapes (décalage en secondes, actions), par décalage.
+                                                   (en) The (offset in seconds, actions) steps, by offset.
+    """
+
+    steps: List[Tuple[float, List[Action]]] = field(default_factory=list)
+
+    @classmethod
+    def of(cls, actions: Union['ActionPlan', List[Action], None]) -> 'ActionPlan':
+        """
+        (fr) Le plan tel quel, ou une liste d'actions comme une seule étape immédiate.
+        (en) The plan as is, or a list of actions as a single immediate step.
+        """
+        if isinstance(actions, cls):
+            return actions
+        return cls([(0.0, list(actions))] if actions else [])
+
+    def at(self, offset: float, *actions: Action) -> 'ActionPlan':
+        offsets = [step[0] for step in self.steps]
+        index = bisect.bisect_left(offsets, offset)
+        if index < len(self.steps) and self.steps[index][0] == offset:
+            self.steps[index][1].extend(actions)
+        else:
+            self.steps.insert(index, (offset, list(actions)))
+        return self
+
+    def loop(self, index: int, *actions: Action) -> 'ActionPlan':
+        return self.at(index * LOOP_DURATION, *actions)
+
+    def first(self) -> List[Action]:
+        """
+        (fr) Les actions à envoyer tout de suite.
+        (en) The actions to send right away.
+        """
+        return [action for offset, actions in self.steps if offset <= 0 for action in actions]
+
+    def later(self) -> List[Tuple[float, List[Action]]]:
+        """
+        (fr) Les étapes à envoyer plus tard dans le tick.
+        (en) The steps to send later in the tick.
+        """
+        return [(offset, actions) for offset, actions in self.steps if offset > 0 and actions]
+
+    def __len__(self) -> int:
+        return sum(len(actions) for _, actions in self.steps)
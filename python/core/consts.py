@@ -2,6 +2,10 @@ class Consts:
     class Game:
 	    TICKS_PER_GAME = 5 * 60 * 3
 	    TICKS_SECONS_STAGE_START = 4 * 60 * 3
+	    GAME_DURATION = 5 * 60
+	    # (fr) Un tick dure 300 ms, avec 10 boucles d'actions (README). GAME_DURATION / TICKS_PER_GAME donnerait 333 ms.
+	    # (en) A tick lasts 300 ms, with 10 action loops (README). GAME_DURATION / TICKS_PER_GAME would give 333 ms.
+	    TICK_DURATION = 0.3
 
     class Map:
         """
@@ -0,0 +1,98 @@
+import uuid
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from core.game_state import GameState
+
+
+def _empty_points() -> np.ndarray:
+    return np.empty((0, 2), dtype=np.float64)
+
+
+@dataclass
+class GameStateArrays:
+    """
+    (fr) Représentation en colonnes (struct-of-arrays) d'un `GameState`. Chaque joueur, pièce et
+         projectile correspond à une ligne des tableaux NumPy, que les planificateurs (tournée, visée,
+         évitement) traitent en opérations vectorisées.
+    (en) Struct-of-arrays form of a `GameState`. Every player, coin and projectile is a row of the
+         NumPy arrays, that the planners (tour, aiming, dodging) process as vectorized operations.
+
+    Attributes:
+        player_names         (List[str])  : (fr) Le nom des joueurs, dans l'ordre des lignes.
+                                             (en) The player names, in row order.
+        player_pos           (np.ndarray) : (P, 2) float64
+        player_dest          (np.ndarray) : (P, 2) float64, (0, 0) when the player has no destination.
+        player_health        (np.ndarray) : (P,) int32
+        player_score         (np.ndarray) : (P,) int64
+        player_weapon        (np.ndarray) : (P,) uint8, see `PlayerWeapon`.
+        coin_pos             (np.ndarray) : (C, 2) float64
+        coin_value           (np.ndarray) : (C,) int32
+        coin_uid_bytes       (np.ndarray) : (C,) raw 16 bytes UUIDs, see `coin_uid`.
+        projectile_pos       (np.ndarray) : (K, 2) float64
+        projectile_dest      (np.ndarray) : (K, 2) float64
+        projectile_owner     (np.ndarray) : (K,) int32, row of the player who fired the projectile.
+        projectile_uid_bytes (np.ndarray) : (K,) raw 16 bytes UUIDs, stable while the projectile flies.
+    """
+    current_tick: int                = 0
+    current_round: int               = 0
+    player_names: List[str]          = field(default_factory=list)
+    player_pos: np.ndarray           = field(default_factory=_empty_points)
+    player_dest: np.ndarray          = field(default_factory=_empty_points)
+    player_health: np.ndarray        = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    player_score: np.ndarray         = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    player_weapon: np.ndarray        = field(default_factory=lambda: np.empty(0, dtype=np.uint8))
+    coin_pos: np.ndarray             = field(default_factory=_empty_points)
+    coin_value: np.ndarray           = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    coin_uid_bytes: np.ndarray       = field(default_factory=lambda: np.empty(0, dtype='V16'))
+    projectile_pos: np.ndarray       = field(default_factory=_empty_points)
+    projectile_dest: np.ndarray      = field(default_factory=_empty_points)
+    projectile_owner: np.ndarray     = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    projectile_uid_bytes: np.ndarray = field(default_factory=lambda: np.empty(0, dtype='V16'))
+
+    @classmethod
+    def from_game_state(cls, game_state: GameState) -> 'GameStateArrays':
+        """
+        (fr) Construit les tableaux à partir d'un `GameState` déjà décodé.
+        (en) Builds the arrays from an already decoded `GameState`.
+        """
+        players = game_state.players
+        projectiles = [(i, projectile) for i, player in enumerate(players) for projectile in player.projectiles]
+
+        return cls(
+            current_tick=game_state.current_tick,
+            current_round=game_state.current_round,
+            player_names=[player.name for player in players],
+            player_pos=np.array([(p.pos.x, p.pos.y) for p in players], dtype=np.float64).reshape(-1, 2),
+            player_dest=np.array([(p.dest.x, p.dest.y) for p in players], dtype=np.float64).reshape(-1, 2),
+            player_health=np.array([p.health for p in players], dtype=np.int32),
+            player_score=np.array([p.score for p in players], dtype=np.int64),
+            player_weapon=np.array([p.playerWeapon for p in players], dtype=np.uint8),
+            coin_pos=np.array([(c.pos.x, c.pos.y) for c in game_state.coins], dtype=np.float64).reshape(-1, 2),
+            coin_value=np.array([c.value for c in game_state.coins], dtype=np.int32),
+            coin_uid_bytes=np.array([uuid.UUID(c.uid).bytes for c in game_state.coins], dtype='V16'),
+            projectile_pos=np.array([(p.pos.x, p.pos.y) for _, p in projectiles], dtype=np.float64).reshape(-1, 2),
+            projectile_dest=np.array([(p.dest.x, p.dest.y) for _, p in projectiles], dtype=np.float64).reshape(-1, 2),
+            projectile_owner=np.array([i for i, _ in projectiles], dtype=np.int32),
+            projectile_uid_bytes=np.array([uuid.UUID(p.uid).bytes for _, p in projectiles], dtype='V16'),
+        )
+
+    @classmethod
+    def of(cls, game_state: GameState) -> 'GameStateArrays':
+        """
+        (fr) Les tableaux du `GameState`: ceux déjà décodés par une vue paresseuse, sinon on les construit.
+        (en) The arrays of the `GameState`: the ones already decoded by a lazy view, built otherwise.
+        """
+        arrays = getattr(game_state, 'arrays', None)
+        return arrays if isinstance(arrays, cls) else cls.from_game_state(game_state)
+
+    def player_index(self, name: str) -> Optional[int]:
+        try:
+            return self.player_names.index(name)
+        except ValueError:
+            return None
+
+    def coin_uid(self, index: int) -> str:
+        return str(uuid.UUID(bytes=bytes(self.coin_uid_bytes[index])))
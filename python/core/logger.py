@@ -0,0 +1,159 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, Optional, TextIO
+
+
+ROOT = "jdis"
+
+# Attributes every LogRecord has, the other ones come from `extra=`.
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+def get_logger(category: str) -> logging.Logger:
+    """
+    (fr) Le logger d'une catégorie, par exemple "bot.tick" ou "network.send". Sur le chemin critique,
+         passez les valeurs en arguments (`log.debug("tick %d", tick)`) et protégez les messages
+         coûteux à construire par `log.isEnabledFor(...)`: un message filtré ne coûte alors qu'un test.
+    (en) The logger of a category, e.g. "bot.tick" or "network.send". On the hot path, pass values as
+         arguments (`log.debug("tick %d", tick)`) and guard messages that are costly to build with
+         `log.isEnabledFor(...)`: a filtered message then only costs a check.
+    """
+    return logging.getLogger(f"{ROOT}.{category}")
+
+
+class SamplingFilter(logging.Filter):
+    """
+    (fr) Ne garde qu'un message sur N par catégorie. Une catégorie hérite du taux de son parent
+         ("bot" s'applique à "bot.tick"). Les avertissements et les erreurs ne sont jamais échantillonnés.
+    (en) Only keeps one record out of N per category. A category inherits the rate of its parent
+         ("bot" applies to "bot.tick"). Warnings and errors are never sampled.
+    """
+
+    def __init__(self, rates: Dict[str, int]):
+        super().__init__()
+        self.rates = {f"{ROOT}.{category}": rate for category, rate in rates.items()}
+        self._resolved: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+
+    def rate(self, name: str) -> int:
+        rate = self._resolved.get(name)
+        if rate is None:
+            category = name
+            while category not in self.rates and "." in category:
+                category = category.rsplit(".", 1)[0]
+            rate = self._resolved[name] = max(1, self.rates.get(category, 1))
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        rate = self.rate(record.name)
+        if rate == 1:
+            return True
+
+        count = self._counts.get(record.name, 0)
+        self._counts[record.name] = count + 1
+        return count % rate == 0
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    (fr) Met les messages dans une file bornée lue par un fil d'exécution en arrière-plan. Quand la
+         file est pleine (la sortie ne suit plus), le message est compté et abandonné plutôt que de
+         bloquer le bot.
+    (en) Puts the records in a bounded queue read by a background thread. When the queue is full (the
+         output cannot keep up), the record is counted and dropped instead of blocking the bot.
+    """
+
+    def __init__(self, record_queue: queue.Queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    (fr) Une ligne JSON par message, avec les champs passés par `extra=`.
+    (en) One JSON line per record, with the fields passed through `extra=`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "category": record.name[len(ROOT) + 1:],
+            "message": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def parse_sample(values: Iterable[str]) -> Dict[str, int]:
+    """
+    (fr) Lit des taux d'échantillonnage écrits "catégorie=N", par exemple "bot.tick=10".
+    (en) Reads sampling rates written "category=N", e.g. "bot.tick=10".
+    """
+    rates = {}
+    for value in values:
+        category, _, rate = value.partition("=")
+        rates[category] = int(rate)
+    return rates
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure(level: str = "INFO", sample: Optional[Dict[str, int]] = None, structured: bool = False,
+              stream: TextIO = sys.stdout, capacity: int = 10000) -> DroppingQueueHandler:
+    """
+    (fr) Configure les loggers "jdis.*": le niveau, l'échantillonnage par catégorie et l'écriture
+         dans `stream` depuis un fil d'exécution en arrière-plan. Peut être rappelée pour changer la
+         configuration.
+    (en) Configures the "jdis.*" loggers: the level, the per-category sampling and the writing to
+         `stream` from a background thread. Can be called again to change the configuration.
+    """
+    global _listener
+    shutdown()
+
+    output = logging.StreamHandler(stream)
+    output.setFormatter(StructuredFormatter() if structured
+                        else logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    handler = DroppingQueueHandler(queue.Queue(capacity))
+    if sample:
+        handler.addFilter(SamplingFilter(sample))
+
+    root = logging.getLogger(ROOT)
+    root.handlers = [handler]
+    root.setLevel(level.upper())
+    root.propagate = False
+
+    _listener = QueueListener(handler.queue, output)
+    _listener.start()
+    return handler
+
+
+def shutdown() -> None:
+    """
+    (fr) Écrit les messages encore dans la file et arrête le fil d'exécution d'écriture.
+    (en) Writes the records still in the queue and stops the writing thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown)
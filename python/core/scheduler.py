@@ -0,0 +1,138 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Deque, Dict, Iterator, List, Optional
+
+from core.consts import Consts
+
+
+class Stage(IntEnum):
+    Decode          = 0
+    Perception      = 1
+    Planning        = 2
+    Serialization   = 3
+
+    def __str__(self) -> str:
+        return self.name
+
+
+DEFAULT_SHARES = {
+    Stage.Decode:        0.10,
+    Stage.Perception:    0.20,
+    Stage.Planning:      0.60,
+    Stage.Serialization: 0.10,
+}
+
+
+@dataclass
+class TickRecord:
+    """
+    (fr) Ce qui s'est passé pendant un tick: le temps de chaque étape et les échéances manquées.
+    (en) What happened during a tick: the time of every stage and the missed deadlines.
+    """
+    tick: int                           = 0
+    duration: float                     = 0.0
+    stage_times: Dict[Stage, float]     = field(default_factory=dict)
+    missed: List[Stage]                 = field(default_factory=list)
+
+    @property
+    def missed_deadline(self) -> bool:
+        return bool(self.missed)
+
+
+class TickBudget:
+    """
+    (fr) Le budget de temps d'un tick. Chaque étape reçoit une échéance (une part du budget, sans
+         dépasser l'échéance du tick). Les étapes « anytime » consultent `expired()` ou `stage_deadline`
+         et retournent leur meilleure réponse lorsque le temps est écoulé.
+    (en) The time budget of a tick. Every stage gets a deadline (a share of the budget, never past the
+         tick deadline). Anytime stages check `expired()` or `stage_deadline` and return their best
+         answer so far when time runs out.
+    """
+
+    def __init__(self, tick: int, start: float, budget: float, shares: Dict[Stage, float]):
+        self.start = start
+        self.budget = budget
+        self.deadline = start + budget
+        self.stage_deadline = self.deadline
+        self.shares = shares
+        self.record = TickRecord(tick=tick)
+
+    @property
+    def tick(self) -> int:
+        return self.record.tick
+
+    @tick.setter
+    def tick(self, tick: int) -> None:
+        self.record.tick = tick
+
+    def remaining(self) -> float:
+        return self.stage_deadline - time.perf_counter()
+
+    def expired(self) -> bool:
+        return time.perf_counter() >= self.stage_deadline
+
+    @contextmanager
+    def stage(self, stage: Stage) -> Iterator['TickBudget']:
+        start = time.perf_counter()
+        self.stage_deadline = min(start + self.shares[stage] * self.budget, self.deadline)
+        try:
+            yield self
+        finally:
+            end = time.perf_counter()
+            self.record.stage_times[stage] = self.record.stage_times.get(stage, 0.0) + end - start
+            if end > self.stage_deadline:
+                self.record.missed.append(stage)
+            self.stage_deadline = self.deadline
+
+
+class TickScheduler:
+    """
+    (fr) Donne à chaque tick un budget dérivé de la cadence du serveur (`Consts.Game.TICK_DURATION`),
+         moins une marge pour le réseau, et garde l'historique des ticks.
+    (en) Gives every tick a budget derived from the server tick rate (`Consts.Game.TICK_DURATION`),
+         minus a margin for the network, and keeps the history of the ticks.
+
+    Attributes:
+        budget       (float) : (fr) Le temps alloué à un tick, en secondes.
+                               (en) The time allotted to a tick, in seconds.
+        missed_ticks (int)   : (fr) Le nombre de ticks qui ont manqué une échéance.
+                               (en) The number of ticks that missed a deadline.
+    """
+
+    def __init__(self, tick_duration: float = Consts.Game.TICK_DURATION, margin: float = 0.25,
+                 shares: Optional[Dict[Stage, float]] = None, history: int = Consts.Game.TICKS_PER_GAME):
+        self.budget = tick_duration * (1.0 - margin)
+        self.shares = dict(DEFAULT_SHARES if shares is None else shares)
+        self.current: Optional[TickBudget] = None
+        self.history: Deque[TickRecord] = deque(maxlen=history)
+        self.missed_ticks = 0
+
+    def begin_tick(self, tick: int = -1, start: Optional[float] = None) -> TickBudget:
+        """
+        (fr) Commence un tick, `start` étant le moment de réception du message.
+        (en) Starts a tick, `start` being the time the message was received.
+        """
+        if self.current is not None:
+            self.end_tick()
+
+        self.current = TickBudget(tick, time.perf_counter() if start is None else start, self.budget, self.shares)
+        return self.current
+
+    def end_tick(self) -> Optional[TickRecord]:
+        if self.current is None:
+            return None
+
+        record = self.current.record
+        record.duration = time.perf_counter() - self.current.start
+        if record.duration > self.current.budget and not record.missed:
+            record.missed.append(max(record.stage_times, key=record.stage_times.get, default=Stage.Planning))
+
+        if record.missed:
+            self.missed_ticks += 1
+
+        self.history.append(record)
+        self.current = None
+        return record
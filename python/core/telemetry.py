@@ -0,0 +1,156 @@
+import csv
+import json
+import os
+from collections import deque
+from typing import Deque, Dict, List
+
+from core.consts import Consts
+from core.logger import get_logger
+from core.scheduler import Stage, TickRecord
+
+
+log = get_logger("telemetry")
+
+
+class Histogram:
+    """
+    (fr) Histogramme à la HDR: les valeurs entières sont rangées dans des seaux log-linéaires, avec
+         `2 ** precision` seaux par puissance de deux. L'erreur relative reste sous 2 ** (1 - precision)
+         (moins de 2% par défaut), l'ajout est en O(1) et la mémoire ne dépend pas du nombre de valeurs.
+    (en) HDR-style histogram: integer values are counted in log-linear buckets, with `2 ** precision`
+         buckets per power of two. The relative error stays under 2 ** (1 - precision) (less than 2% by
+         default), recording is O(1) and the memory does not depend on the number of values.
+    """
+
+    def __init__(self, precision: int = 7, max_bits: int = 40):
+        self.precision = precision
+        self._sub = 1 << precision
+        self._half = 1 << (precision - 1)
+        self.counts = [0] * ((max_bits - precision + 2) * self._half + self._sub)
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self._sub:
+            return value
+        shift = value.bit_length() - self.precision
+        return shift * self._half + (value >> shift)
+
+    def _highest(self, index: int) -> int:
+        if index < self._sub:
+            return index
+        shift = index // self._half - 1
+        return ((index - shift * self._half + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        value = max(0, int(value))
+        self.counts[min(self._index(value), len(self.counts) - 1)] += 1
+        self.total += 1
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> int:
+        """
+        (fr) La plus petite valeur telle qu'au moins q% des valeurs lui sont inférieures ou égales.
+        (en) The smallest value such that at least q% of the values are lower or equal to it.
+        """
+        if self.total == 0:
+            return 0
+
+        rank = max(1, -(-self.total * q // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._highest(index), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, int]:
+        return {"count": self.total, "p50": self.percentile(50), "p99": self.percentile(99), "max": self.max}
+
+
+class Telemetry:
+    """
+    (fr) Mesures du chemin critique: un histogramme de latence (en microsecondes) par étape et pour le
+         tick entier, la taille des trames décodées, le nombre d'actions envoyées et des compteurs
+         (ticks perdus, réponses périmées). Les dernières lignes par tick sont gardées pour l'export.
+    (en) Hot-path measurements: a latency histogram (in microseconds) per stage and for the whole tick,
+         the size of the decoded frames, the number of actions sent and counters (dropped ticks, stale
+         responses). The last per-tick rows are kept for the export.
+    """
+
+    FIELDS = ["tick", "tick_us"] + [f"{stage.name.lower()}_us" for stage in Stage] + ["frame_bytes", "actions", "missed"]
+
+    def __init__(self, rows: int = Consts.Game.TICKS_PER_GAME):
+        self.rows: Deque[Dict[str, int]] = deque(maxlen=rows)
+        self.reset()
+
+    def reset(self) -> None:
+        self.latency: Dict[str, Histogram] = {"tick": Histogram()}
+        self.latency.update((stage.name.lower(), Histogram()) for stage in Stage)
+        self.frame_bytes = Histogram()
+        self.actions = Histogram()
+        self.counters: Dict[str, int] = {"dropped_frames": 0, "stale_responses": 0, "missed_ticks": 0}
+        self.last_tick = -1
+        self.rows.clear()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_tick(self, record: TickRecord, frame_bytes: int, actions: int) -> None:
+        """
+        (fr) Enregistre un tick traité. Un saut dans les numéros de tick compte les trames jamais
+             traitées (abandonnées par le travailleur ou jamais reçues).
+        (en) Records a handled tick. A gap in the tick numbers counts the frames that were never handled
+             (dropped by the worker or never received).
+        """
+        if self.last_tick >= 0 and record.tick > self.last_tick + 1:
+            self.counters["dropped_frames"] += record.tick - self.last_tick - 1
+        self.last_tick = max(self.last_tick, record.tick)
+
+        row = {"tick": record.tick, "tick_us": int(record.duration * 1e6)}
+        self.latency["tick"].record(row["tick_us"])
+        for stage, seconds in record.stage_times.items():
+            name = f"{stage.name.lower()}_us"
+            row[name] = int(seconds * 1e6)
+            self.latency[stage.name.lower()].record(row[name])
+
+        self.frame_bytes.record(frame_bytes)
+        self.actions.record(actions)
+        if record.missed:
+            self.counters["missed_ticks"] += 1
+
+        row["frame_bytes"] = frame_bytes
+        row["actions"] = actions
+        row["missed"] = len(record.missed)
+        self.rows.append(row)
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        summary = {f"{name}_us": histogram.summary() for name, histogram in self.latency.items() if histogram.total}
+        summary["frame_bytes"] = self.frame_bytes.summary()
+        summary["actions"] = self.actions.summary()
+        summary["counters"] = dict(self.counters)
+        return summary
+
+    def report(self) -> None:
+        for name, values in self.summary().items():
+            log.info("%s: %s", name, " ".join(f"{key}={value}" for key, value in values.items()),
+                     extra={"summary": name, **values})
+
+    def export(self, path: str) -> None:
+        """
+        (fr) Ajoute les lignes par tick à `path`, en CSV si le nom finit par ".csv", en JSON lines sinon.
+        (en) Appends the per-tick rows to `path`, as CSV when the name ends with ".csv", as JSON lines
+             otherwise.
+        """
+        rows: List[Dict[str, int]] = list(self.rows)
+        if path.endswith(".csv"):
+            header = not os.path.exists(path) or os.path.getsize(path) == 0
+            with open(path, "a", newline="") as file:
+                writer = csv.DictWriter(file, fieldnames=self.FIELDS)
+                if header:
+                    writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, "a") as file:
+                file.writelines(json.dumps(row) + "\n" for row in rows)
@@ -0,0 +1,105 @@
+import base64
+import math
+from typing import Iterable, List, Optional
+
+from core.action import Action, MoveAction, RotateBladeAction, SaveAction, ShootAction, SwitchWeaponAction
+from core.logger import get_logger
+
+
+log = get_logger("network")
+
+ACTIONS_MESSAGE = 3
+
+# One slot per message key, in the order they are written.
+DEST, SHOOT, SWITCH, ROTATE_BLADE, SAVE = range(5)
+
+SLOTS = {
+    MoveAction: DEST,
+    ShootAction: SHOOT,
+    SwitchWeaponAction: SWITCH,
+    RotateBladeAction: ROTATE_BLADE,
+    SaveAction: SAVE,
+}
+
+OPEN = bytes([ACTIONS_MESSAGE]) + b'{'
+DEST_TEMPLATE = b'"dest":{"x":%a,"y":%a}'
+SHOOT_TEMPLATE = b'"shoot":{"x":%a,"y":%a}'
+SWITCH_TEMPLATE = b'"switch":%d'
+ROTATE_BLADE_TEMPLATE = b'"rotate_blade":%a'
+SAVE_TEMPLATE = b'"save":"%s"'
+
+
+def is_finite(action: Action) -> bool:
+    if isinstance(action, MoveAction):
+        return math.isfinite(action.dest_pos[0]) and math.isfinite(action.dest_pos[1])
+    if isinstance(action, ShootAction):
+        return math.isfinite(action.target_pos[0]) and math.isfinite(action.target_pos[1])
+    if isinstance(action, RotateBladeAction):
+        return math.isfinite(action.rad)
+    return True
+
+
+class ActionEncoder:
+    """
+    Writes the actions message straight from fixed templates into a reused buffer,
+    without going through a dict and `json.dumps`. The output is the same JSON as
+    merging every `Action.serialize()` into one object, prefixed by the message type.
+
+    Duplicate actions are merged as `dict.update` does: for a given kind of action, the
+    last one of the list wins. Integer coordinates are written as floats (`10` as `10.0`),
+    which is the same JSON number.
+
+    An action with a NaN or infinite coordinate or angle is dropped with a warning: the
+    templates would write it as `nan`/`inf`, which is not JSON, and the server would
+    reject the whole message.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._slots: List[Optional[Action]] = [None] * len(SLOTS)
+
+    def merge(self, actions: Iterable[Action]) -> List[Optional[Action]]:
+        slots = self._slots
+        for i in range(len(slots)):
+            slots[i] = None
+
+        for action in actions:
+            index = SLOTS.get(type(action))
+            if index is None:
+                log.warning("Unknown action: %r", action)
+                continue
+            if not is_finite(action):
+                log.warning("Dropping an action with a non-finite value: %r", action)
+                continue
+            slots[index] = action
+
+        return slots
+
+    def encode(self, actions: Iterable[Action]) -> bytes:
+        dest, shoot, switch, rotate_blade, save = self.merge(actions)
+
+        buffer = self._buffer
+        del buffer[:]
+        buffer += OPEN
+
+        if dest is not None:
+            buffer += DEST_TEMPLATE % (float(dest.dest_pos[0]), float(dest.dest_pos[1]))
+        if shoot is not None:
+            if len(buffer) > len(OPEN):
+                buffer += b','
+            buffer += SHOOT_TEMPLATE % (float(shoot.target_pos[0]), float(shoot.target_pos[1]))
+        if switch is not None:
+            if len(buffer) > len(OPEN):
+                buffer += b','
+            buffer += SWITCH_TEMPLATE % switch.weapon.value
+        if rotate_blade is not None:
+            if len(buffer) > len(OPEN):
+                buffer += b','
+            buffer += ROTATE_BLADE_TEMPLATE % float(rotate_blade.rad)
+        if save is not None:
+            if len(buffer) > len(OPEN):
+                buffer += b','
+            buffer += SAVE_TEMPLATE % base64.b64encode(save.save)
+
+        buffer += b'}'
+        return bytes(buffer)
@@ -0,0 +1,219 @@
+import asyncio
+import ssl
+import time
+from collections import deque
+from typing import Deque, List, Optional, Sequence, Tuple
+
+import websockets
+from websockets.asyncio.client import connect
+
+from core.action import Action, ActionPlan
+from core.logger import get_logger
+from core.scheduler import Stage
+from network.decoder import JDISDecoder
+from network.network import Socket
+from network.worker import PendingFrame, frame_tick
+
+
+log = get_logger("network")
+
+
+class AsyncFrameSlot:
+    """
+    asyncio counterpart of `LatestFrameSlot`: only the newest GameState is kept, GameStart
+    and GameEnd frames are handed out in order and drop the pending GameState.
+    """
+
+    def __init__(self):
+        self._control: Deque[PendingFrame] = deque()
+        self._latest: Optional[PendingFrame] = None
+        self._ready = asyncio.Event()
+        self.dropped = 0
+
+    def put(self, message: bytes, received: float) -> None:
+        frame = PendingFrame(message, received, frame_tick(message))
+        if self._latest is not None:
+            self.dropped += 1
+            self._latest = None
+
+        if frame.tick >= 0:
+            self._latest = frame
+        else:
+            self._control.append(frame)
+        self._ready.set()
+
+    async def take(self) -> PendingFrame:
+        while not self._control and self._latest is None:
+            self._ready.clear()
+            await self._ready.wait()
+
+        if self._control:
+            return self._control.popleft()
+        frame, self._latest = self._latest, None
+        return frame
+
+    def latest_tick(self) -> int:
+        return -1 if self._latest is None else self._latest.tick
+
+
+class AsyncSocket(Socket):
+    """
+    asyncio client: receive, compute and keepalive run as tasks of one event loop, with
+    no extra thread. Receiving never waits on the bot, superseded GameState frames are
+    dropped, and sends are awaited so a slow connection pushes back on the compute task
+    instead of piling up messages. Several instances can share one event loop. Like
+    `Socket.run`, `run_async` reconnects until `stop` is called. The later steps of an
+    `ActionPlan` are sent by a pacing task, cancelled when the next frame is handled.
+    """
+
+    def __init__(self, url: str, token: str, max_lag: int = 1, decoder: Optional[JDISDecoder] = None,
+                 telemetry_path: Optional[str] = None, record_path: Optional[str] = None):
+        super().__init__(url, token, max_lag=max_lag, decoder=decoder, telemetry_path=telemetry_path,
+                         record_path=record_path)
+        self._tasks: List[asyncio.Task] = []
+        self._pacing: Optional[asyncio.Task] = None
+
+
+    def run(self):
+        asyncio.run(self.run_async())
+
+
+    async def run_async(self) -> None:
+        log.info("Starting bot with base URL: %s", self.url)
+        self.running = True
+        try:
+            while self.running:
+                await self.connect_async()
+                if self.running:
+                    delay = self.backoff.next()
+                    log.warning("Reconnecting in %.2fs", delay)
+                    await asyncio.sleep(delay)
+        finally:
+            if self.recorder is not None:
+                self.recorder.close()
+
+
+    async def connect_async(self) -> None:
+        """
+        Runs one connection, returns once it is closed.
+        """
+        self.slot = AsyncFrameSlot()
+
+        ssl_context = None
+        if self.url.startswith("wss://"):
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+
+        try:
+            async with connect(self.url, additional_headers={'Authorization': self.token},
+                               ssl=ssl_context, max_size=None, ping_interval=None) as ws:
+                log.info("Connection opened")
+                await self.serve(ws)
+        except (OSError, websockets.exceptions.WebSocketException) as e:
+            log.error("Connection error: %s", e)
+
+        log.info("Connection closed")
+
+
+    async def serve(self, ws) -> None:
+        """
+        Runs the connection tasks until one of them stops (usually the receive task when the
+        connection closes) or until `stop` is called, then cancels the others.
+        """
+        self._tasks = [
+            asyncio.create_task(self.receive(ws), name="receive"),
+            asyncio.create_task(self.compute(ws), name="compute"),
+            asyncio.create_task(self.keepalive(ws), name="keepalive"),
+        ]
+        try:
+            await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.cancel_pacing()
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+
+
+    def stop(self) -> None:
+        self.running = False
+        for task in self._tasks:
+            task.cancel()
+
+
+    async def receive(self, ws) -> None:
+        async for message in ws:
+            if isinstance(message, bytes):
+                received = time.perf_counter()
+                self.backoff.reset()
+                if self.recorder is not None:
+                    self.recorder.record(message, received)
+                self.slot.put(message, received)
+
+
+    async def compute(self, ws) -> None:
+        while True:
+            frame = await self.slot.take()
+            sent = 0
+            self.cancel_pacing()
+            try:
+                await self.prepare(frame)
+                plan = ActionPlan.of(self.handle_message(frame.message, frame.received))
+                if plan and self.is_stale(frame.tick):
+                    self.telemetry.count("stale_responses")
+                elif plan:
+                    first = plan.first()
+                    if first:
+                        budget = self.scheduler.current
+                        if budget is not None:
+                            with budget.stage(Stage.Serialization):
+                                await ws.send(self.encode_actions(first))
+                        else:
+                            await ws.send(self.encode_actions(first))
+                    later = plan.later()
+                    if later:
+                        self._pacing = asyncio.create_task(self.pace(ws, frame.received, later), name="pacing")
+                    sent = len(plan)
+            except websockets.exceptions.ConnectionClosed:
+                return
+            except Exception:
+                log.exception("Could not handle a frame")
+            finally:
+                self.end_frame(frame, sent)
+
+            # Lets the receive task read the frames that arrived while computing.
+            await asyncio.sleep(0)
+
+
+    async def pace(self, ws, start: float, steps: Sequence[Tuple[float, List[Action]]]) -> None:
+        """
+        Sends each step at `start + offset` (`time.perf_counter()` seconds).
+        """
+        try:
+            for offset, actions in steps:
+                delay = start + offset - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await ws.send(self.encode_actions(actions))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+
+    def cancel_pacing(self) -> None:
+        if self._pacing is not None:
+            self._pacing.cancel()
+            self._pacing = None
+
+
+    async def prepare(self, frame: PendingFrame) -> None:
+        """
+        Called before a frame is handled, lets a subclass await work (e.g. on a process
+        pool) that the bot would otherwise do synchronously on the event loop.
+        """
+
+
+    async def keepalive(self, ws) -> None:
+        while True:
+            await ws.send('ping')
+            await asyncio.sleep(self.ping_interval)
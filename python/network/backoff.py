@@ -0,0 +1,26 @@
+import random
+from typing import Optional
+
+
+class Backoff:
+    """
+    Exponential backoff with full jitter: the n-th delay is drawn uniformly between 0 and
+    min(maximum, initial * factor ** n), so that bots which lost the same server do not
+    all reconnect at the same moment. `reset` once a connection proved to be healthy.
+    """
+
+    def __init__(self, initial: float = 0.05, maximum: float = 10.0, factor: float = 2.0,
+                 rng: Optional[random.Random] = None):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.attempts = 0
+        self.rng = rng or random.Random()
+
+    def next(self) -> float:
+        ceiling = min(self.maximum, self.initial * self.factor ** self.attempts)
+        self.attempts += 1
+        return self.rng.uniform(0.0, ceiling)
+
+    def reset(self) -> None:
+        self.attempts = 0
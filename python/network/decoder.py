@@ -3,6 +3,9 @@ from typing import Tuple
 import struct
 import uuid
 
+import numpy as np
+
+from core.game_arrays import GameStateArrays
 from core.game_state import PlayerInfo, PlayerWeapon, Projectile, Blade, GameState, Coin
 from core.map_state import Point, Collider, ColliderType, MapState
 
@@ -21,6 +24,31 @@ def read_uuid(byte_array, end_index):
     return str(uuid.UUID(bytes=byte_array[:end_index]))
 
 
+HEADER_STRUCT       = struct.Struct('<ib')
+INT32_STRUCT        = struct.Struct('<i')
+PLAYER_STATS_STRUCT = struct.Struct('<iiq')
+POINT_STRUCT        = struct.Struct('<dd')
+SEGMENT_STRUCT      = struct.Struct('<dddd')
+BLADE_STRUCT        = struct.Struct('<ddddd')
+COIN_STRUCT         = struct.Struct('<ddi')
+
+UUID_SIZE           = 16
+PROJECTILE_SIZE     = UUID_SIZE + SEGMENT_STRUCT.size
+COIN_SIZE           = UUID_SIZE + COIN_STRUCT.size
+
+PROJECTILE_DTYPE    = np.dtype([('uid', 'V16'), ('pos', '<f8', 2), ('dest', '<f8', 2)])
+COIN_DTYPE          = np.dtype([('uid', 'V16'), ('pos', '<f8', 2), ('value', '<i4')])
+
+
+def format_uuid(view: memoryview, offset: int) -> str:
+    """
+    Same output as `read_uuid`, but reads the 16 bytes in place instead of
+    slicing the message and going through `uuid.UUID`.
+    """
+    h = view[offset:offset + UUID_SIZE].hex()
+    return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
+
 @dataclass
 class JDISDecoder:
     def decode_point(self, data: bytes, offset: int) -> Tuple[Point, int]:
@@ -34,7 +62,7 @@ class JDISDecoder:
         
         for i in range(pos_size):
             p = Point()
-            p, _ = self.decode_point(data, i * 16)
+            p, _ = self.decode_point(data, offset + i * 16)
             c.positions.append(p)
 
         offset += pos_size * 16
@@ -151,3 +179,151 @@ class JDISDecoder:
             g.coins.append(coin)
 
         return g
+
+
+    def decode_player_info_fast(self, data: bytes, view: memoryview, offset: int) -> Tuple[PlayerInfo, int]:
+        p = PlayerInfo()
+
+        end_index = data.find(b'\0', offset)
+        p.name = str(view[offset:end_index], 'utf-8')
+        offset = end_index + 1
+
+        p.color, p.health, p.score = PLAYER_STATS_STRUCT.unpack_from(view, offset)
+        offset += PLAYER_STATS_STRUCT.size
+
+        p.pos = Point(*POINT_STRUCT.unpack_from(view, offset))
+        offset += POINT_STRUCT.size
+
+        has_dest = view[offset]
+        offset += 1
+
+        if has_dest:
+            p.dest = Point(*POINT_STRUCT.unpack_from(view, offset))
+            offset += POINT_STRUCT.size
+
+        p.playerWeapon = PlayerWeapon(view[offset])
+        offset += 1
+
+        projectile_size = INT32_STRUCT.unpack_from(view, offset)[0]
+        offset += 4
+
+        p.projectiles = []
+        for _ in range(projectile_size):
+            pos_x, pos_y, dest_x, dest_y = SEGMENT_STRUCT.unpack_from(view, offset + UUID_SIZE)
+            p.projectiles.append(Projectile(
+                uid=format_uuid(view, offset),
+                pos=Point(pos_x, pos_y),
+                dest=Point(dest_x, dest_y),
+            ))
+            offset += PROJECTILE_SIZE
+
+        start_x, start_y, end_x, end_y, rotation = BLADE_STRUCT.unpack_from(view, offset)
+        offset += BLADE_STRUCT.size
+
+        p.blade = Blade(Point(start_x, start_y), Point(end_x, end_y), rotation)
+
+        return p, offset
+
+
+    def decode_game_state_fast(self, data: bytes, offset: int = 0) -> GameState:
+        """
+        Decodes the same `GameState` as `decode_game_state`, but walks a single
+        memoryview of `data` with absolute offsets, so nothing is sliced or copied.
+
+        `offset` is the index of the payload in `data`, which lets callers pass the
+        raw message and skip the message type byte without slicing it off.
+        """
+        view = memoryview(data)
+
+        g = GameState()
+        g.current_tick, g.current_round = HEADER_STRUCT.unpack_from(view, offset)
+        offset += HEADER_STRUCT.size
+
+        player_size = INT32_STRUCT.unpack_from(view, offset)[0]
+        offset += 4
+
+        g.players = []
+        for _ in range(player_size):
+            player, offset = self.decode_player_info_fast(data, view, offset)
+            g.players.append(player)
+
+        coin_size = INT32_STRUCT.unpack_from(view, offset)[0]
+        offset += 4
+
+        g.coins = []
+        for _ in range(coin_size):
+            x, y, value = COIN_STRUCT.unpack_from(view, offset + UUID_SIZE)
+            g.coins.append(Coin(uid=format_uuid(view, offset), value=value, pos=Point(x, y)))
+            offset += COIN_SIZE
+
+        return g
+
+
+    def decode_game_state_arrays(self, data: bytes, offset: int = 0) -> GameStateArrays:
+        """
+        Fills a `GameStateArrays` straight from the wire bytes, without building the
+        dataclasses. Projectile and coin records are fixed size and contiguous, so they
+        are read as structured NumPy views of `data` and copied once into the columns.
+        """
+        view = memoryview(data)
+
+        g = GameStateArrays()
+        g.current_tick, g.current_round = HEADER_STRUCT.unpack_from(view, offset)
+        offset += HEADER_STRUCT.size
+
+        player_size = INT32_STRUCT.unpack_from(view, offset)[0]
+        offset += 4
+
+        g.player_pos = np.empty((player_size, 2), dtype=np.float64)
+        g.player_dest = np.zeros((player_size, 2), dtype=np.float64)
+        g.player_health = np.empty(player_size, dtype=np.int32)
+        g.player_score = np.empty(player_size, dtype=np.int64)
+        g.player_weapon = np.empty(player_size, dtype=np.uint8)
+
+        projectiles = []
+        owners = []
+        for i in range(player_size):
+            end_index = data.find(b'\0', offset)
+            g.player_names.append(str(view[offset:end_index], 'utf-8'))
+            offset = end_index + 1
+
+            _, g.player_health[i], g.player_score[i] = PLAYER_STATS_STRUCT.unpack_from(view, offset)
+            offset += PLAYER_STATS_STRUCT.size
+
+            g.player_pos[i] = POINT_STRUCT.unpack_from(view, offset)
+            offset += POINT_STRUCT.size
+
+            has_dest = view[offset]
+            offset += 1
+
+            if has_dest:
+                g.player_dest[i] = POINT_STRUCT.unpack_from(view, offset)
+                offset += POINT_STRUCT.size
+
+            g.player_weapon[i] = view[offset]
+            offset += 1
+
+            projectile_size = INT32_STRUCT.unpack_from(view, offset)[0]
+            offset += 4
+
+            if projectile_size:
+                projectiles.append(np.frombuffer(data, PROJECTILE_DTYPE, projectile_size, offset))
+                owners.append(np.full(projectile_size, i, dtype=np.int32))
+            offset += projectile_size * PROJECTILE_SIZE + BLADE_STRUCT.size
+
+        if projectiles:
+            records = np.concatenate(projectiles)
+            g.projectile_pos = records['pos']
+            g.projectile_dest = records['dest']
+            g.projectile_owner = np.concatenate(owners)
+            g.projectile_uid_bytes = records['uid'].copy()
+
+        coin_size = INT32_STRUCT.unpack_from(view, offset)[0]
+        offset += 4
+
+        coins = np.frombuffer(data, COIN_DTYPE, coin_size, offset)
+        g.coin_pos = coins['pos'].copy()
+        g.coin_value = coins['value'].copy()
+        g.coin_uid_bytes = coins['uid'].copy()
+
+        return g
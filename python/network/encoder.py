@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+import uuid
+
+from core.game_state import PlayerInfo, GameState
+from core.map_state import Collider, MapState, Point
+from core.message import MessageType
+from network.decoder import (
+    HEADER_STRUCT, INT32_STRUCT, PLAYER_STATS_STRUCT, POINT_STRUCT, SEGMENT_STRUCT, BLADE_STRUCT, COIN_STRUCT
+)
+
+
+def write_uuid(out: bytearray, uid: str) -> None:
+    out += uuid.UUID(uid).bytes
+
+
+@dataclass
+class JDISEncoder:
+    """
+    Server side of the binary protocol read by `JDISDecoder`. It is used to build
+    frames for benchmarks and local games, every `encode_*` method is the exact
+    inverse of the matching `decode_*` method.
+    """
+
+    def encode_point(self, out: bytearray, p: Point) -> None:
+        out += POINT_STRUCT.pack(p.x, p.y)
+
+
+    def encode_collider(self, out: bytearray, c: Collider) -> None:
+        out.append(len(c.positions))
+        for p in c.positions:
+            self.encode_point(out, p)
+        out.append(int(c.collider_type))
+
+
+    def encode_map_state(self, m: MapState) -> bytes:
+        out = bytearray([MessageType.GameStart.value, m.size])
+        for row in m.discrete_grid:
+            out += bytes(row)
+
+        out += INT32_STRUCT.pack(len(m.walls))
+        for wall in m.walls:
+            self.encode_collider(out, wall)
+
+        out += bytes(m.save[:100]).ljust(100, b'\0')
+        return bytes(out)
+
+
+    def encode_player_info(self, out: bytearray, p: PlayerInfo) -> None:
+        out += p.name.encode('utf-8') + b'\0'
+        out += PLAYER_STATS_STRUCT.pack(p.color, p.health, p.score)
+        self.encode_point(out, p.pos)
+
+        out.append(1)
+        self.encode_point(out, p.dest)
+
+        out.append(int(p.playerWeapon))
+
+        out += INT32_STRUCT.pack(len(p.projectiles))
+        for projectile in p.projectiles:
+            write_uuid(out, projectile.uid)
+            out += SEGMENT_STRUCT.pack(projectile.pos.x, projectile.pos.y, projectile.dest.x, projectile.dest.y)
+
+        out += BLADE_STRUCT.pack(
+            p.blade.start.x, p.blade.start.y, p.blade.end.x, p.blade.end.y, p.blade.rotation
+        )
+
+
+    def encode_game_state(self, g: GameState) -> bytes:
+        out = bytearray([MessageType.GameState.value])
+        out += HEADER_STRUCT.pack(g.current_tick, g.current_round)
+
+        out += INT32_STRUCT.pack(len(g.players))
+        for player in g.players:
+            self.encode_player_info(out, player)
+
+        out += INT32_STRUCT.pack(len(g.coins))
+        for coin in g.coins:
+            write_uuid(out, coin.uid)
+            out += COIN_STRUCT.pack(coin.pos.x, coin.pos.y, coin.value)
+
+        return bytes(out)
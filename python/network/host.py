@@ -0,0 +1,98 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from core.logger import get_logger
+from core.map_state import MapState
+from core.message import MessageType
+from network.async_client import AsyncSocket
+from network.decoder import JDISDecoder
+from network.worker import PendingFrame
+from src.map_cache import MAP_CACHE, MapCache, compile_map
+
+
+log = get_logger("network.host")
+
+
+class HostedSocket(AsyncSocket):
+    """
+    An `AsyncSocket` run by a `BotHost`: it uses the host's decoder and, on GameStart,
+    waits for the host to precompute the map so the bot's `on_start` finds it in the cache.
+    """
+
+    def __init__(self, url: str, token: str, host: 'BotHost', max_lag: int = 1):
+        super().__init__(url, token, max_lag=max_lag, decoder=host.decoder)
+        self.host = host
+
+
+    async def prepare(self, frame: PendingFrame) -> None:
+        if frame.message[0] == MessageType.GameStart.value:
+            await self.host.precompute_map(frame.message[1:])
+
+
+class BotHost:
+    """
+    Runs several bot sessions in one process, on one event loop. The sessions share the
+    decoder and the map cache, and the CPU-heavy work that does not have to answer within
+    the tick (the map precompute) runs on a process pool sized to the machine's cores,
+    so it neither blocks the other sessions nor is computed once per bot.
+    """
+
+    def __init__(self, sessions: Iterable[Tuple[str, str]], workers: Optional[int] = None,
+                 cache: MapCache = MAP_CACHE):
+        self.decoder = JDISDecoder()
+        self.cache = cache
+        self.workers = workers or os.cpu_count() or 1
+        self.sockets: List[HostedSocket] = [HostedSocket(url, token, self) for url, token in sessions]
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+
+
+    def run(self) -> None:
+        asyncio.run(self.run_async())
+
+
+    async def run_async(self) -> None:
+        log.info("Hosting %d bots with %d planning processes", len(self.sockets), self.workers)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            self._pool = pool
+            try:
+                await asyncio.gather(*(socket.run_async() for socket in self.sockets))
+            finally:
+                self._pool = None
+
+
+    async def run_in_pool(self, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Runs `function(*args)` on the process pool, or inline when the host is not running.
+        `function` and its arguments must be picklable.
+        """
+        if self._pool is None:
+            return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._pool, function, *args)
+
+
+    async def precompute_map(self, payload: bytes) -> None:
+        """
+        Compiles the map of a GameStart payload into the cache. Sessions that start on the
+        same map at the same time wait for the same compilation.
+        """
+        map_state = self.decoder.decode_map_state(payload)
+        key = self.cache.key(map_state)
+        if key in self.cache:
+            return
+
+        task = self._pending.get(key)
+        if task is None:
+            task = self._pending[key] = asyncio.ensure_future(self._compile(key, map_state))
+        await task
+
+
+    async def _compile(self, key: Hashable, map_state: MapState) -> None:
+        try:
+            self.cache.put(map_state, await self.run_in_pool(compile_map, map_state))
+        except Exception:
+            log.exception("Could not precompute the map")
+        finally:
+            self._pending.pop(key, None)
@@ -0,0 +1,160 @@
+from functools import cached_property
+from typing import List
+
+from core.game_arrays import GameStateArrays
+from core.game_state import PlayerInfo, PlayerWeapon, Projectile, Blade, GameState, Coin
+from core.map_state import Point
+from network.decoder import (
+    JDISDecoder, HEADER_STRUCT, INT32_STRUCT, PLAYER_STATS_STRUCT, POINT_STRUCT, SEGMENT_STRUCT, BLADE_STRUCT,
+    COIN_STRUCT, UUID_SIZE, PROJECTILE_SIZE, COIN_SIZE, format_uuid
+)
+
+
+class LazyPlayerInfo(PlayerInfo):
+    """
+    A `PlayerInfo` that only knows where its fields are in the message. Each field is
+    decoded the first time it is read and then cached, assigning a field works as usual.
+    """
+
+    def __init__(self, data: bytes, view: memoryview, offset: int):
+        self._data = data
+        self._view = view
+        self._name_offset = offset
+        self._name_end = data.find(b'\0', offset)
+
+        self._stats_offset = self._name_end + 1
+        self._pos_offset = self._stats_offset + PLAYER_STATS_STRUCT.size
+
+        offset = self._pos_offset + POINT_STRUCT.size
+        self._dest_offset = offset + 1 if view[offset] else -1
+        offset += 1 if self._dest_offset < 0 else 1 + POINT_STRUCT.size
+
+        self._weapon_offset = offset
+        self._projectile_count = INT32_STRUCT.unpack_from(view, offset + 1)[0]
+        self._projectiles_offset = offset + 5
+        self._blade_offset = self._projectiles_offset + self._projectile_count * PROJECTILE_SIZE
+        self.end_offset = self._blade_offset + BLADE_STRUCT.size
+
+    @cached_property
+    def name(self) -> str:
+        return str(self._view[self._name_offset:self._name_end], 'utf-8')
+
+    @cached_property
+    def color(self) -> int:
+        return PLAYER_STATS_STRUCT.unpack_from(self._view, self._stats_offset)[0]
+
+    @cached_property
+    def health(self) -> int:
+        return PLAYER_STATS_STRUCT.unpack_from(self._view, self._stats_offset)[1]
+
+    @cached_property
+    def score(self) -> int:
+        return PLAYER_STATS_STRUCT.unpack_from(self._view, self._stats_offset)[2]
+
+    @cached_property
+    def pos(self) -> Point:
+        return Point(*POINT_STRUCT.unpack_from(self._view, self._pos_offset))
+
+    @cached_property
+    def dest(self) -> Point:
+        if self._dest_offset < 0:
+            return Point()
+        return Point(*POINT_STRUCT.unpack_from(self._view, self._dest_offset))
+
+    @cached_property
+    def playerWeapon(self) -> PlayerWeapon:
+        return PlayerWeapon(self._view[self._weapon_offset])
+
+    @cached_property
+    def projectiles(self) -> List[Projectile]:
+        projectiles = []
+        offset = self._projectiles_offset
+        for _ in range(self._projectile_count):
+            pos_x, pos_y, dest_x, dest_y = SEGMENT_STRUCT.unpack_from(self._view, offset + UUID_SIZE)
+            projectiles.append(Projectile(format_uuid(self._view, offset), Point(pos_x, pos_y), Point(dest_x, dest_y)))
+            offset += PROJECTILE_SIZE
+        return projectiles
+
+    @cached_property
+    def blade(self) -> Blade:
+        start_x, start_y, end_x, end_y, rotation = BLADE_STRUCT.unpack_from(self._view, self._blade_offset)
+        return Blade(Point(start_x, start_y), Point(end_x, end_y), rotation)
+
+    def materialize(self) -> PlayerInfo:
+        return PlayerInfo(
+            self.name, self.color, self.health, self.score, self.pos, self.dest,
+            self.playerWeapon, self.projectiles, self.blade
+        )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PlayerInfo):
+            return self.materialize() == (other.materialize() if isinstance(other, LazyPlayerInfo) else other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self.materialize())
+
+    def __str__(self) -> str:
+        return str(self.materialize())
+
+
+class LazyGameState(GameState):
+    """
+    A `GameState` view over a raw message. The constructor walks the message once to
+    index the record boundaries of every player and of the coins, every sub-object is
+    decoded on first access and cached. It can be used wherever a `GameState` is expected.
+
+    `arrays` gives the same state as a `GameStateArrays`, decoded on first access.
+    """
+
+    def __init__(self, data: bytes, offset: int = 0):
+        self._data = data
+        self._view = memoryview(data)
+        self._offset = offset
+
+        self.current_tick, self.current_round = HEADER_STRUCT.unpack_from(self._view, offset)
+        offset += HEADER_STRUCT.size
+
+        player_size = INT32_STRUCT.unpack_from(self._view, offset)[0]
+        offset += 4
+
+        self.players = []
+        for _ in range(player_size):
+            player = LazyPlayerInfo(data, self._view, offset)
+            offset = player.end_offset
+            self.players.append(player)
+
+        self._coin_count = INT32_STRUCT.unpack_from(self._view, offset)[0]
+        self._coins_offset = offset + 4
+
+    @cached_property
+    def coins(self) -> List[Coin]:
+        coins = []
+        offset = self._coins_offset
+        for _ in range(self._coin_count):
+            x, y, value = COIN_STRUCT.unpack_from(self._view, offset + UUID_SIZE)
+            coins.append(Coin(format_uuid(self._view, offset), value, Point(x, y)))
+            offset += COIN_SIZE
+        return coins
+
+    @cached_property
+    def arrays(self) -> GameStateArrays:
+        return JDISDecoder().decode_game_state_arrays(self._data, self._offset)
+
+    def materialize(self) -> GameState:
+        return GameState(
+            self.current_tick, self.current_round,
+            [player.materialize() if isinstance(player, LazyPlayerInfo) else player for player in self.players],
+            self.coins
+        )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, GameState):
+            return self.materialize() == (other.materialize() if isinstance(other, LazyGameState) else other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self.materialize())
+
+    def __str__(self) -> str:
+        return str(self.materialize())
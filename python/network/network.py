@@ -1,95 +1,225 @@
 import websocket
-import json
+import logging
 import ssl
 import threading
 import time
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from src.bot import MyBot
 from core.message import MessageType
-from core.action import Action
+from core.action import Action, ActionPlan
+from core.logger import get_logger
+from core.scheduler import Stage
+from core.telemetry import Telemetry
+from network.action_encoder import ActionEncoder
+from network.backoff import Backoff
 from network.decoder import JDISDecoder
+from network.lazy_state import LazyGameState
+from network.pacing import ActionPacer
+from network.recording import Recorder
+from network.worker import FrameWorker, LatestFrameSlot, PendingFrame, frame_tick
+
+
+log = get_logger("network")
+send_log = get_logger("network.send")
 
 
 class Socket:  
-    def __init__(self, url: str, token: str):
+    def __init__(self, url: str, token: str, threaded: bool = False, max_lag: int = 1,
+                 decoder: Optional[JDISDecoder] = None, telemetry_path: Optional[str] = None,
+                 record_path: Optional[str] = None):
+        """
+        With `threaded`, the websocket thread only stores the latest frame and a worker
+        thread decodes and computes, skipping GameState frames that were superseded.
+        Responses more than `max_lag` ticks behind the newest received tick are dropped.
+        The decoder holds no state and can be shared by several sockets.
+
+        `run` reconnects with a jittered exponential backoff until `stop` is called, with
+        the same `MyBot`, so the walls it found and its map caches survive a disconnect.
+
+        Tick telemetry is summarized in the logs at the end of every game and, with
+        `telemetry_path`, its per-tick rows are appended to that file (CSV or JSON lines).
+        With `record_path`, every received frame is saved there, to be replayed by
+        `network.replay.Replayer`.
+
+        When the bot returns an `ActionPlan`, its immediate step is sent with the response
+        and its later steps are paced inside the tick by an `ActionPacer`, relative to the
+        reception of the GameState. Every new frame cancels the steps not sent yet.
+        """
         self.url = url
         self.token = token
+        self.threaded = threaded
+        self.max_lag = max_lag
+        self.slot: Optional[LatestFrameSlot] = None
+        self.running = False
+        self.backoff = Backoff()
+        self.ws: Optional[websocket.WebSocketApp] = None
         self.bot = MyBot()
+        self.decoder = decoder or JDISDecoder()
+        self.action_encoder = ActionEncoder()
+        self.pacer = ActionPacer()
+        self.scheduler = self.bot.scheduler
+        self.telemetry = Telemetry()
+        self.telemetry_path = telemetry_path
+        self.recorder = Recorder(record_path) if record_path else None
         self.ping_interval = 1
 
         
     def run(self):
-        print(f"Starting bot with base URL: {self.url}, token: {self.token}")
+        log.info("Starting bot with base URL: %s", self.url)
+        self.running = True
         try:
-            ws = websocket.WebSocketApp(self.url,
-                                        header={'Authorization': self.token},
-                                        on_open=self.on_open,
-                                        on_message=self.on_message,
-                                        on_error=self.on_error,
-                                        on_close=self.on_close)
-        except Exception as e:
-            print("Error: ", e)
+            while self.running:
+                self.connect()
+                if self.running:
+                    delay = self.backoff.next()
+                    log.warning("Reconnecting in %.2fs", delay)
+                    time.sleep(delay)
+        finally:
+            if self.recorder is not None:
+                self.recorder.close()
+
+
+    def connect(self) -> None:
+        """
+        Runs one connection, returns once it is closed.
+        """
+        if self.threaded:
+            self.slot = LatestFrameSlot()
+
+        try:
+            self.ws = websocket.WebSocketApp(self.url,
+                                             header={'Authorization': self.token},
+                                             on_open=self.on_open,
+                                             on_message=self.on_message,
+                                             on_error=self.on_error,
+                                             on_close=self.on_close)
+        except Exception:
+            log.exception("Could not create the connection")
             return
         
-        ws.run_forever(sslopt={"cert_reqs": ssl.CERT_NONE})
+        self.ws.run_forever(sslopt={"cert_reqs": ssl.CERT_NONE})
+
 
+    def stop(self) -> None:
+        self.running = False
+        if self.ws is not None:
+            self.ws.close()
 
-    def handle_message(self, message: bytes) -> Optional[List[Action]]:
+
+    def handle_message(self, message: bytes, received: Optional[float] = None) -> Union[ActionPlan, List[Action], None]:
         message_type = int(message[0])
         response = None
 
-        decoder = JDISDecoder()
-
         if message_type == MessageType.GameStart.value:
-            map_state = decoder.decode_map_state(message[1:])
+            map_state = self.decoder.decode_map_state(message[1:])
             self.bot.on_start(map_state)
 
         elif message_type == MessageType.GameState.value:
-            game_state = decoder.decode_game_state(message[1:])
+            budget = self.scheduler.begin_tick(start=received)
+            with budget.stage(Stage.Decode):
+                game_state = LazyGameState(message, 1)
+            budget.tick = game_state.current_tick
+
             response = self.bot.on_tick(game_state)
 
         elif message_type == MessageType.GameState.GameEnd.value:
-            self.bot.on_end()
+            try:
+                response = self.bot.on_end()
+            finally:
+                self.end_game()
 
         else:
-            print("Unknown message type")
+            log.warning("Unknown message type: %d", message_type)
 
         return response
 
 
     def on_open(self, ws: websocket.WebSocketApp) -> None:
-        print("Connection opened")
+        log.info("Connection opened")
         self.start_ping_thread(ws)
+
+        if self.slot is not None:
+            FrameWorker(self.slot, lambda frame: self.process_frame(ws, frame)).start()
         
 
     def on_message(self, ws: websocket.WebSocketApp, message: bytes) -> None:
-        response = self.handle_message(message)
-        if response:
-            self.send_message(ws, response)
+        received = time.perf_counter()
+        self.backoff.reset()
+        if self.recorder is not None:
+            self.recorder.record(message, received)
+        if self.slot is not None:
+            self.slot.put(message, received)
+        else:
+            self.process_frame(ws, PendingFrame(message, received, frame_tick(message)))
+
+
+    def process_frame(self, ws: websocket.WebSocketApp, frame: PendingFrame) -> None:
+        sent = 0
+        self.pacer.cancel()
+        plan = ActionPlan.of(self.handle_message(frame.message, frame.received))
+        if plan and self.is_stale(frame.tick):
+            self.telemetry.count("stale_responses")
+        elif plan:
+            first = plan.first()
+            if first:
+                budget = self.scheduler.current
+                if budget is not None:
+                    with budget.stage(Stage.Serialization):
+                        self.send_message(ws, first)
+                else:
+                    self.send_message(ws, first)
+            self.pacer.schedule(ws, frame.received, plan.later())
+            sent = len(plan)
+
+        self.end_frame(frame, sent)
+
+
+    def end_frame(self, frame: PendingFrame, actions: int) -> None:
+        record = self.scheduler.end_tick()
+        if record is not None:
+            self.telemetry.record_tick(record, len(frame.message), actions)
+
+
+    def end_game(self) -> None:
+        self.telemetry.report()
+        if self.telemetry_path:
+            try:
+                self.telemetry.export(self.telemetry_path)
+            except OSError:
+                log.exception("Could not export the telemetry")
+        self.telemetry.reset()
+
+
+    def is_stale(self, tick: int) -> bool:
+        return self.slot is not None and tick >= 0 and self.slot.latest_tick() - tick > self.max_lag
         
 
     def on_error(self, ws: websocket.WebSocketApp, error: str) -> None:
-        print("Error: ", error)
+        log.error("Connection error: %s", error)
+
+        # run_forever swallows the interrupt after reporting it here.
+        if isinstance(error, (KeyboardInterrupt, SystemExit)):
+            self.running = False
         
 
     def on_close(self, ws: websocket.WebSocketApp, close_status_code, close_msg) -> None:
-        print("Connection closed")
+        log.info("Connection closed")
+        self.pacer.cancel()
+
+        if self.slot is not None:
+            self.slot.close()
         
 
     def send_message(self, ws: websocket.WebSocketApp, actions: List[Action]) -> None:
-        json_reponse = {}
-        for action in actions:
-            try:
-                json_reponse.update(action.serialize())
-            except Exception as e:
-                print(e)
-    
-        json_message = json.dumps(json_reponse)
-
-        print(f"Sending message: {json_message}")
-        prefixed_message = bytearray([3]) + json_message.encode('utf-8')
-        ws.send(prefixed_message)
+        ws.send(self.encode_actions(actions))
+
+
+    def encode_actions(self, actions: List[Action]) -> bytes:
+        message = self.action_encoder.encode(actions)
+        if send_log.isEnabledFor(logging.DEBUG):
+            send_log.debug("Sending message: %s", message[1:].decode('utf-8'))
+        return message
 
 
     def start_ping_thread(self, ws: websocket.WebSocketApp) -> None:
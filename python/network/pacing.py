@@ -0,0 +1,74 @@
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from core.action import Action
+from core.logger import get_logger
+from network.action_encoder import ActionEncoder
+
+
+log = get_logger("network.send")
+
+Step = Tuple[float, List[Action]]
+
+
+class ActionPacer:
+    """
+    Sends the later steps of an `ActionPlan` from a daemon thread, each at `start + offset`
+    (`time.perf_counter()` seconds), so they land in the matching action loop of the server
+    rather than all at once. Scheduling replaces the steps that were not sent yet: a new
+    GameState always supersedes the timeline of the previous one. The pacer has its own
+    `ActionEncoder`, the socket's one is not shared across threads.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._steps: List[Step] = []
+        self._ws = None
+        self._start = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self.encoder = ActionEncoder()
+        self.sent = 0
+
+    def schedule(self, ws, start: float, steps: Sequence[Step]) -> None:
+        with self._condition:
+            self._ws = ws
+            self._start = start
+            self._steps = sorted(steps, key=lambda step: step[0], reverse=True)
+            if self._steps and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pacer", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def cancel(self) -> None:
+        with self._condition:
+            self._steps = []
+            self._condition.notify()
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._steps)
+
+    def _next(self) -> Tuple[object, List[Action]]:
+        """
+        Waits for the next step to be due.
+        """
+        with self._condition:
+            while True:
+                if not self._steps:
+                    self._condition.wait()
+                    continue
+                delay = self._start + self._steps[-1][0] - time.perf_counter()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                return self._ws, self._steps.pop()[1]
+
+    def _run(self) -> None:
+        while True:
+            ws, actions = self._next()
+            try:
+                ws.send(self.encoder.encode(actions))
+                self.sent += 1
+            except Exception:
+                log.exception("Could not send a paced step")
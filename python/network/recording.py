@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+import struct
+import time
+
+from core.message import MessageType
+
+
+RECORDING_MAGIC = b'JDISREC1'
+FRAME_HEADER_STRUCT = struct.Struct('<dI')
+
+
+@dataclass
+class Frame:
+    """
+    A raw binary message as received from the server.
+
+    Attributes:
+        timestamp (float) : Seconds elapsed since the start of the recording.
+        data      (bytes) : The message, including its `MessageType` byte.
+    """
+    timestamp: float = 0.0
+    data: bytes = b''
+
+
+def write_frame(stream: BinaryIO, frame: Frame) -> None:
+    stream.write(FRAME_HEADER_STRUCT.pack(frame.timestamp, len(frame.data)))
+    stream.write(frame.data)
+
+
+def write_frames(path: str, frames: Iterable[Frame]) -> None:
+    with open(path, 'wb') as stream:
+        stream.write(RECORDING_MAGIC)
+        for frame in frames:
+            write_frame(stream, frame)
+
+
+def iter_frames(stream: BinaryIO) -> Iterator[Frame]:
+    if stream.read(len(RECORDING_MAGIC)) != RECORDING_MAGIC:
+        raise ValueError("Not a JDIS recording")
+
+    while True:
+        header = stream.read(FRAME_HEADER_STRUCT.size)
+        if len(header) < FRAME_HEADER_STRUCT.size:
+            return
+
+        timestamp, size = FRAME_HEADER_STRUCT.unpack(header)
+        data = stream.read(size)
+        if len(data) < size:
+            return
+
+        yield Frame(timestamp, data)
+
+
+def read_frames(path: str) -> List[Frame]:
+    with open(path, 'rb') as stream:
+        return list(iter_frames(stream))
+
+
+class Recorder:
+    """
+    Appends the frames received by a socket to a recording, timestamped relative to the
+    first one. Writes are buffered and flushed at the end of every game.
+    """
+
+    def __init__(self, path: str):
+        self.stream: BinaryIO = open(path, 'wb')
+        self.stream.write(RECORDING_MAGIC)
+        self.start: Optional[float] = None
+
+    def record(self, data: bytes, received: Optional[float] = None) -> None:
+        if received is None:
+            received = time.perf_counter()
+        if self.start is None:
+            self.start = received
+
+        write_frame(self.stream, Frame(received - self.start, bytes(data)))
+        if data[0] == MessageType.GameEnd.value:
+            self.stream.flush()
+
+    def close(self) -> None:
+        self.stream.close()
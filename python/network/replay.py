@@ -0,0 +1,82 @@
+import time
+from dataclasses import dataclass
+from typing import Iterable, List
+
+from core.logger import get_logger
+from network.network import Socket
+from network.recording import Frame
+from network.worker import PendingFrame, frame_tick
+
+
+log = get_logger("network.replay")
+
+
+class ReplayConnection:
+    """
+    Stands in for the websocket during a replay: it only counts what the bot sends.
+    """
+
+    keep_running = True
+
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+
+    def send(self, data: bytes) -> None:
+        self.messages += 1
+        self.bytes += len(data)
+
+
+@dataclass
+class ReplayResult:
+    """
+    Attributes:
+        frames   (int)   : The number of frames replayed.
+        ticks    (int)   : The number of GameState frames among them.
+        messages (int)   : The number of action messages the bot sent.
+        elapsed  (float) : The wall time of the replay, in seconds.
+    """
+    frames: int = 0
+    ticks: int = 0
+    messages: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class Replayer:
+    """
+    Feeds recorded frames through `Socket.process_frame` (and so `handle_message`, the
+    bot, the action encoder and the telemetry) without a server. Frames are replayed as
+    fast as possible, or paced on their timestamps with `realtime`, `speed` times faster.
+    """
+
+    def __init__(self, socket: Socket, frames: Iterable[Frame]):
+        self.socket = socket
+        self.frames: List[Frame] = list(frames)
+        self.connection = ReplayConnection()
+
+    def run(self, realtime: bool = False, speed: float = 1.0) -> ReplayResult:
+        result = ReplayResult()
+        start = time.perf_counter()
+        for frame in self.frames:
+            if realtime:
+                delay = start + frame.timestamp / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            pending = PendingFrame(frame.data, time.perf_counter(), frame_tick(frame.data))
+            try:
+                self.socket.process_frame(self.connection, pending)
+            except Exception:
+                log.exception("Could not handle a frame")
+
+            result.frames += 1
+            if pending.tick >= 0:
+                result.ticks += 1
+
+        result.elapsed = time.perf_counter() - start
+        result.messages = self.connection.messages
+        return result
@@ -0,0 +1,106 @@
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Optional
+
+from core.logger import get_logger
+from core.message import MessageType
+from network.decoder import HEADER_STRUCT
+
+
+log = get_logger("network")
+
+
+@dataclass
+class PendingFrame:
+    """
+    A raw frame waiting for the worker.
+
+    Attributes:
+        message  (bytes) : The message, including its `MessageType` byte.
+        received (float) : `time.perf_counter()` when the frame was received.
+        tick     (int)   : The tick of a GameState frame, -1 for the other messages.
+    """
+    message: bytes
+    received: float
+    tick: int = -1
+
+
+def frame_tick(message: bytes) -> int:
+    if message[0] != MessageType.GameState.value:
+        return -1
+    return HEADER_STRUCT.unpack_from(message, 1)[0]
+
+
+class LatestFrameSlot:
+    """
+    Single-slot "latest wins" buffer between the receive thread and the worker.
+
+    Only the newest GameState is kept, a GameState that was not taken before the next
+    one arrived is dropped. GameStart and GameEnd frames are never dropped and are
+    handed out in order, before any pending GameState; they also drop the pending
+    GameState, which belongs to the game that is starting or ending.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._control: Deque[PendingFrame] = deque()
+        self._latest: Optional[PendingFrame] = None
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, message: bytes, received: float) -> None:
+        frame = PendingFrame(message, received, frame_tick(message))
+        with self._condition:
+            if self._latest is not None:
+                self.dropped += 1
+                self._latest = None
+
+            if frame.tick >= 0:
+                self._latest = frame
+            else:
+                self._control.append(frame)
+            self._condition.notify()
+
+    def take(self, timeout: Optional[float] = None) -> Optional[PendingFrame]:
+        """
+        Blocks until a frame is available. Returns None once the slot is closed or on timeout.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._closed or self._control or self._latest is not None, timeout)
+            if self._control:
+                return self._control.popleft()
+            frame, self._latest = self._latest, None
+            return None if self._closed else frame
+
+    def latest_tick(self) -> int:
+        with self._condition:
+            return -1 if self._latest is None else self._latest.tick
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class FrameWorker(threading.Thread):
+    """
+    Decodes and computes on its own thread so the websocket callback thread only has
+    to push raw frames into the slot.
+    """
+
+    def __init__(self, slot: LatestFrameSlot, process: Callable[[PendingFrame], None]):
+        super().__init__(name="frame-worker", daemon=True)
+        self.slot = slot
+        self.process = process
+
+    def run(self) -> None:
+        while True:
+            frame = self.slot.take()
+            if frame is None:
+                return
+
+            try:
+                self.process(frame)
+            except Exception:
+                log.exception("Could not handle a frame")
@@ -1,19 +1,36 @@
 import argparse
 
+from core import logger
 from network.network import Socket
 
+UNRANKED_URL = "wss://jdis-ia.dinf.fsci.usherbrooke.ca:8088/echo"
+RANKED_URL = "wss://jdis-ia.dinf.fsci.usherbrooke.ca:8087/echo"
+
 def main():
     parser = argparse.ArgumentParser(description="Starts the bot")
     parser.add_argument("-t", "--token", help="The token to authenticate yout bot", required=True)
     parser.add_argument("-r", "--rank", action="store_true" ,help="If set, the bot will play ranked games")
+    parser.add_argument("-w", "--worker", action="store_true", help="If set, the bot computes on a worker thread and skips stale frames")
+    parser.add_argument("-a", "--asyncio", action="store_true", help="If set, the bot uses the asyncio client (requires websockets)")
+    parser.add_argument("-l", "--log-level", default="INFO", help="The minimum level of the logs (DEBUG shows every tick)")
+    parser.add_argument("--log-sample", action="append", default=[], metavar="CATEGORY=N", help="Only log one message out of N for a category, can be repeated")
+    parser.add_argument("--telemetry", metavar="PATH", help="Appends the per-tick telemetry of every game to PATH (.csv or JSON lines)")
+    parser.add_argument("--record", metavar="PATH", help="Saves every received frame to PATH, to be replayed with `python -m bench.replay`")
+    parser.add_argument("--log-json", action="store_true", help="If set, the logs are written as JSON lines")
 
     args = parser.parse_args()
+    logger.configure(args.log_level, logger.parse_sample(args.log_sample), structured=args.log_json)
 
-    channel = "wss://jdis-ia.dinf.fsci.usherbrooke.ca:8088/echo"
+    channel = UNRANKED_URL
     if args.rank:
-        channel = "wss://jdis-ia.dinf.fsci.usherbrooke.ca:8087/echo"
+        channel = RANKED_URL
     
-    Socket(channel, args.token).run()
+    if args.asyncio:
+        from network.async_client import AsyncSocket
+        AsyncSocket(channel, args.token, telemetry_path=args.telemetry, record_path=args.record).run()
+    else:
+        Socket(channel, args.token, threaded=args.worker, telemetry_path=args.telemetry,
+               record_path=args.record).run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
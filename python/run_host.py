@@ -0,0 +1,48 @@
+import argparse
+
+from core import logger
+from network.host import BotHost
+from run_bot import RANKED_URL, UNRANKED_URL
+
+def read_sessions(path, default_url):
+    """Reads one `token [url]` per line, blank lines and lines starting with # are skipped"""
+    sessions = []
+    with open(path) as file:
+        for line in file:
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            sessions.append((fields[1] if len(fields) > 1 else default_url, fields[0]))
+    return sessions
+
+def main():
+    parser = argparse.ArgumentParser(description="Starts several bots in one process")
+    parser.add_argument("-t", "--token", action="append", default=[], help="A token to authenticate a bot, can be repeated")
+    parser.add_argument("-f", "--file", help="A file with one `token [url]` per line")
+    parser.add_argument("-r", "--rank", action="store_true", help="If set, the bots without an url will play ranked games")
+    parser.add_argument("-u", "--url", help="The url used by the bots without one")
+    parser.add_argument("-j", "--jobs", type=int, help="The number of planning processes (defaults to the number of cores)")
+    parser.add_argument("-n", "--name-from-token", action="store_true", help="If set, each bot plays under its token, as the local server names players (run_server.py)")
+    parser.add_argument("-l", "--log-level", default="INFO", help="The minimum level of the logs (DEBUG shows every tick)")
+    parser.add_argument("--log-sample", action="append", default=[], metavar="CATEGORY=N", help="Only log one message out of N for a category, can be repeated")
+    parser.add_argument("--log-json", action="store_true", help="If set, the logs are written as JSON lines")
+
+    args = parser.parse_args()
+    logger.configure(args.log_level, logger.parse_sample(args.log_sample), structured=args.log_json)
+
+    channel = args.url or (RANKED_URL if args.rank else UNRANKED_URL)
+    sessions = [(channel, token) for token in args.token]
+    if args.file:
+        sessions += read_sessions(args.file, channel)
+
+    if not sessions:
+        parser.error("at least one token is required (-t or -f)")
+
+    host = BotHost(sessions, workers=args.jobs)
+    if args.name_from_token:
+        for socket in host.sockets:
+            socket.bot.name = socket.token
+    host.run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import argparse
+
+from core import logger
+from core.consts import Consts
+from server.server import GameServer
+
+def main():
+    parser = argparse.ArgumentParser(description="Starts a local game server to test and load test bots")
+    parser.add_argument("--host", default="localhost", help="The interface to listen on")
+    parser.add_argument("-p", "--port", type=int, default=8088, help="The port to listen on")
+    parser.add_argument("--tick", type=float, default=Consts.Game.TICK_DURATION, help="The duration of a tick in seconds, lower it to speed up the games")
+    parser.add_argument("-g", "--games", type=int, default=0, help="The number of games to play before stopping (0 plays forever)")
+    parser.add_argument("-s", "--seed", type=int, help="The seed of the maps and of the simulation")
+    parser.add_argument("-d", "--density", type=float, default=0.8, help="The probability that a cell edge is a wall, the maps always stay connected")
+    parser.add_argument("-l", "--log-level", default="INFO", help="The minimum level of the logs (DEBUG shows every tick)")
+    parser.add_argument("--log-json", action="store_true", help="If set, the logs are written as JSON lines")
+
+    args = parser.parse_args()
+    logger.configure(args.log_level, structured=args.log_json)
+
+    GameServer(args.host, args.port, args.tick, args.games, args.seed, args.density).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import base64
+import random
+from typing import Dict, Optional
+
+from core.consts import Consts
+from core.map_state import MapState
+from sim.batch import BatchGame, Orders
+
+
+class Game(BatchGame):
+    """
+    One match of the local server: a `BatchGame` of a single match whose players join by
+    name while it runs. The actions received during a tick are queued per player and per
+    action loop, and `step` applies each loop's actions before the matching substep.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None, density: float = 0.8,
+                 coins: int = Consts.Coin.QUANTITY):
+        super().__init__(1, rng=rng, density=density, coins=coins)
+        self.map_state = self.map_states[0]
+        self.index: Dict[str, int] = {}
+        self.saves: Dict[str, bytes] = {}
+        self.pending: Dict[int, Dict[str, dict]] = {}
+
+    @property
+    def scores(self) -> Dict[str, int]:
+        return dict(zip(self.names, self.score[0].tolist()))
+
+    def join(self, name: str) -> None:
+        if name not in self.index:
+            self.index[name] = self.add_player(name)
+
+    def is_alive(self, name: str) -> bool:
+        index = self.index.get(name)
+        return index is not None and self.respawn_at[0, index] <= self.time
+
+    def act(self, name: str, actions: dict, loop: int = 0) -> None:
+        """
+        Queues the actions of a player for action loop `loop` of the next tick, a later
+        message for the same loop overrides the same keys.
+        """
+        if name in self.index:
+            self.pending.setdefault(loop, {}).setdefault(name, {}).update(actions)
+
+    def map_state_for(self, name: str) -> MapState:
+        return MapState(
+            size=self.map_state.size,
+            discrete_grid=self.map_state.discrete_grid,
+            save=bytearray(self.saves.get(name, b'')),
+        )
+
+    def step(self, orders: Optional[Orders] = None) -> None:
+        """
+        Simulates one tick with the queued actions.
+        """
+        pending, self.pending = self.pending, {}
+        orders = orders or self.orders()
+        later = []
+        for loop, players in sorted(pending.items()):
+            loop_orders = orders if loop <= 0 else self.orders()
+            for name, actions in players.items():
+                if "save" in actions and self.is_alive(name):
+                    self.saves[name] = base64.b64decode(actions["save"])[:100]
+                loop_orders.add(0, self.index[name], actions)
+            if loop > 0:
+                later.append((loop, loop_orders))
+        super().step(orders, later)
@@ -0,0 +1,162 @@
+import random
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from core.consts import Consts
+from core.map_state import MapState
+
+
+CELL = Consts.Map.CELL_WIDTH
+BLOCK = 2
+
+Segment = Tuple[float, float, float, float]
+
+NEIGHBOURS = np.array([-1, 0, 1])
+
+
+def cell_edges() -> Tuple[List[Segment], List[Tuple[int, int]]]:
+    """
+    Every inner cell edge, with the two cells (as `x * HEIGHT + y`) it separates.
+    """
+    edges, cells = [], []
+    for i in range(Consts.Map.WIDTH):
+        for j in range(1, Consts.Map.HEIGHT):
+            edges.append((i * CELL, j * CELL, (i + 1) * CELL, j * CELL))
+            cells.append((i * Consts.Map.HEIGHT + j - 1, i * Consts.Map.HEIGHT + j))
+    for i in range(1, Consts.Map.WIDTH):
+        for j in range(Consts.Map.HEIGHT):
+            edges.append((i * CELL, j * CELL, i * CELL, (j + 1) * CELL))
+            cells.append(((i - 1) * Consts.Map.HEIGHT + j, i * Consts.Map.HEIGHT + j))
+    return edges, cells
+
+
+def border_walls() -> List[Segment]:
+    walls = []
+    for i in range(Consts.Map.WIDTH):
+        walls.append((i * CELL, 0, (i + 1) * CELL, 0))
+        walls.append((i * CELL, Consts.Map.HEIGHT * CELL, (i + 1) * CELL, Consts.Map.HEIGHT * CELL))
+    for j in range(Consts.Map.HEIGHT):
+        walls.append((0, j * CELL, 0, (j + 1) * CELL))
+        walls.append((Consts.Map.WIDTH * CELL, j * CELL, Consts.Map.WIDTH * CELL, (j + 1) * CELL))
+    return walls
+
+
+def random_walls(rng: random.Random, density: float = 0.8) -> List[Segment]:
+    """
+    Hidden walls as cell-edge segments: the map borders and a random maze. The edges of a
+    random spanning tree of the cells stay open, so every cell can be reached, and every
+    other inner edge is a wall with probability `density`.
+    """
+    edges, cells = cell_edges()
+    parent = list(range(Consts.Map.WIDTH * Consts.Map.HEIGHT))
+
+    def root(cell: int) -> int:
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    order = list(range(len(edges)))
+    rng.shuffle(order)
+
+    walls = border_walls()
+    for index in order:
+        a, b = (root(cell) for cell in cells[index])
+        if a != b:
+            parent[a] = b
+        elif rng.random() < density:
+            walls.append(edges[index])
+    return walls
+
+
+def discrete_grid(walls: List[Segment]) -> List[List[int]]:
+    """
+    The number of walls on the 12 edges of every 2x2 block of cells (its border and its
+    inner cross), indexed [row][column]. A border edge counts in both blocks it touches.
+    """
+    rows, columns = Consts.Map.HEIGHT // BLOCK, Consts.Map.WIDTH // BLOCK
+    grid = [[0] * columns for _ in range(rows)]
+    for x0, y0, x1, y1 in walls:
+        i, j = int(min(x0, x1) // CELL), int(min(y0, y1) // CELL)
+        if y0 == y1:
+            blocks = [(r, i // BLOCK) for r in {(j - 1) // BLOCK, j // BLOCK} if 0 <= r < rows and j - r * BLOCK <= BLOCK]
+        else:
+            blocks = [(j // BLOCK, c) for c in {(i - 1) // BLOCK, i // BLOCK} if 0 <= c < columns and i - c * BLOCK <= BLOCK]
+        for r, c in blocks:
+            grid[r][c] += 1
+    return grid
+
+
+def random_map(rng: random.Random, density: float = 0.8) -> Tuple[MapState, List[Segment]]:
+    """
+    A `MapState` as the server sends it (the discrete grid, no walls) and its hidden walls.
+    """
+    walls = random_walls(rng, density)
+    grid = discrete_grid(walls)
+    return MapState(size=len(grid), discrete_grid=grid), walls
+
+
+class WallGrid:
+    """
+    The hidden walls as two boolean grids of cell edges: `horizontal[j, i]` is the edge
+    y = j * CELL between x = i * CELL and (i + 1) * CELL, `vertical[i, j]` the edge
+    x = i * CELL between y = j * CELL and (j + 1) * CELL. Since walls lie on the grid
+    lines, the distance from a point to the walls only needs the nearest line in each
+    direction, which is O(1) per point instead of O(walls).
+
+    `WallGrid.stack` gathers the maps of several matches: the grids gain a leading match
+    axis and `distance_sq` then takes points (matches, ..., 2) or the match of each point.
+    """
+
+    def __init__(self, walls: List[Segment]):
+        # One extra edge on each end of every line, never a wall, so that the neighbours
+        # of any cell can be looked up without bound checks.
+        self.horizontal = np.zeros((Consts.Map.HEIGHT + 1, Consts.Map.WIDTH + 2), dtype=bool)
+        self.vertical = np.zeros((Consts.Map.WIDTH + 1, Consts.Map.HEIGHT + 2), dtype=bool)
+        for x0, y0, x1, y1 in walls:
+            i, j = int(min(x0, x1) // CELL), int(min(y0, y1) // CELL)
+            if y0 == y1:
+                self.horizontal[int(round(y0 / CELL)), i + 1] = True
+            else:
+                self.vertical[int(round(x0 / CELL)), j + 1] = True
+
+    @classmethod
+    def stack(cls, maps: List[List[Segment]]) -> 'WallGrid':
+        grids = [cls(walls) for walls in maps]
+        stacked = cls([])
+        stacked.horizontal = np.stack([grid.horizontal for grid in grids])
+        stacked.vertical = np.stack([grid.vertical for grid in grids])
+        return stacked
+
+    @staticmethod
+    def _line_distance_sq(across: np.ndarray, along: np.ndarray, edges: np.ndarray,
+                          match: Optional[np.ndarray] = None) -> np.ndarray:
+        line = np.minimum(np.maximum(np.rint(across / CELL), 0), edges.shape[-2] - 1).astype(np.intp)
+        cell = np.minimum(np.maximum(np.floor(along / CELL), 0), edges.shape[1] - 3).astype(np.intp)
+
+        index = cell[..., None] + NEIGHBOURS
+        along = along[..., None]
+        d_along = np.maximum(0.0, np.maximum(index * CELL - along, along - (index + 1) * CELL))
+        d_across = (across - line * CELL)[..., None]
+        d = d_across * d_across + d_along * d_along
+
+        if edges.ndim == 2:
+            walls = edges[line[..., None], index + 1]
+        else:
+            if match is None:
+                match = np.arange(len(edges)).reshape((-1,) + (1,) * (line.ndim - 1))
+            walls = edges[match[..., None], line[..., None], index + 1]
+        return np.where(walls, d, np.inf).min(axis=-1)
+
+    def distance_sq(self, points: np.ndarray, match: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        The squared distance from every point (..., 2) to the nearest wall, exact below
+        half a cell. With stacked grids, `match` gives the match of every point, otherwise
+        the points are (matches, ..., 2).
+        """
+        x, y = points[..., 0], points[..., 1]
+        return np.minimum(
+            self._line_distance_sq(x, y, self.vertical, match),
+            self._line_distance_sq(y, x, self.horizontal, match),
+        )
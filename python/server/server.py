@@ -0,0 +1,190 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, Optional, Set
+
+from websockets.asyncio.server import ServerConnection, broadcast, serve
+from websockets.exceptions import ConnectionClosed
+
+from core.consts import Consts
+from core.logger import get_logger
+from core.message import MessageType
+from core.telemetry import Histogram
+from network.encoder import JDISEncoder
+from server.game import Game
+from sim.batch import SUBSTEPS
+
+
+log = get_logger("server")
+
+
+def parse_actions(message) -> Optional[dict]:
+    """
+    Reads a message sent by `Socket.encode_actions`: the ClientActions type byte followed by
+    a JSON object (or list of actions). Keepalive pings and malformed messages give None.
+    """
+    if isinstance(message, str):
+        message = message.encode()
+    if not message or message[0] != 3:
+        return None
+
+    try:
+        actions = json.loads(message[1:])
+    except ValueError:
+        return None
+
+    if isinstance(actions, list):
+        merged = {}
+        for action in actions:
+            merged.update(action)
+        actions = merged
+    return actions if isinstance(actions, dict) else None
+
+
+class GameServer:
+    """
+    Local stand-in for the game server: every connection is a player named by its
+    Authorization header, the game is simulated by `Game` and a GameState is broadcast to
+    the alive players every `tick_duration` seconds (lower than `Game.TICK_DURATION` to
+    load test at an accelerated rate). The delay between a GameState and the first action
+    that answers it is measured per player.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 8088,
+                 tick_duration: float = Consts.Game.TICK_DURATION, games: int = 0,
+                 seed: Optional[int] = None, density: float = 0.8):
+        self.host = host
+        self.port = port
+        self.tick_duration = tick_duration
+        self.games = games
+        self.density = density
+        self.rng = random.Random(seed)
+        self.encoder = JDISEncoder()
+
+        self.game = Game(self.rng, density)
+        self.played = 0
+        self.clients: Dict[str, ServerConnection] = {}
+
+        self.tick_sent = 0.0
+        self.sent_to: Set[str] = set()
+        self.answered: Set[str] = set()
+        self.latency = Histogram()
+        self.missed = 0
+        self.late_ticks = 0
+
+
+    def run(self) -> None:
+        asyncio.run(self.run_async())
+
+
+    async def run_async(self) -> None:
+        async with serve(self.handle, self.host, self.port, max_size=None, ping_interval=None):
+            log.info("Serving on ws://%s:%d, one tick every %.0f ms", self.host, self.port,
+                     self.tick_duration * 1000)
+            await self.tick_loop()
+
+
+    async def handle(self, connection: ServerConnection) -> None:
+        name = connection.request.headers.get("Authorization") or f"player-{id(connection):x}"
+        previous = self.clients.get(name)
+        if previous is not None:
+            await previous.close()
+
+        self.clients[name] = connection
+        self.game.join(name)
+        log.info("%s joined (%d players)", name, len(self.clients))
+        await connection.send(self.encoder.encode_map_state(self.game.map_state_for(name)))
+
+        try:
+            async for message in connection:
+                actions = parse_actions(message)
+                if actions is None:
+                    continue
+
+                elapsed = time.perf_counter() - self.tick_sent
+                if name in self.sent_to and name not in self.answered:
+                    self.answered.add(name)
+                    self.latency.record(elapsed * 1e6)
+                self.game.act(name, actions, self.action_loop(elapsed))
+        except ConnectionClosed:
+            pass
+        finally:
+            if self.clients.get(name) is connection:
+                del self.clients[name]
+                log.info("%s left (%d players)", name, len(self.clients))
+
+
+    def action_loop(self, elapsed: float) -> int:
+        """
+        The action loop of the next step that applies a message received `elapsed` seconds
+        after the last GameState was sent: the step replays the tick's `SUBSTEPS` action loops,
+        each with the messages received during it.
+        """
+        return min(int(elapsed / (self.tick_duration / SUBSTEPS)), SUBSTEPS - 1)
+
+
+    async def tick_loop(self) -> None:
+        deadline = time.perf_counter()
+        while self.games == 0 or self.played < self.games:
+            deadline += self.tick_duration
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                self.late_ticks += 1
+                deadline = time.perf_counter()
+
+            if not self.clients:
+                continue
+
+            self.tick()
+            if self.game.finished:
+                await self.end_game()
+
+
+    def tick(self) -> None:
+        self.missed += len(self.sent_to - self.answered)
+
+        self.game.step()
+        frame = self.encoder.encode_game_state(self.game.game_state())
+
+        self.sent_to = {name for name in self.clients if self.game.is_alive(name)}
+        self.answered = set()
+        self.tick_sent = time.perf_counter()
+        broadcast([self.clients[name] for name in self.sent_to], frame)
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("tick %d: %d bytes to %d players", self.game.tick, len(frame), len(self.clients))
+
+
+    async def end_game(self) -> None:
+        broadcast(list(self.clients.values()), bytes([MessageType.GameEnd.value]))
+        self.played += 1
+        self.report()
+
+        if self.games and self.played >= self.games:
+            return
+
+        self.game = Game(self.rng, self.density)
+        self.sent_to = set()
+        for name, connection in list(self.clients.items()):
+            self.game.join(name)
+            try:
+                await connection.send(self.encoder.encode_map_state(self.game.map_state_for(name)))
+            except ConnectionClosed:
+                pass
+
+
+    def report(self) -> None:
+        scores = sorted(self.game.scores.items(), key=lambda item: -item[1])
+        log.info("game %d over: %s", self.played, " ".join(f"{name}={score}" for name, score in scores))
+        summary = self.latency.summary()
+        log.info("response_us: %s missed=%d late_ticks=%d",
+                 " ".join(f"{key}={value}" for key, value in summary.items()), self.missed, self.late_ticks,
+                 extra={"summary": "response_us", **summary, "missed": self.missed, "late_ticks": self.late_ticks})
+
+        self.latency = Histogram()
+        self.missed = 0
+        self.late_ticks = 0
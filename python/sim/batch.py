@@ -0,0 +1,368 @@
+import math
+import random
+import uuid
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.consts import Consts
+from core.game_state import Blade, Coin, GameState, PlayerInfo, PlayerWeapon, Projectile
+from core.map_state import MapState, Point
+from server.maps import WallGrid, random_map
+from src.map_geometry import points_segments_distance_sq
+
+
+MAP_SIZE = Consts.Map.WIDTH * Consts.Map.CELL_WIDTH
+SUBSTEPS = 10
+
+PLAYER_RADIUS = Consts.Player.SIZE / 2
+HIT_RADIUS = (Consts.Player.SIZE + Consts.Projectile.SIZE) / 2
+BLADE_RADIUS = (Consts.Player.SIZE + Consts.Blade.THICKNESS) / 2
+COIN_RADIUS = (Consts.Player.SIZE + Consts.Coin.SIZE) / 2
+TREASURE_RADIUS = (Consts.Player.SIZE + Consts.Treasure.SIZE) / 2
+PROJECTILE_RANGE = Consts.Projectile.SPEED * Consts.Projectile.TTL
+
+NO_SWITCH = -1
+
+
+class Orders:
+    """
+    The actions of one tick for every player of every match, as arrays: a NaN destination,
+    shot or blade angle and a `NO_SWITCH` weapon mean the player did not send that action.
+    """
+
+    def __init__(self, matches: int, players: int):
+        self.dest = np.full((matches, players, 2), np.nan)
+        self.shoot = np.full((matches, players, 2), np.nan)
+        self.switch = np.full((matches, players), NO_SWITCH, dtype=np.int64)
+        self.rotate = np.full((matches, players), np.nan)
+
+    def add(self, match: int, player: int, actions: dict) -> None:
+        """
+        Adds the actions of a player in their serialized form (`{"dest": {"x", "y"}, ...}`),
+        as the server receives them.
+        """
+        if "dest" in actions:
+            self.dest[match, player] = actions["dest"]["x"], actions["dest"]["y"]
+        if "shoot" in actions:
+            self.shoot[match, player] = actions["shoot"]["x"], actions["shoot"]["y"]
+        if "switch" in actions:
+            self.switch[match, player] = int(actions["switch"])
+        if "rotate_blade" in actions:
+            self.rotate[match, player] = float(actions["rotate_blade"])
+
+
+class BatchGame:
+    """
+    Headless simulation of `matches` independent games with the same number of players,
+    stepped together. Every object lives in NumPy arrays with a leading match axis (players
+    (M, P), projectiles (M, K), coins (M, C)) and every tick is simulated in `SUBSTEPS`
+    steps, each of them vectorized over every object of every match:
+
+    - players move toward their destination and stop in front of the hidden walls;
+    - projectiles fly in a straight line for `Projectile.TTL` seconds, walls stop them and
+      they deal `Projectile.DAMAGE` to the nearest player they touch;
+    - blades deal `Blade.DAMAGE` per step of contact (up to 10x per tick);
+    - coins are worth their value and reappear elsewhere, the treasure of the second
+      phase only once;
+    - dead players disappear for `Player.RESPAWN_TIME` seconds.
+
+    Damage dealt is also scored by the attacker. Projectile slots are reused once free and
+    the arrays only grow when a match runs out of them.
+    """
+
+    def __init__(self, matches: int = 1, names: Sequence[str] = (), rng: Optional[random.Random] = None,
+                 density: float = 0.8, coins: int = Consts.Coin.QUANTITY):
+        self.rng = rng or random.Random()
+        self.np_rng = np.random.default_rng(self.rng.getrandbits(64))
+        self.matches = matches
+
+        generated = [random_map(self.rng, density) for _ in range(matches)]
+        self.map_states: List[MapState] = [map_state for map_state, _ in generated]
+        self.wall_grid = WallGrid.stack([walls for _, walls in generated])
+
+        self.tick = 0
+        self.round = 1
+        self.time = 0.0
+        self._uid = 0
+
+        self.names: List[str] = []
+        self.colors = np.empty((matches, 0), dtype=np.int64)
+        self.pos = np.empty((matches, 0, 2))
+        self.dest = np.empty((matches, 0, 2))
+        self.health = np.empty((matches, 0), dtype=np.int64)
+        self.score = np.empty((matches, 0), dtype=np.int64)
+        self.weapon = np.empty((matches, 0), dtype=np.int64)
+        self.rotation = np.empty((matches, 0))
+        self.respawn_at = np.empty((matches, 0))
+
+        self.projectile_live = np.zeros((matches, 0), dtype=bool)
+        self.projectile_uid = np.zeros((matches, 0), dtype=np.int64)
+        self.projectile_pos = np.zeros((matches, 0, 2))
+        self.projectile_dir = np.zeros((matches, 0, 2))
+        self.projectile_owner = np.zeros((matches, 0), dtype=np.intp)
+        self.projectile_born = np.zeros((matches, 0))
+
+        self.coin_live = np.ones((matches, coins), dtype=bool)
+        self.coin_uid = self.new_uids((matches, coins))
+        self.coin_pos = self.random_positions((matches, coins))
+        self.coin_value = np.full((matches, coins), Consts.Coin.VALUE, dtype=np.int64)
+
+        for name in names:
+            self.add_player(name)
+
+    @property
+    def finished(self) -> bool:
+        return self.tick >= Consts.Game.TICKS_PER_GAME
+
+    @property
+    def alive(self) -> np.ndarray:
+        return self.respawn_at <= self.time
+
+    def new_uids(self, shape) -> np.ndarray:
+        count = int(np.prod(shape))
+        uids = np.arange(self._uid + 1, self._uid + 1 + count, dtype=np.int64).reshape(shape)
+        self._uid += count
+        return uids
+
+    def random_positions(self, shape) -> np.ndarray:
+        """
+        Random points (*shape, 2), each at least a player size away from the edges of its cell.
+        """
+        cell = self.np_rng.integers(0, Consts.Map.WIDTH, (*shape, 2)) * Consts.Map.CELL_WIDTH
+        return cell + self.np_rng.uniform(Consts.Player.SIZE, Consts.Map.CELL_WIDTH - Consts.Player.SIZE, (*shape, 2))
+
+    def add_player(self, name: str) -> int:
+        """
+        Adds a player to every match, at a random position, and returns its index.
+        """
+        pos = self.random_positions((self.matches, 1))
+        self.names.append(name)
+        self.colors = np.hstack([self.colors, self.np_rng.integers(0, 1 << 24, (self.matches, 1))])
+        self.pos = np.hstack([self.pos, pos])
+        self.dest = np.hstack([self.dest, pos])
+        self.health = np.hstack([self.health, np.full((self.matches, 1), Consts.Player.MAX_HEALTH)])
+        self.score = np.hstack([self.score, np.zeros((self.matches, 1), dtype=np.int64)])
+        self.weapon = np.hstack([self.weapon, np.full((self.matches, 1), int(PlayerWeapon.PlayerWeaponNone))])
+        self.rotation = np.hstack([self.rotation, np.zeros((self.matches, 1))])
+        self.respawn_at = np.hstack([self.respawn_at, np.zeros((self.matches, 1))])
+        return len(self.names) - 1
+
+    def orders(self) -> Orders:
+        return Orders(self.matches, len(self.names))
+
+    # --- Simulation -------------------------------------------------------------------------
+
+    def apply(self, orders: Orders) -> None:
+        alive = self.alive
+
+        moving = alive & ~np.isnan(orders.dest[..., 0])
+        self.dest[moving] = np.clip(orders.dest[moving], 0.0, MAP_SIZE)
+
+        switching = alive & np.isin(orders.switch, [int(weapon) for weapon in PlayerWeapon])
+        self.weapon[switching] = orders.switch[switching]
+
+        rotating = alive & ~switching & ~np.isnan(orders.rotate) & (self.weapon == PlayerWeapon.PlayerWeaponBlade)
+        self.rotation[rotating] = orders.rotate[rotating]
+
+        delta = orders.shoot - self.pos
+        length = np.hypot(delta[..., 0], delta[..., 1])
+        shooting = alive & ~switching & (self.weapon == PlayerWeapon.PlayerWeaponCanon) & (length > 0)
+        if shooting.any():
+            self.launch(shooting, delta / np.where(shooting, length, 1.0)[..., None])
+
+    def launch(self, shooting: np.ndarray, direction: np.ndarray) -> None:
+        """
+        Puts the new projectiles of the `shooting` players (M, P) in the free slots of their
+        match, growing the projectile arrays when a match has too few of them.
+        """
+        count = shooting.sum(axis=1)
+        missing = int((count - (~self.projectile_live).sum(axis=1)).max())
+        if missing > 0:
+            grow = max(missing, self.projectile_live.shape[1])
+            self.projectile_live = np.hstack([self.projectile_live, np.zeros((self.matches, grow), dtype=bool)])
+            self.projectile_uid = np.hstack([self.projectile_uid, np.zeros((self.matches, grow), dtype=np.int64)])
+            self.projectile_pos = np.hstack([self.projectile_pos, np.zeros((self.matches, grow, 2))])
+            self.projectile_dir = np.hstack([self.projectile_dir, np.zeros((self.matches, grow, 2))])
+            self.projectile_owner = np.hstack([self.projectile_owner, np.zeros((self.matches, grow), dtype=np.intp)])
+            self.projectile_born = np.hstack([self.projectile_born, np.zeros((self.matches, grow))])
+
+        match, player = np.nonzero(shooting)
+        rank = (np.cumsum(shooting, axis=1) - 1)[match, player]
+        free_first = np.argsort(self.projectile_live, axis=1, kind="stable")
+        slot = free_first[match, rank]
+
+        self.projectile_live[match, slot] = True
+        self.projectile_uid[match, slot] = self.new_uids(len(slot))
+        self.projectile_pos[match, slot] = self.pos[match, player]
+        self.projectile_dir[match, slot] = direction[match, player]
+        self.projectile_owner[match, slot] = player
+        self.projectile_born[match, slot] = self.time
+
+    def substep(self, dt: float) -> None:
+        alive = self.alive
+        players = len(self.names)
+        damage = np.zeros_like(self.health)
+        dealt = np.zeros_like(self.score)
+
+        # Players: a step that brings a player closer to a wall than its radius is refused.
+        delta = self.dest - self.pos
+        distance = np.hypot(delta[..., 0], delta[..., 1])
+        step = np.minimum(Consts.Player.SPEED * dt, distance) / np.where(distance > 0, distance, 1.0)
+        moved = self.pos + delta * step[..., None]
+        walls = self.wall_grid.distance_sq(np.concatenate([self.pos, moved], axis=1))
+        before, after = walls[:, :players], walls[:, players:]
+        blocked = (after < PLAYER_RADIUS ** 2) & (after < before)
+        self.pos = np.where((alive & ~blocked)[..., None], moved, self.pos)
+
+        # Projectiles: range, walls and the nearest player other than the owner. Only the
+        # live slots are simulated, flattened over the matches.
+        match, slot = np.nonzero(self.projectile_live)
+        if len(match):
+            pos = self.projectile_pos[match, slot] + self.projectile_dir[match, slot] * (Consts.Projectile.SPEED * dt)
+            self.projectile_pos[match, slot] = pos
+            keep = self.time - self.projectile_born[match, slot] < Consts.Projectile.TTL
+            keep &= self.wall_grid.distance_sq(pos, match) > (Consts.Projectile.SIZE / 2) ** 2
+
+            dx = pos[:, None, 0] - self.pos[match, :, 0]
+            dy = pos[:, None, 1] - self.pos[match, :, 1]
+            distance = dx * dx + dy * dy
+            owner = self.projectile_owner[match, slot]
+            hits = (distance < HIT_RADIUS ** 2) & alive[match] & keep[:, None]
+            hits &= owner[:, None] != np.arange(players)
+            hit = hits.any(axis=1)
+            if hit.any():
+                target = np.argmin(np.where(hits[hit], distance[hit], np.inf), axis=1)
+                np.add.at(damage, (match[hit], target), Consts.Projectile.DAMAGE)
+                np.add.at(dealt, (match[hit], owner[hit]), Consts.Projectile.DAMAGE)
+                keep &= ~hit
+            self.projectile_live[match, slot] = keep
+
+        # Blades: touching[m, target, attacker].
+        armed = alive & (self.weapon == PlayerWeapon.PlayerWeaponBlade)
+        if armed.any():
+            ends = self.pos + Consts.Blade.LENGTH * np.stack([np.cos(self.rotation), np.sin(self.rotation)], axis=-1)
+            touching = points_segments_distance_sq(self.pos, self.pos, ends) < BLADE_RADIUS ** 2
+            touching &= alive[:, :, None] & armed[:, None, :] & ~np.eye(players, dtype=bool)
+            damage += touching.sum(axis=2) * Consts.Blade.DAMAGE
+            dealt += touching.sum(axis=1) * Consts.Blade.DAMAGE
+
+        self.health -= damage
+        self.score += dealt
+        dead = alive & (self.health <= 0)
+        if dead.any():
+            self.kill(dead)
+            alive &= ~dead
+
+        # Coins and treasure: the nearest player takes it.
+        if self.coin_live.any():
+            dx = self.coin_pos[:, :, None, 0] - self.pos[:, None, :, 0]
+            dy = self.coin_pos[:, :, None, 1] - self.pos[:, None, :, 1]
+            distance = dx * dx + dy * dy
+            radius = np.where(self.coin_value >= Consts.Treasure.VALUE, TREASURE_RADIUS, COIN_RADIUS)
+            reached = (distance < (radius ** 2)[..., None]) & alive[:, None, :] & self.coin_live[..., None]
+            match, coin = np.nonzero(reached.any(axis=-1))
+            if len(match):
+                player = np.argmin(np.where(reached[match, coin], distance[match, coin], np.inf), axis=-1)
+                np.add.at(self.score, (match, player), self.coin_value[match, coin])
+
+                treasure = self.coin_value[match, coin] >= Consts.Treasure.VALUE
+                self.coin_live[match[treasure], coin[treasure]] = False
+                match, coin = match[~treasure], coin[~treasure]
+                self.coin_pos[match, coin] = self.random_positions((len(match),))
+                self.coin_uid[match, coin] = self.new_uids(len(match))
+
+        self.time += dt
+
+    def kill(self, dead: np.ndarray) -> None:
+        """
+        A dead player comes back after `Player.RESPAWN_TIME`, elsewhere, with full health
+        and no destination.
+        """
+        pos = self.random_positions(self.pos.shape[:2])
+        self.respawn_at[dead] = self.time + Consts.Player.RESPAWN_TIME
+        self.pos[dead] = pos[dead]
+        self.dest[dead] = pos[dead]
+        self.health[dead] = Consts.Player.MAX_HEALTH
+
+    def start_treasure_phase(self) -> None:
+        """
+        Removes the coins, puts the treasure near the center and the players on a circle
+        around it, at the same distance.
+        """
+        self.round = 2
+        center = MAP_SIZE / 2 + self.np_rng.uniform(-10.0, 10.0, (self.matches, 1, 2))
+        self.coin_live = np.ones((self.matches, 1), dtype=bool)
+        self.coin_uid = self.new_uids((self.matches, 1))
+        self.coin_pos = center
+        self.coin_value = np.full((self.matches, 1), Consts.Treasure.VALUE, dtype=np.int64)
+
+        players = len(self.names)
+        angles = (self.np_rng.uniform(0, 2 * math.pi, (self.matches, 1))
+                  + np.linspace(0, 2 * math.pi, players, endpoint=False))
+        self.pos = center + 25.0 * np.stack([np.cos(angles), np.sin(angles)], axis=-1)
+        self.dest = self.pos.copy()
+        self.projectile_live[:] = False
+
+    def step(self, orders: Optional[Orders] = None, later: Sequence[Tuple[int, Orders]] = ()) -> None:
+        """
+        Simulates one tick of every match. The `later` orders, as (substep, orders) pairs, are
+        applied before their substep, as the server applies the actions received during the
+        tick at its next action loop.
+        """
+        if orders is not None:
+            self.apply(orders)
+
+        later = sorted(later, key=lambda pair: pair[0])
+        dt = Consts.Game.TICK_DURATION / SUBSTEPS
+        for index in range(SUBSTEPS):
+            while later and later[0][0] <= index:
+                self.apply(later.pop(0)[1])
+            self.substep(dt)
+
+        self.tick += 1
+        if self.tick == Consts.Game.TICKS_SECONS_STAGE_START:
+            self.start_treasure_phase()
+
+    # --- Protocol ---------------------------------------------------------------------------
+
+    def game_state(self, match: int = 0) -> GameState:
+        """
+        The state of a match as the server sends it: the dead players are left out and a
+        projectile's destination is the end of its range.
+        """
+        g = GameState(current_tick=self.tick, current_round=self.round)
+        live = np.nonzero(self.projectile_live[match])[0]
+        remaining = PROJECTILE_RANGE - (self.time - self.projectile_born[match, live]) * Consts.Projectile.SPEED
+        pos = self.projectile_pos[match, live]
+        dest = pos + self.projectile_dir[match, live] * remaining[:, None]
+
+        projectiles: List[List[Projectile]] = [[] for _ in self.names]
+        for uid, owner, (x, y), (dx, dy) in zip(self.projectile_uid[match, live].tolist(),
+                                                self.projectile_owner[match, live].tolist(),
+                                                pos.tolist(), dest.tolist()):
+            projectiles[owner].append(Projectile(str(uuid.UUID(int=uid)), Point(x, y), Point(dx, dy)))
+
+        for i in np.nonzero(self.alive[match])[0].tolist():
+            x, y = self.pos[match, i].tolist()
+            rotation = float(self.rotation[match, i])
+            end = Point(x + Consts.Blade.LENGTH * math.cos(rotation), y + Consts.Blade.LENGTH * math.sin(rotation))
+            g.players.append(PlayerInfo(
+                name=self.names[i],
+                color=int(self.colors[match, i]),
+                health=int(self.health[match, i]),
+                score=int(self.score[match, i]),
+                pos=Point(x, y),
+                dest=Point(*self.dest[match, i].tolist()),
+                playerWeapon=PlayerWeapon(int(self.weapon[match, i])),
+                projectiles=projectiles[i],
+                blade=Blade(Point(x, y), end, rotation),
+            ))
+
+        live = np.nonzero(self.coin_live[match])[0]
+        g.coins = [
+            Coin(str(uuid.UUID(int=uid)), value, Point(x, y))
+            for uid, value, (x, y) in zip(self.coin_uid[match, live].tolist(), self.coin_value[match, live].tolist(),
+                                          self.coin_pos[match, live].tolist())
+        ]
+        return g
@@ -0,0 +1,169 @@
+"""
+Plays `MyBot` against scripted opponents in many simulated matches at once, as fast as
+the bot can answer, and reports its scores.
+
+    python -m sim.evaluate
+    python -m sim.evaluate -m 32 -o 5 -s 1
+    python -m sim.evaluate --scripted -m 256      # simulator throughput only
+"""
+import argparse
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from core import logger
+from core.action import LOOP_DURATION, Action, ActionPlan
+from core.consts import Consts
+from core.game_state import PlayerWeapon
+from core.logger import get_logger
+from sim.batch import PROJECTILE_RANGE, SUBSTEPS, BatchGame, Orders
+from src.bot import MyBot
+
+
+log = get_logger("sim")
+
+
+def scripted_orders(game: BatchGame, orders: Orders, players: slice) -> None:
+    """
+    A simple vectorized opponent: it holds the canon, walks to the nearest coin and shoots
+    at the nearest alive enemy in range.
+    """
+    pos = game.pos
+    dx = game.coin_pos[:, None, :, 0] - pos[:, :, None, 0]
+    dy = game.coin_pos[:, None, :, 1] - pos[:, :, None, 1]
+    coins = np.where(game.coin_live[:, None, :], dx * dx + dy * dy, np.inf)
+    nearest = np.argmin(coins, axis=2)
+    dest = np.take_along_axis(game.coin_pos, nearest[..., None], axis=1)
+
+    dx = pos[:, None, :, 0] - pos[:, :, None, 0]
+    dy = pos[:, None, :, 1] - pos[:, :, None, 1]
+    enemies = dx * dx + dy * dy
+    enemies[:, np.eye(len(game.names), dtype=bool)] = np.inf
+    enemies = np.where(game.alive[:, None, :], enemies, np.inf)
+    target = np.argmin(enemies, axis=2)
+    in_range = np.take_along_axis(enemies, target[..., None], axis=2)[..., 0] < PROJECTILE_RANGE ** 2
+    shoot = np.where(in_range[..., None], np.take_along_axis(pos, target[..., None], axis=1), np.nan)
+
+    orders.dest[:, players] = dest[:, players]
+    orders.shoot[:, players] = shoot[:, players]
+    canon = game.weapon[:, players] == PlayerWeapon.PlayerWeaponCanon
+    orders.switch[:, players] = np.where(canon, orders.switch[:, players], int(PlayerWeapon.PlayerWeaponCanon))
+
+
+@dataclass
+class Evaluation:
+    names: List[str]
+    scores: np.ndarray
+    ticks: int
+    sim_seconds: float
+    bot_seconds: float
+    errors: int
+
+    @property
+    def ranks(self) -> np.ndarray:
+        """
+        The rank of the first player in every match, 1 being the best score.
+        """
+        return 1 + (self.scores[:, 1:] > self.scores[:, :1]).sum(axis=1)
+
+    @property
+    def match_ticks_per_second(self) -> float:
+        return len(self.scores) * self.ticks / max(self.sim_seconds, 1e-9)
+
+
+def serialize(actions: Iterable[Action]) -> dict:
+    """
+    Merges actions as the server reads them, the last one of each kind wins.
+    """
+    merged = {}
+    for action in actions:
+        merged.update(action.serialize())
+    return merged
+
+
+def evaluate(bot_factory: Optional[Callable[[], MyBot]] = MyBot, matches: int = 8, opponents: int = 3,
+             seed: Optional[int] = None, ticks: int = Consts.Game.TICKS_PER_GAME,
+             density: float = 0.8) -> Evaluation:
+    """
+    Plays `matches` games of `ticks` ticks, a bot from `bot_factory` against `opponents`
+    scripted players in each of them. Without a factory, every player is scripted.
+    """
+    bots = [bot_factory() for _ in range(matches)] if bot_factory else []
+    names = ([bots[0].name] if bots else ["scripted-0"]) + [f"scripted-{i + 1}" for i in range(opponents)]
+    game = BatchGame(matches, names, random.Random(seed), density)
+    scripted = slice(1 if bots else 0, None)
+
+    for bot, map_state in zip(bots, game.map_states):
+        bot.on_start(map_state)
+
+    sim_seconds = bot_seconds = 0.0
+    errors = 0
+    for _ in range(ticks):
+        start = time.perf_counter()
+        orders = game.orders()
+        later: Dict[int, Orders] = {}
+        scripted_orders(game, orders, scripted)
+        middle = time.perf_counter()
+
+        alive = game.alive[:, 0]
+        for match, bot in enumerate(bots):
+            if not alive[match]:
+                continue
+            try:
+                actions = bot.on_tick(game.game_state(match))
+            except Exception:
+                log.exception("on_tick failed in match %d", match)
+                errors += 1
+                continue
+            plan = ActionPlan.of(actions)
+            orders.add(match, 0, serialize(plan.first()))
+            for offset, step in plan.later():
+                loop = math.ceil(offset / LOOP_DURATION - 1e-9)
+                if loop < SUBSTEPS:
+                    later.setdefault(loop, game.orders()).add(match, 0, serialize(step))
+
+        end = time.perf_counter()
+        game.step(orders, later.items())
+        sim_seconds += middle - start + time.perf_counter() - end
+        bot_seconds += end - middle
+
+    for match, bot in enumerate(bots):
+        try:
+            bot.on_end()
+        except Exception:
+            log.exception("on_end failed in match %d", match)
+            errors += 1
+
+    return Evaluation(names, game.score.copy(), ticks, sim_seconds, bot_seconds, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluates the bot in simulated matches")
+    parser.add_argument("-m", "--matches", type=int, default=8, help="Number of matches played at once")
+    parser.add_argument("-o", "--opponents", type=int, default=3, help="Number of scripted opponents per match")
+    parser.add_argument("-n", "--ticks", type=int, default=Consts.Game.TICKS_PER_GAME, help="Ticks per match")
+    parser.add_argument("-s", "--seed", type=int, help="The seed of the maps and of the simulation")
+    parser.add_argument("-d", "--density", type=float, default=0.8, help="The probability that a cell edge is a wall")
+    parser.add_argument("--scripted", action="store_true", help="If set, the bot is replaced by a scripted player")
+    parser.add_argument("-l", "--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    logger.configure(args.log_level)
+    result = evaluate(None if args.scripted else MyBot, args.matches, args.opponents, args.seed, args.ticks,
+                      args.density)
+    logger.shutdown()
+
+    mean = result.scores.mean(axis=0)
+    for name, score in zip(result.names, mean):
+        print(f"{name:<16} {score:>8.1f}")
+    print(f"rank {result.ranks.mean():.2f} (wins {np.mean(result.ranks == 1):.0%}), {result.errors} errors")
+    print(f"{len(result.scores)} x {result.ticks} ticks: simulation {result.sim_seconds:.2f}s "
+          f"({result.match_ticks_per_second:.0f} match-ticks/s), bot {result.bot_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,32 @@
+import logging
 import random
-from typing import List, Union
+import time
+from typing import List, Optional, Tuple, Union
 import math
-import json
-from core.action import MoveAction, ShootAction, RotateBladeAction, SwitchWeaponAction, SaveAction
+import numpy as np
+from core.action import LOOP_DURATION, ActionPlan, MoveAction, ShootAction, RotateBladeAction, SwitchWeaponAction, SaveAction
 from core.consts import Consts
+from core.game_arrays import GameStateArrays
 from core.game_state import GameState, PlayerWeapon, Point
+from core.logger import get_logger
 from core.map_state import MapState
+from core.scheduler import Stage, TickScheduler
+from src.dodge import DodgeEngine
+from src.exploration import ExplorationPlanner
+from src.lookahead import LookaheadPlanner
+from src.map_cache import MAP_CACHE
+from src.map_geometry import MapGeometry
+from src.pathfinding import Pathfinder
+from src.routing import RoutePlanner
+from src.targeting import Targeting
+from src.treasure import TreasureMode, TreasurePlanner
+from src.wall_belief import WallBelief
+from src.wall_codec import decode_walls, encode_walls
+
+
+log = get_logger("bot")
+tick_log = get_logger("bot.tick")
+map_log = get_logger("bot.map")
 
 
 class MyBot:
@@ -19,31 +40,31 @@ class MyBot:
      __map_state: MapState
      name : str
      blade_rotation_angle: float
-     coin_count: int
      weapon_set: bool
      
      def __init__(self):
           self.name = "CaBourré"
           self.pos_player = None
-          self.walls = set()
+          self.map_key = None
+          self.geometry = MapGeometry()
+          self.belief = WallBelief()
+          self.pathfinder = Pathfinder(self.geometry, belief=self.belief)
+          self.rebuilt_at = 0
+          self.rebuilt_version = self.belief.version
+          self.last_dest = None
+          self.saved = b''
+          self.saved_version = None
+          self.exploring = False
+          self.bind_map()
           self.dodge = False
           self.temp_x = None
           self.temp_y = None
           self.blade_rotation_angle = 0.0
           self.weapon_set = False
-          border_walls = [
-               # Bot, Top, Left, Right
-               {('y', 0), ('x_left', 0), ('x_right', 100)},
-               {('y', 100), ('x_left', 0), ('x_right', 100)},
-               {('x', 0), ('y_bottom', 0), ('y_top', 100)},
-               {('x', 100), ('y_bottom', 0), ('y_top', 100)}
-          ]
-          # Adding walls to set
-          for wall in border_walls:
-               self.walls.add(tuple(wall))
-
-
-     def on_tick(self, game_state: GameState) -> List[Union[MoveAction, SwitchWeaponAction, RotateBladeAction, ShootAction, SaveAction]]:
+          self.scheduler = TickScheduler()
+
+
+     def on_tick(self, game_state: GameState) -> Union[ActionPlan, List[Union[MoveAction, SwitchWeaponAction, RotateBladeAction, ShootAction, SaveAction]]]:
           """
           (fr)    Cette méthode est appelée à chaque tick de jeu. Vous pouvez y définir 
                     le comportement de votre bot. Elle doit retourner une liste d'actions 
@@ -89,20 +110,42 @@ class MyBot:
                     - BladeRotateAction(rad)    if you have the blade as a weapon, you can set your
                                                 weapon to the given rotation in radians.
 
+          (fr)    Au lieu d'une liste, on peut retourner un `ActionPlan`: des actions à envoyer plus tard dans
+                    le tick, que le serveur appliquera à la boucle d'actions correspondante.
+          (en)    Instead of a list, an `ActionPlan` can be returned: actions to send later in the tick, that
+                    the server applies at the matching action loop.
+
           Arguments:
                game_state (GameState): (fr): L'état de la partie.
                                         (en): The state of the game.   
           """
 
           """ ----------------------------------------------------------------------------------------- """
-          print(f"Current tick: {game_state.current_tick}")
+          tick_log.debug("Current tick: %d", game_state.current_tick)
 
           actions = []
 
-          print(self.walls)
+          if map_log.isEnabledFor(logging.DEBUG):
+               map_log.debug("%s", self.geometry)
 
-          # Get new position
-          new_pos = self.find_player_coordinates(game_state.players, self.name)
+          budget = self.scheduler.current
+          if budget is None or budget.tick != game_state.current_tick:
+               budget = self.scheduler.begin_tick(game_state.current_tick)
+
+          with budget.stage(Stage.Perception):
+               # Get new position
+               arrays = GameStateArrays.of(game_state)
+               self_index = arrays.player_index(self.name)
+               new_pos = self.find_player_coordinates(arrays, self.name)
+               if new_pos is None:
+                    return actions
+
+               self.detect_wall(new_pos, arrays)
+               self.targeting.observe(arrays)
+
+          save_action = self.save_walls()
+          if save_action:
+               actions.append(save_action)
           
           # Switch weapon to canon
           if not self.weapon_set:
@@ -134,50 +177,80 @@ class MyBot:
                     self.weapon_set = True
                     self.current_weapon = PlayerWeapon.PlayerWeaponCanon """
         
-          closest_coin = self.coin_finder(game_state, self.name)
-          if closest_coin:
-               print(f"Moving towards coin at position ({closest_coin.pos.x}, {closest_coin.pos.y})")
-               x_dest, y_dest = closest_coin.pos.x, closest_coin.pos.y
+          with budget.stage(Stage.Planning):
+               x_dest, y_dest = new_pos.x, new_pos.y
+               closest_coin = self.coin_finder(arrays, (new_pos.x, new_pos.y), budget.stage_deadline)
+               route_goals = []
+               if closest_coin is not None:
+                    coin_pos = tuple(arrays.coin_pos[closest_coin].tolist())
+                    route_goals = self.route_planner.upcoming()
+                    log.debug("Moving towards coin at position (%s, %s)", *coin_pos)
+                    waypoint = self.pathfinder.next_waypoint((new_pos.x, new_pos.y), coin_pos)
+                    if waypoint:
+                         x_dest, y_dest = waypoint
+                         actions.append(MoveAction((x_dest, y_dest)))
+
+               # (fr) Pendant la première phase, on explore les murs quand c'est plus rentable qu'une pièce
+               # (en) During the first phase, we explore the walls when it pays more than a coin
+               self.exploring = False
+               if game_state.current_tick < Consts.Game.TICKS_SECONS_STAGE_START:
+                    target = self.exploration.plan((new_pos.x, new_pos.y))
+                    coin_rate = 0.0
+                    if closest_coin is not None:
+                         coin_rate = int(arrays.coin_value[closest_coin]) / max(self.pathfinder.distance((new_pos.x, new_pos.y), coin_pos), 1.0)
+                    if target and target.rate > coin_rate:
+                         tick_log.debug("Exploring edge %d (%.2f bits)", target.edge, target.gain)
+                         x_dest, y_dest = target.dest
+                         self.exploring = True
+                         route_goals = []
+
+               # (fr) Phase du trésor: course, ou embuscade contre l'ennemi qui y arrivera avant nous
+               # (en) Treasure phase: race, or ambush the enemy that will get there before us
+               rival = None
+               treasure_plan = self.treasure_planner.plan(arrays, self_index)
+               if treasure_plan:
+                    tick_log.debug("Treasure %s: margin %.1fs", treasure_plan.mode.value, treasure_plan.margin)
+                    x_dest, y_dest = treasure_plan.dest
+                    rival = treasure_plan.rival
+                    self.dodge = False
+                    route_goals = [treasure_plan.treasure] if treasure_plan.mode is TreasureMode.Race else []
+
+               """ rotate_action = self.rotate_blade()
+               actions.append(rotate_action) """
+
+               shoot_action = self.pistol_aimer(arrays, self_index, rival)
+               if shoot_action:
+                    actions.append(shoot_action)
+                    actions.append(MoveAction(shoot_action.target_pos))
+               elif game_state.current_tick < Consts.Game.TICKS_SECONS_STAGE_START:
+                    aim = self.exploration.probe((new_pos.x, new_pos.y), game_state.current_tick)
+                    if aim:
+                         actions.append(ShootAction(aim))
+
+               if self.dodge:
+                    x_dest = self.temp_x
+                    y_dest = self.temp_y
+
+               # (fr) Pendant la course au trésor, chaque détour coûte: on va droit au point de passage
+               # (en) During the treasure race, every detour costs: we go straight to the waypoint
+               if not treasure_plan:
+                    velocity, _, _ = self.targeting.estimated_velocities(arrays)
+                    plan = self.lookahead.plan_for(arrays, self_index, (x_dest, y_dest), velocity, budget.stage_deadline)
+                    if plan.rollouts:
+                         x_dest, y_dest = plan.dest
+                    else:
+                         x_dest, y_dest = self.dodge_engine.plan_for(arrays, self_index, (x_dest, y_dest)).dest
+               
                actions.append(MoveAction((x_dest, y_dest)))
+               self.last_dest = (x_dest, y_dest)
 
-          """ rotate_action = self.rotate_blade()
-          actions.append(rotate_action) """
-
-          shoot_action = self.pistol_aimer(game_state)
-          if shoot_action:
-               actions.append(shoot_action)
-               actions.append(MoveAction(shoot_action.target_pos))
-
-          if self.pos_player and new_pos.x == self.pos_player.x and new_pos.y == self.pos_player.y:
-               new_wall = None
-               if new_pos.x % 10 <= 1:
-                    new_wall = {"x": math.floor(new_pos.x), "y_bottom": math.floor(new_pos.y / 10) * 10, "y_top": math.ceil(new_pos.y / 10) * 10}
-               elif new_pos.x % 10 >= 9:
-                    new_wall = {"x": math.ceil(new_pos.x), "y_bottom": math.floor(new_pos.y / 10) * 10, "y_top": math.ceil(new_pos.y / 10) * 10}
-               elif new_pos.y % 10 <= 1:
-                    new_wall = {"y": math.floor(new_pos.x), "x_left": math.floor(new_pos.x / 10) * 10, "x_right": math.ceil(new_pos.x / 10) * 10}
-               elif new_pos.y % 10 >= 9:
-                    new_wall = {"y": math.ceil(new_pos.y), "x_left": math.floor(new_pos.x / 10) * 10, "x_right": math.ceil(new_pos.x / 10) * 10}    
-
-               if new_wall:
-                    wall_tuple = tuple(new_wall.items())
-                    if wall_tuple not in self.walls:
-                         self.walls.add(wall_tuple)
-                    self.dodge = True 
-                    self.temp_x, self.temp_y = self.generate_new_coords(new_pos.x, new_pos.y)
-
-          
-          self.pos_player = new_pos
-
-          if self.are_coordinates_close(self.temp_x, self.temp_y, new_pos.x, new_pos.y):
-               self.dodge = False
-
-
-          if self.dodge:
-               x_dest = self.temp_x
-               y_dest = self.temp_y
-               
-          actions.append(MoveAction((x_dest, y_dest)))
+               # (fr) Si on atteint le point de passage ou la pièce pendant le tick, on enchaîne sur la suite sans attendre le prochain tick
+               # (en) When we reach the waypoint or the coin during the tick, we go on without waiting for the next tick
+               timeline = ActionPlan().at(0.0, *actions)
+               if route_goals:
+                    elapsed = time.perf_counter() - budget.start
+                    for offset, waypoint in self.waypoint_timeline((new_pos.x, new_pos.y), route_goals, (x_dest, y_dest), elapsed):
+                         timeline.at(offset, MoveAction(waypoint))
 
           """ actions = [
                MoveAction((x_dest, y_dest)),
@@ -186,9 +259,90 @@ class MyBot:
                SaveAction(b"Hello World"),
           ] """
                     
-          return actions
+          return timeline
     
     
+     def waypoint_timeline(self, pos: Tuple[float, float], goals: List[Tuple[float, float]], dest: Tuple[float, float],
+                           elapsed: float = 0.0, reach: float = (Consts.Player.SIZE + Consts.Coin.SIZE) / 2) -> List[Tuple[float, Tuple[float, float]]]:
+          """
+          (fr) Les points suivants du chemin qui passe par `goals` dans l'ordre, chacun avec le moment (s, depuis la
+               réception du GameState) où on atteint le précédent, s'il tombe dans ce tick. Une pièce est atteinte
+               à `reach` de son centre, quand on la ramasse. Rien si `dest` n'est pas le premier point du chemin
+               (un détour de l'évitement par exemple). Le moment compte le temps déjà passé `elapsed` et une boucle
+               d'actions de marge, pour ne jamais couper un coin trop tôt.
+          (en) The next points of the path through `goals` in order, each with the time (s, since the GameState
+               was received) at which we reach the previous one, when it falls within this tick. A coin is reached
+               `reach` away from its center, when we collect it. Nothing when `dest` is not the first point of the
+               path (a dodge detour for instance). The time counts the `elapsed` time and one action loop of
+               margin, so that a corner is never cut too early.
+          """
+          path, reached = [], []
+          start = pos
+          for goal in goals:
+               leg = self.pathfinder.path(start, goal)
+               if not leg:
+                    break
+               path += leg
+               reached += [0.0] * (len(leg) - 1) + [reach]
+               start = goal
+          if len(path) < 2 or math.dist(path[0], dest) > 1e-6:
+               return []
+
+          timeline = []
+          offset = elapsed + LOOP_DURATION
+          previous = pos
+          for current, following, early in zip(path, path[1:], reached):
+               offset += max(math.dist(previous, current) - early, 0.0) / Consts.Player.SPEED
+               if offset >= Consts.Game.TICK_DURATION:
+                    break
+               timeline.append((offset, following))
+               offset += early / Consts.Player.SPEED
+               previous = current
+          return timeline
+
+
+     def detect_wall(self, new_pos: Point, arrays: GameStateArrays, rebuild_every: int = 10):
+          """
+          (fr) Met à jour la croyance sur les murs invisibles: les déplacements des joueurs et des projectiles
+               ouvrent des arêtes, un blocage ou un projectile arrêté rend un mur probable. Les murs presque
+               certains sont ajoutés à la géométrie, et les tables de chemins sont recalculées tout de
+               suite si c'est le cas, sinon au plus tous les `rebuild_every` ticks. Si on est bloqué, on
+               s'éloigne vers un point au hasard.
+          (en) Updates the belief over the invisible walls: the moves of the players and projectiles open
+               edges, a stall or a stopped projectile makes a wall likely. The nearly certain walls are
+               added to the geometry, and the path tables are rebuilt right away when it happens,
+               otherwise at most every `rebuild_every` ticks. When stuck, we move away to a random point.
+          """
+          pos = (new_pos.x, new_pos.y)
+          if self.pos_player:
+               previous = (self.pos_player.x, self.pos_player.y)
+               if pos == previous and self.last_dest and math.dist(pos, self.last_dest) > 0.1:
+                    self.belief.observe_stall(pos, self.last_dest)
+                    if self.exploring:
+                         self.exploration.stalled()
+                    self.dodge = True
+                    self.temp_x, self.temp_y = self.generate_new_coords(new_pos.x, new_pos.y)
+          self.pos_player = new_pos
+          self.belief.observe_players(arrays.player_names, arrays.player_pos)
+          self.belief.observe_projectiles(arrays.projectile_uid_bytes, arrays.projectile_pos, arrays.projectile_dest,
+                                          arrays.player_pos)
+
+          walls = []
+          if self.belief.update():
+               walls = [wall for wall in self.belief.walls() if not self.geometry.has_segment(wall)]
+               if walls:
+                    map_log.debug("%d walls inferred", len(walls))
+                    self.geometry.add_segments(walls)
+          stale = self.belief.version != self.rebuilt_version and arrays.current_tick - self.rebuilt_at >= rebuild_every
+          if walls or stale:
+               self.pathfinder.rebuild()
+               self.rebuilt_at = arrays.current_tick
+               self.rebuilt_version = self.belief.version
+
+          if self.temp_x is not None and self.are_coordinates_close(self.temp_x, self.temp_y, new_pos.x, new_pos.y):
+               self.dodge = False
+
+
      def on_start(self, map_state: MapState):
           """
           (fr) Cette méthode est appelée une seule fois au début de la partie. Vous pouvez y définir des
@@ -202,7 +356,40 @@ class MyBot:
                                    (en) The state of the map.
           """
           self.__map_state = map_state
-          pass
+
+          # (fr) Une reconnexion sur la même carte garde les murs trouvés, et saute `bind_map()` exprès: la tournée
+          #      de pièces et l'historique de visée de la connexion précédente restent valides
+          # (en) A reconnection on the same map keeps the walls found so far, and skips `bind_map()` on purpose: the
+          #      coin tour and the targeting history of the previous connection are still valid
+          map_key = MAP_CACHE.key(map_state)
+          if map_key == self.map_key:
+               return
+          self.map_key = map_key
+
+          self.geometry, self.pathfinder = MAP_CACHE.compile(map_state)
+          self.belief = self.pathfinder.belief
+          if decode_walls(map_state.save, self.belief):
+               self.geometry.add_segments([wall for wall in self.belief.walls() if not self.geometry.has_segment(wall)])
+               self.pathfinder.rebuild()
+          self.rebuilt_version = self.belief.version
+          self.saved = encode_walls(self.belief)
+          self.saved_version = self.belief.version
+          self.bind_map()
+
+
+     def bind_map(self):
+          """
+          (fr) (Re)construit les planificateurs qui gardent une référence à la géométrie ou aux tables de
+               chemins, pour qu'aucun ne reste sur la carte d'avant `on_start`.
+          (en) (Re)builds the planners that keep a reference to the geometry or to the path tables, so that
+               none of them is left on the map from before `on_start`.
+          """
+          self.route_planner = RoutePlanner(self.pathfinder)
+          self.exploration = ExplorationPlanner(self.pathfinder)
+          self.treasure_planner = TreasurePlanner(self.pathfinder)
+          self.dodge_engine = DodgeEngine(self.geometry)
+          self.lookahead = LookaheadPlanner(self.geometry)
+          self.targeting = Targeting(self.geometry)
 
 
      def on_end(self):
@@ -213,27 +400,39 @@ class MyBot:
           (en) This method is called once at the end of the game. You can define actions to be performed 
                at the end of the game.
           """
-          """ add a save call when the game is over to store our bytes to the server """
-          save_data = json.dumps({'coin_count': self.coin_count}).encode('utf-8')
-          return [SaveAction(save_data)]
+          save_action = self.save_walls()
+          return [save_action] if save_action else []
+
+     def save_walls(self) -> Union[SaveAction, None]:
+          """
+          (fr) Sauvegarde les murs connus sur le serveur quand ils ont changé depuis la dernière sauvegarde,
+               pour les relire dans `on_start` après une reconnexion.
+          (en) Saves the known walls on the server when they changed since the last save, to read them
+               back in `on_start` after a reconnection.
+          """
+          if self.belief.version == self.saved_version:
+               return None
+          self.saved_version = self.belief.version
+
+          data = encode_walls(self.belief)
+          if data == self.saved:
+               return None
+          self.saved = data
+          return SaveAction(data)
 
      """ action helpers """
-     def find_player_coordinates(self, players, player_name):
-          for player in players:
-               if player.name == player_name:
-                    return player.pos
-          return None  # If player is not found
-
-     def coin_finder(self, state, self_name):
-          closest_coin = None
-          dist_min = float('inf')
-          pos_self = self.find_player_coordinates(state.players, self_name)
-          for coin in state.coins:
-               dist = self.calculate_distance(pos_self, coin.pos)
-               if dist < dist_min:
-                    dist_min = dist
-                    closest_coin = coin
-          return closest_coin
+     def find_player_coordinates(self, arrays: GameStateArrays, player_name: str) -> Optional[Point]:
+          index = arrays.player_index(player_name)
+          if index is None:
+               return None  # If player is not found
+          return Point(*arrays.player_pos[index].tolist())
+
+     def coin_finder(self, arrays: GameStateArrays, pos: Tuple[float, float], deadline=None) -> Optional[int]:
+          """
+          (fr) L'indice (dans `arrays`) de la prochaine pièce de la tournée.
+          (en) The index (in `arrays`) of the next coin of the tour.
+          """
+          return self.route_planner.update(pos, arrays, deadline)
      
      def rotate_blade(self) -> RotateBladeAction:
         self.blade_rotation_angle += math.pi / 16 
@@ -241,51 +440,42 @@ class MyBot:
             self.blade_rotation_angle -= 2 * math.pi
         return RotateBladeAction(self.blade_rotation_angle)
      
-     def pistol_aimer(self, game_state: GameState) -> Union[ShootAction, None]:
-        closest_enemy = None
-        dist_min = float('inf')
-        pos_self = self.find_player_coordinates(game_state.players, self.name)
-        for player in game_state.players:
-            if player.name != self.name:
-                dist = self.calculate_distance(pos_self, player.pos)
-                if dist < dist_min:
-                    dist_min = dist
-                    closest_enemy = player
-
-        if closest_enemy:
-            return ShootAction((closest_enemy.pos.x, closest_enemy.pos.y))
+     def pistol_aimer(self, arrays: GameStateArrays, self_index: int, priority=None) -> Union[ShootAction, None]:
+        target = self.targeting.choose(arrays, self_index, priority)
+        if target:
+            return ShootAction(target.aim)
         return None  
 
      """ utils """
      def calculate_distance(self, pos1: Point, pos2: Point) -> float:
         return math.sqrt((pos1.x - pos2.x) ** 2 + (pos1.y - pos2.y) ** 2)
      
-     def generate_new_coords(self, old_x, old_y, delta=10):
-          new_x = old_x + random.uniform(-delta, delta)
-          new_y = old_y + random.uniform(-delta, delta)
-          while self.is_wall_in_between(old_x, old_y, new_x, new_y):
-               new_x = old_x + random.uniform(-delta, delta)
-               new_y = old_y + random.uniform(-delta, delta)
-          return new_x, new_y
+     def generate_new_coords(self, old_x, old_y, delta=10, attempts=32):
+          """
+          (fr) Un point au hasard à moins de `delta`, dans la carte et sans mur connu sur le chemin. Les
+               `attempts` tirages sont testés d'un coup; si tous sont bloqués (ou sur place), on garde le point
+               d'évitement précédent, ou notre position.
+          (en) A random point within `delta`, inside the map and with no known wall on the way. The `attempts`
+               samples are tested at once; when all of them are blocked (or in place), we keep the previous
+               dodge point, or our position.
+          """
+          low, high = Consts.Player.SIZE, Consts.Map.WIDTH * Consts.Map.CELL_WIDTH - Consts.Player.SIZE
+          samples = np.clip(np.array([[old_x + random.uniform(-delta, delta), old_y + random.uniform(-delta, delta)]
+                                      for _ in range(attempts)]).reshape(-1, 2), low, high)
+          starts = np.broadcast_to(np.array([old_x, old_y], dtype=np.float64), samples.shape)
+          moved = np.hypot(*(samples - starts).T) > Consts.Player.SIZE
+          free = np.nonzero(moved & ~self.geometry.intersects_many(starts, samples))[0]
+          if len(free) > 0:
+               new_x, new_y = samples[free[0]].tolist()
+               return new_x, new_y
+          if self.temp_x is not None:
+               return self.temp_x, self.temp_y
+          return old_x, old_y
      
      def are_coordinates_close(self, temp_x, temp_y, new_pos_x, new_pos_y, tolerance=1):
           distance = math.sqrt((temp_x - new_pos_x) ** 2 + (temp_y - new_pos_y) ** 2)
           return distance <= tolerance
      
      def is_wall_in_between(self, old_x, old_y, new_x, new_y):
-        for wall in self.walls:
-            wall_dict = dict(wall)
-            if 'x' in wall_dict:
-                wall_x = wall_dict['x']
-                y_bottom = wall_dict['y_bottom']
-                y_top = wall_dict['y_top']
-                if min(old_x, new_x) <= wall_x <= max(old_x, new_x) and min(old_y, new_y) <= y_top and max(old_y, new_y) >= y_bottom:
-                    return True
-            if 'y' in wall_dict:
-                wall_y = wall_dict['y']
-                x_left = wall_dict['x_left']
-                x_right = wall_dict['x_right']
-                if min(old_y, new_y) <= wall_y <= max(old_y, new_y) and min(old_x, new_x) <= x_right and max(old_x, new_x) >= x_left:
-                    return True
-        return False
-        
\ No newline at end of file
+        return not self.geometry.line_of_sight((old_x, old_y), (new_x, new_y))
+        
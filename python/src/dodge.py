@@ -0,0 +1,141 @@
+import math
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from core.consts import Consts
+from core.game_arrays import GameStateArrays
+from src.map_geometry import MapGeometry
+
+
+Position = Tuple[float, float]
+
+HIT_RADIUS = (Consts.Player.SIZE + Consts.Projectile.SIZE) / 2
+PROJECTILE_RANGE = Consts.Projectile.SPEED * Consts.Projectile.TTL
+
+
+def travel(start: np.ndarray, dest: np.ndarray, speed: float, times: np.ndarray) -> np.ndarray:
+    """
+    (fr) Position à chaque instant d'objets allant de `start` vers `dest` à vitesse constante et
+         s'arrêtant à `dest`. `start` et `dest` sont (..., 2), le résultat est (..., T, 2).
+    (en) Position at every time of objects moving from `start` toward `dest` at constant speed and
+         stopping at `dest`. `start` and `dest` are (..., 2), the result is (..., T, 2).
+    """
+    delta = dest - start
+    length = np.hypot(delta[..., 0], delta[..., 1])
+    fraction = np.minimum(speed * times / np.where(length > 0, length, 1.0)[..., None], 1.0)
+    return start[..., None, :] + delta[..., None, :] * fraction[..., None]
+
+
+@dataclass
+class DodgePlan:
+    """
+    (fr) Le résultat d'une évaluation: la destination retenue et le temps avant impact sur le trajet prévu.
+    (en) The result of an evaluation: the chosen destination and the time to impact on the planned path.
+
+    Attributes:
+        dest           (Position) : (fr) La destination sûre la moins coûteuse.
+                                    (en) The cheapest safe destination.
+        time_to_impact (float)    : (fr) Le temps avant impact sur le trajet prévu, inf sans impact.
+                                    (en) The time to impact on the planned path, inf without impact.
+        safe           (bool)     : (fr) Aucun impact n'est prévu en allant vers `dest`.
+                                    (en) No impact is predicted when going to `dest`.
+    """
+    dest: Position
+    time_to_impact: float = math.inf
+    safe: bool = True
+
+
+class DodgeEngine:
+    """
+    (fr) Simule tous les projectiles ennemis sur un court horizon, en une seule opération vectorisée
+         (projectiles x instants x déplacements candidats). Si le trajet prévu est touché, on propose le
+         déplacement sûr qui s'éloigne le moins de la destination prévue.
+    (en) Simulates every enemy projectile over a short horizon, as a single vectorized operation
+         (projectiles x times x candidate moves). When the planned path gets hit, proposes the safe move
+         that strays the least from the planned destination.
+    """
+
+    def __init__(self, geometry: Optional[MapGeometry] = None, horizon: float = 1.5, step: float = 0.1,
+                 directions: int = 16):
+        self.geometry = geometry
+        self.horizon = horizon
+        self.times = np.arange(0.0, horizon + step / 2, step)
+
+        angles = np.linspace(0.0, 2 * math.pi, directions, endpoint=False)
+        self.directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+    def projectile_paths(self, projectile_pos: np.ndarray, projectile_dest: np.ndarray) -> np.ndarray:
+        """
+        (fr) Les positions (K, T, 2) des projectiles. Un projectile disparaît à `dest` ou au bout de sa portée:
+             ses positions suivantes sont à l'infini, pour ne pas rester un obstacle.
+        (en) The positions (K, T, 2) of the projectiles. A projectile vanishes at `dest` or at the end of its
+             range: its later positions are at infinity, so that it does not stay an obstacle.
+        """
+        paths = travel(projectile_pos, projectile_dest, Consts.Projectile.SPEED, self.times)
+        length = np.minimum(np.hypot(*(projectile_dest - projectile_pos).T), PROJECTILE_RANGE)
+        paths[self.times[None, :] > (length / Consts.Projectile.SPEED)[:, None]] = np.inf
+        return paths
+
+    def times_to_impact(self, projectile_paths: np.ndarray, paths: np.ndarray) -> np.ndarray:
+        """
+        (fr) Pour chaque trajet (C, T, 2), le premier instant où un projectile (K, T, 2) nous touche.
+        (en) For every path (C, T, 2), the first time a projectile (K, T, 2) hits us.
+        """
+        if len(projectile_paths) == 0:
+            return np.full(len(paths), np.inf)
+
+        delta = paths[:, None, :, :] - projectile_paths[None, :, :, :]
+        hit = np.any(np.sum(delta * delta, axis=-1) <= HIT_RADIUS * HIT_RADIUS, axis=1)
+
+        first = np.argmax(hit, axis=1)
+        return np.where(np.any(hit, axis=1), self.times[first], np.inf)
+
+    def plan(self, pos: Position, dest: Position, projectile_pos: np.ndarray, projectile_dest: np.ndarray) -> DodgePlan:
+        """
+        (fr) Évalue le trajet `pos` -> `dest` et, s'il est touché, les déplacements d'évitement.
+        (en) Evaluates the `pos` -> `dest` path and, when it gets hit, the dodge moves.
+        """
+        projectile_paths = self.projectile_paths(
+            np.asarray(projectile_pos, dtype=np.float64).reshape(-1, 2),
+            np.asarray(projectile_dest, dtype=np.float64).reshape(-1, 2),
+        )
+
+        start = np.asarray(pos, dtype=np.float64)
+        reach = Consts.Player.SPEED * self.horizon
+        candidates = np.concatenate([
+            [dest, pos],
+            start + self.directions * reach,
+        ])
+        paths = travel(np.broadcast_to(start, candidates.shape), candidates, Consts.Player.SPEED, self.times)
+
+        impact = self.times_to_impact(projectile_paths, paths)
+        if not np.isfinite(impact[0]):
+            return DodgePlan(dest=tuple(dest), time_to_impact=math.inf)
+
+        reachable = np.ones(len(candidates), dtype=bool)
+        if self.geometry is not None:
+            reachable[2:] = ~self.geometry.intersects_many(
+                np.broadcast_to(start, candidates[2:].shape), candidates[2:], Consts.Player.SIZE / 2
+            )
+
+        cost = np.hypot(*(candidates - np.asarray(dest, dtype=np.float64)).T)
+        safe = reachable & ~np.isfinite(impact)
+        if np.any(safe):
+            best = int(np.argmin(np.where(safe, cost, np.inf)))
+            return DodgePlan(dest=tuple(candidates[best].tolist()), time_to_impact=float(impact[0]))
+
+        best = int(np.argmax(np.where(reachable, impact, -np.inf)))
+        return DodgePlan(dest=tuple(candidates[best].tolist()), time_to_impact=float(impact[0]), safe=False)
+
+    def plan_for(self, arrays: GameStateArrays, self_index: int, dest: Position) -> DodgePlan:
+        """
+        (fr) `plan` avec les projectiles ennemis d'un `GameStateArrays`.
+        (en) `plan` with the enemy projectiles of a `GameStateArrays`.
+        """
+        enemy = arrays.projectile_owner != self_index
+        return self.plan(
+            tuple(arrays.player_pos[self_index]), dest,
+            arrays.projectile_pos[enemy], arrays.projectile_dest[enemy],
+        )
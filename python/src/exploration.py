@@ -0,0 +1,184 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from core.consts import Consts
+from src.pathfinding import Pathfinder
+from src.wall_belief import UNKNOWN, WallBelief
+
+
+Position = Tuple[float, float]
+
+# (fr) On vise un point un peu au-delà de l'arête, pour la traverser ou buter dessus.
+# (en) We aim a bit past the edge, to either cross it or stall against it.
+OVERSHOOT = Consts.Player.SIZE * 1.5
+PROBE_RANGE = Consts.Projectile.SPEED * Consts.Projectile.TTL - Consts.Map.CELL_WIDTH / 2
+
+
+@dataclass
+class ExplorationTarget:
+    """
+    (fr) L'arête à tester et la prochaine destination pour y aller.
+    (en) The edge to test and the next destination to get there.
+
+    Attributes:
+        edge (int)      : (fr) L'indice de l'arête dans la `WallBelief`.
+                          (en) The index of the edge in the `WallBelief`.
+        dest (Position) : (fr) Le prochain point de passage, au-delà de l'arête une fois à côté.
+                          (en) The next waypoint, past the edge once next to it.
+        gain (float)    : (fr) L'information espérée (bits) de l'arête.
+                          (en) The expected information (bits) of the edge.
+        rate (float)    : (fr) La valeur de l'information par unité de distance, en points.
+                          (en) The value of the information per unit of distance, in points.
+    """
+    edge: int
+    dest: Position
+    gain: float
+    rate: float
+
+
+class ExplorationPlanner:
+    """
+    (fr) Choisit l'arête inconnue qui rapporte le plus d'information par unité de distance. L'information
+         d'une arête est l'entropie de sa probabilité d'être un mur (qui tient déjà compte des comptes du
+         `discrete_grid`): une arête forcée par les contraintes ne vaut rien. On s'en approche par le
+         côté le plus proche puis on essaie de la traverser: soit on passe (elle est ouverte), soit on
+         bute dessus (c'est un mur).
+
+         Les entropies ne sont recalculées que lorsque la croyance change, et les distances sont une
+         lecture de la table du `Pathfinder`: un tick coûte une poignée d'opérations vectorisées sur les
+         arêtes. `rate` se compare à la valeur d'une pièce divisée par sa distance.
+
+         Un tir renseigne aussi: le projectile traverse l'arête ou disparaît dessus. Quand on n'a pas
+         d'ennemi à viser, `probe` choisit l'arête la plus incertaine à portée et en vue.
+    (en) Picks the unknown edge that gives the most information per unit of distance. The information
+         of an edge is the entropy of its probability to be a wall (which already accounts for the
+         `discrete_grid` counts): an edge forced by the constraints is worth nothing. We get to its
+         nearest side then try to cross it: either we go through (it is open) or we stall against it
+         (it is a wall).
+
+         The entropies are only recomputed when the belief changes, and the distances are a lookup in
+         the `Pathfinder` table: a tick costs a handful of vectorized operations over the edges. `rate`
+         compares with the value of a coin divided by its distance.
+
+         A shot tells as much: the projectile either crosses the edge or vanishes on it. When there is
+         no enemy to aim at, `probe` picks the most uncertain edge in range and in sight.
+    """
+
+    def __init__(self, pathfinder: Pathfinder, bit_value: float = Consts.Coin.VALUE / 8,
+                 max_attempts: int = 2):
+        self.pathfinder = pathfinder
+        self.bit_value = bit_value
+        self.max_attempts = max_attempts
+        self.version = None
+        self.target: Optional[int] = None
+
+        belief = pathfinder.belief
+        self.attempts = np.zeros(belief.count, dtype=np.int32)
+        self.probed_at = np.full(belief.count, -np.inf)
+        self.entropy = np.zeros(belief.count)
+        self.sides, self.midpoints, self.normals = self._edge_sides(belief)
+
+    @staticmethod
+    def _edge_sides(belief: WallBelief) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (fr) Les deux cellules de chaque arête (-1 pour les bords), son milieu et sa normale unitaire,
+             orientée de la première cellule vers la seconde.
+        (en) The two cells of every edge (-1 for borders), its midpoint and its unit normal, pointing
+             from the first cell to the second.
+        """
+        a, b = belief.segments[:, :2], belief.segments[:, 2:]
+        midpoints = (a + b) / 2
+        horizontal = np.arange(belief.count) < belief.horizontal_count
+        normals = np.where(horizontal[:, None], [0.0, 1.0], [1.0, 0.0])
+
+        cells = []
+        for offset in (-0.5, 0.5):
+            col, row = np.floor((midpoints + normals * offset * belief.cell_size) / belief.cell_size).T.astype(int)
+            inside = (col >= 0) & (col < belief.columns) & (row >= 0) & (row < belief.rows)
+            cells.append(np.where(inside, row * belief.columns + col, -1))
+
+        return np.stack(cells, axis=1), midpoints, normals
+
+    def _refresh(self) -> None:
+        belief = self.pathfinder.belief
+        if belief.version == self.version:
+            return
+        self.version = belief.version
+
+        p = np.clip(belief.probability.astype(np.float64), 1e-6, 1 - 1e-6)
+        entropy = -(p * np.log2(p) + (1 - p) * np.log2(1 - p))
+        usable = (belief.state == UNKNOWN) & (self.sides >= 0).all(axis=1) & (self.attempts < self.max_attempts)
+        self.entropy = np.where(usable, entropy, 0.0)
+
+    def plan(self, pos: Position) -> Optional[ExplorationTarget]:
+        """
+        (fr) L'arête de meilleur taux depuis `pos`, None s'il ne reste rien à apprendre.
+        (en) The edge with the best rate from `pos`, None when nothing is left to learn.
+        """
+        self._refresh()
+        candidates = np.nonzero(self.entropy > 0.0)[0]
+        if len(candidates) == 0:
+            self.target = None
+            return None
+
+        cell_distances = self.pathfinder.distances(pos, self.pathfinder.centers)
+        side_distances = cell_distances[self.sides[candidates]]
+        near = np.argmin(side_distances, axis=1)
+        distances = side_distances[np.arange(len(candidates)), near] + self.pathfinder.cell_size / 2
+        if not np.isfinite(distances).any():
+            return None
+
+        rates = np.where(np.isfinite(distances), self.bit_value * self.entropy[candidates] / distances, -np.inf)
+        best = int(np.argmax(rates))
+        edge, near_cell = int(candidates[best]), int(self.sides[candidates[best], near[best]])
+        self.target = edge
+
+        if self.pathfinder.cell_of(pos) == near_cell:
+            direction = 1.0 if near[best] == 0 else -1.0
+            dest = tuple((self.midpoints[edge] + direction * OVERSHOOT * self.normals[edge]).tolist())
+        else:
+            dest = self.pathfinder.next_waypoint(pos, tuple(self.pathfinder.centers[near_cell].tolist()))
+            if dest is None:
+                return None
+
+        return ExplorationTarget(edge, dest, float(self.entropy[edge]), float(rates[best]))
+
+    def stalled(self) -> None:
+        """
+        (fr) On a buté en essayant de traverser l'arête visée: après `max_attempts` essais, on l'abandonne.
+        (en) We stalled while trying to cross the target edge: after `max_attempts` tries, we drop it.
+        """
+        if self.target is not None:
+            self.attempts[self.target] += 1
+            self.version = None
+
+    def probe(self, pos: Position, tick: int, reach: float = PROBE_RANGE) -> Optional[Position]:
+        """
+        (fr) Un point à viser pour tester l'arête la plus incertaine à moins de `reach`, sans mur connu
+             entre elle et nous. Une arête visée n'est pas revisée avant que le projectile l'ait atteinte.
+        (en) A point to aim at to test the most uncertain edge within `reach`, with no known wall between
+             it and us. A probed edge is not probed again before the projectile reached it.
+        """
+        self._refresh()
+        flight = reach / (Consts.Projectile.SPEED * Consts.Game.TICK_DURATION)
+        candidates = np.nonzero((self.entropy > 0.0) & (tick - self.probed_at > flight))[0]
+        if len(candidates) == 0:
+            return None
+
+        offsets = self.midpoints[candidates] - pos
+        distances = np.hypot(*offsets.T)
+        close = (distances <= reach) & (distances > Consts.Player.SIZE)
+        candidates, offsets, distances = candidates[close], offsets[close], distances[close]
+        if len(candidates) == 0:
+            return None
+
+        order = np.argsort(-self.entropy[candidates] + distances / (100 * reach))
+        starts = np.broadcast_to(np.asarray(pos, dtype=np.float64), offsets.shape)
+        blocked = self.pathfinder.geometry.intersects_many(starts, self.midpoints[candidates])
+        for i in order:
+            if not blocked[i]:
+                self.probed_at[candidates[i]] = tick
+                return tuple((self.midpoints[candidates[i]] + offsets[i] / distances[i]).tolist())
+        return None
@@ -0,0 +1,263 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from core.consts import Consts
+from core.game_arrays import GameStateArrays
+from core.game_state import PlayerWeapon
+from src.dodge import HIT_RADIUS, travel
+from src.map_geometry import MapGeometry
+
+
+Position = Tuple[float, float]
+
+MAP_SIZE = Consts.Map.WIDTH * Consts.Map.CELL_WIDTH
+COIN_RADIUS = (Consts.Player.SIZE + Consts.Coin.SIZE) / 2
+BLADE_REACH = Consts.Blade.LENGTH + (Consts.Player.SIZE + Consts.Blade.THICKNESS) / 2
+# (fr) Une lame touche pendant environ la moitié des 10 boucles d'un tick.
+# (en) A blade hits during about half of the 10 loops of a tick.
+BLADE_DAMAGE_RATE = Consts.Blade.DAMAGE * 5 / Consts.Game.TICK_DURATION
+
+
+@dataclass
+class LookaheadPlan:
+    """
+    (fr) La destination retenue et son évaluation moyenne sur les scénarios.
+    (en) The chosen destination and its evaluation averaged over the scenarios.
+
+    Attributes:
+        dest     (Position) : (fr) La destination de meilleure valeur.
+                              (en) The destination with the best value.
+        value    (float)    : (fr) Pièces + progrès - coût des dégâts, en points.
+                              (en) Coins + progress - cost of the damage, in points.
+        coins    (float)    : (fr) La valeur espérée des pièces ramassées.
+                              (en) The expected value of the collected coins.
+        damage   (float)    : (fr) Les dégâts espérés.
+                              (en) The expected damage.
+        rollouts (int)      : (fr) Le nombre de simulations (destinations x scénarios), 0 sans planification.
+                              (en) The number of rollouts (destinations x scenarios), 0 without planning.
+    """
+    dest: Position
+    value: float = 0.0
+    coins: float = 0.0
+    damage: float = 0.0
+    rollouts: int = 0
+
+
+class LookaheadPlanner:
+    """
+    (fr) Planification Monte Carlo: on tire des destinations candidates autour du joueur et on simule
+         chacune sur `horizon` secondes dans `scenarios` futurs tirés au hasard, le tout en opérations
+         vectorisées (destinations x scénarios x ennemis x instants). Les projectiles existants volent en
+         ligne droite, les ennemis suivent leur vitesse estimée avec un bruit de marche aléatoire et tirent
+         vers nous selon un processus de Poisson, les lames touchent à portée. Une destination vaut les
+         pièces qu'on atteint avant les ennemis (escomptées dans le temps), plus le progrès vers la
+         destination prévue (le prochain point de passage du chemin), moins le coût des dégâts espérés.
+         Les candidates sont évaluées par paquets jusqu'à l'échéance.
+    (en) Monte Carlo planning: samples candidate destinations around the player and rolls each of them
+         forward for `horizon` seconds in `scenarios` random futures, all as vectorized operations
+         (destinations x scenarios x enemies x times). Existing projectiles fly straight, enemies follow
+         their estimated velocity with random-walk noise and shoot at us as a Poisson process, blades hit
+         within reach. A destination is worth the coins reached before the enemies (discounted over
+         time), plus the progress toward the planned destination (the next waypoint of the path), minus
+         the cost of the expected damage. Candidates are evaluated in chunks until the deadline.
+    """
+
+    def __init__(self, geometry: Optional[MapGeometry] = None,
+                 horizon: float = 3.0, step: float = 0.2, candidates: int = 64, scenarios: int = 16,
+                 chunk: int = 16, fire_rate: float = 1.0, enemy_noise: float = 0.5, damage_cost: float = 1.0,
+                 progress_value: float = Consts.Coin.VALUE / Consts.Map.CELL_WIDTH, discount: float = 0.8,
+                 seed: Optional[int] = None):
+        self.geometry = geometry
+        self.horizon = horizon
+        self.step = step
+        self.times = np.arange(step, horizon + step / 2, step)
+        self.candidates = candidates
+        self.scenarios = scenarios
+        self.chunk = chunk
+        self.fire_rate = fire_rate
+        self.enemy_noise = enemy_noise
+        self.damage_cost = damage_cost
+        self.progress_value = progress_value
+        self.discount = discount
+        self.rng = np.random.default_rng(seed)
+
+    def sample_candidates(self, pos: np.ndarray, dest: np.ndarray) -> np.ndarray:
+        """
+        (fr) La destination prévue puis des points tirés au hasard entre la moitié et la totalité de la
+             portée d'un déplacement sur l'horizon. Rester sur place n'est pas candidat: le bot prend une
+             position inchangée pour un mur (voir `MyBot.detect_wall`). Les points derrière un mur connu
+             sont remplacés par la destination prévue.
+        (en) The planned destination, then random points between half and all of the reach of a move over
+             the horizon. Staying in place is not a candidate: the bot reads an unchanged position as a
+             wall (see `MyBot.detect_wall`). The points behind a known wall are replaced by the planned
+             destination.
+        """
+        count = max(self.candidates - 1, 0)
+        reach = Consts.Player.SPEED * self.horizon
+        angles = self.rng.uniform(0.0, 2 * math.pi, count)
+        radii = reach * np.sqrt(self.rng.uniform(0.25, 1.0, count))
+        sampled = pos + np.stack([np.cos(angles), np.sin(angles)], axis=1) * radii[:, None]
+        sampled = np.clip(sampled, Consts.Player.SIZE, MAP_SIZE - Consts.Player.SIZE)
+
+        if self.geometry is not None and count:
+            blocked = self.geometry.intersects_many(
+                np.broadcast_to(pos, sampled.shape), sampled, Consts.Player.SIZE / 2
+            )
+            sampled[blocked] = dest
+        return np.concatenate([[dest], sampled])
+
+    def enemy_paths(self, enemy_pos: np.ndarray, enemy_velocity: np.ndarray) -> np.ndarray:
+        """
+        (fr) Les trajets (S, E, T, 2) des ennemis: leur vitesse estimée plus une marche aléatoire.
+        (en) The (S, E, T, 2) paths of the enemies: their estimated velocity plus a random walk.
+        """
+        shape = (self.scenarios, len(enemy_pos), len(self.times), 2)
+        noise = np.cumsum(self.rng.normal(0.0, self.enemy_noise * math.sqrt(self.step), shape), axis=2)
+        paths = enemy_pos[None, :, None, :] + enemy_velocity[None, :, None, :] * self.times[:, None] + noise
+        return np.clip(paths, 0.0, MAP_SIZE)
+
+    @staticmethod
+    def distance_sq(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        dx = a[..., 0] - b[..., 0]
+        dy = a[..., 1] - b[..., 1]
+        return dx * dx + dy * dy
+
+    def first_times(self, close: np.ndarray) -> np.ndarray:
+        """
+        (fr) Le premier instant où `close` (..., T) est vrai, inf s'il ne l'est jamais.
+        (en) The first time at which `close` (..., T) is true, inf when it never is.
+        """
+        return np.where(close.any(axis=-1), self.times[np.argmax(close, axis=-1)], np.inf)
+
+    def rollout(self, paths: np.ndarray, projectile_paths: np.ndarray, enemy_paths: np.ndarray,
+                shooters: np.ndarray, fire_times: np.ndarray, blades: np.ndarray,
+                coin_pos: np.ndarray, coin_value: np.ndarray, enemy_arrival: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (fr) Évalue les trajets (C, T, 2): retourne la valeur espérée des pièces et les dégâts espérés (C,).
+             `enemy_arrival` (S, N) est le premier instant où un ennemi atteint chaque pièce.
+        (en) Evaluates the (C, T, 2) paths: returns the expected coin value and the expected damage (C,).
+             `enemy_arrival` (S, N) is the first time an enemy reaches every coin.
+        """
+        hit_sq = HIT_RADIUS * HIT_RADIUS
+
+        # (fr) Projectiles déjà tirés: chacun touche au plus une fois, dans tous les scénarios.
+        # (en) Projectiles already fired: each one hits at most once, in every scenario.
+        damage = np.zeros(len(paths))
+        if len(projectile_paths):
+            hits = np.any(self.distance_sq(paths[:, None], projectile_paths[None]) <= hit_sq, axis=-1)
+            damage += Consts.Projectile.DAMAGE * hits.sum(axis=1)
+
+        # (fr) Tirs à venir (C, S, E): partis de l'ennemi à `fire_times`, vers notre position à cet instant.
+        # (en) Future shots (C, S, E): fired from the enemy at `fire_times`, toward our position at that time.
+        if shooters.any():
+            fired = np.isfinite(fire_times)
+            index = np.minimum(np.searchsorted(self.times, np.where(fired, fire_times, 0.0)), len(self.times) - 1)
+            origin = np.take_along_axis(enemy_paths, index[..., None, None], axis=2)[:, :, 0]
+            aim = paths[:, index]
+            direction = aim - origin[None]
+            length = np.hypot(direction[..., 0], direction[..., 1])
+            direction /= np.where(length > 0, length, 1.0)[..., None]
+
+            flight = np.maximum(self.times - np.where(fired, fire_times, np.inf)[..., None], -1.0)
+            shot = origin[None, :, :, None] + direction[..., None, :] * (Consts.Projectile.SPEED * flight)[None, ..., None]
+            close = (self.distance_sq(shot, paths[:, None, None]) <= hit_sq) & (flight >= 0)[None]
+            hits = close.any(axis=-1) & (fired & shooters)[None]
+            damage += Consts.Projectile.DAMAGE * hits.sum(axis=2).mean(axis=1)
+
+        # (fr) Lames: des dégâts par seconde passée à portée d'un ennemi armé d'une lame.
+        # (en) Blades: damage per second spent within reach of an enemy holding a blade.
+        if blades.any():
+            contact = self.distance_sq(paths[:, None, None], enemy_paths[None, :, blades]) <= BLADE_REACH ** 2
+            damage += BLADE_DAMAGE_RATE * self.step * contact.sum(axis=(2, 3)).mean(axis=1)
+
+        # (fr) Pièces: ramassées si on les atteint avant tous les ennemis du scénario.
+        # (en) Coins: collected when we reach them before every enemy of the scenario.
+        coins = np.zeros(len(paths))
+        if len(coin_pos):
+            ours = self.first_times(np.moveaxis(self.distance_sq(paths[:, :, None], coin_pos) <= COIN_RADIUS ** 2, 1, -1))
+            first = (ours[:, None, :] < enemy_arrival[None]).mean(axis=1)
+            gain = np.where(np.isfinite(ours), self.discount ** np.where(np.isfinite(ours), ours, 0.0), 0.0)
+            coins = np.sum(coin_value * first * gain, axis=1)
+
+        return coins, damage
+
+    def plan(self, pos: Position, dest: Position,
+             enemy_pos: np.ndarray = np.empty((0, 2)), enemy_velocity: np.ndarray = np.empty((0, 2)),
+             enemy_weapon: np.ndarray = np.empty(0), projectile_pos: np.ndarray = np.empty((0, 2)),
+             projectile_dest: np.ndarray = np.empty((0, 2)), coin_pos: np.ndarray = np.empty((0, 2)),
+             coin_value: np.ndarray = np.empty(0), deadline: Optional[float] = None) -> LookaheadPlan:
+        """
+        (fr) Choisit la meilleure destination autour de `pos`. `dest` est le déplacement prévu: il est
+             évalué en premier et gagne les égalités.
+        (en) Picks the best destination around `pos`. `dest` is the planned move: it is evaluated first
+             and wins the ties.
+        """
+        start = np.asarray(pos, dtype=np.float64)
+        goal = np.asarray(dest, dtype=np.float64)
+        candidates = self.sample_candidates(start, goal)
+
+        enemy_pos = np.asarray(enemy_pos, dtype=np.float64).reshape(-1, 2)
+        enemy_weapon = np.asarray(enemy_weapon).reshape(-1)
+        projectile_pos = np.asarray(projectile_pos, dtype=np.float64).reshape(-1, 2)
+        projectile_dest = np.asarray(projectile_dest, dtype=np.float64).reshape(-1, 2)
+
+        projectile_paths = travel(projectile_pos, projectile_dest, Consts.Projectile.SPEED, self.times)
+        arrived = np.hypot(*(projectile_dest - projectile_pos).T) / Consts.Projectile.SPEED
+        projectile_paths[self.times[None, :] > arrived[:, None]] = np.inf
+
+        enemy_paths = self.enemy_paths(enemy_pos, np.asarray(enemy_velocity, dtype=np.float64).reshape(-1, 2))
+        shooters = enemy_weapon == PlayerWeapon.PlayerWeaponCanon
+        blades = enemy_weapon == PlayerWeapon.PlayerWeaponBlade
+        fire_times = self.rng.exponential(1.0 / self.fire_rate, (self.scenarios, len(enemy_pos)))
+        fire_times[fire_times > self.horizon] = np.inf
+
+        coin_pos = np.asarray(coin_pos, dtype=np.float64).reshape(-1, 2)
+        coin_value = np.asarray(coin_value, dtype=np.float64).reshape(-1)
+        reached = self.distance_sq(enemy_paths[..., None, :], coin_pos) <= COIN_RADIUS ** 2
+        enemy_arrival = self.first_times(np.moveaxis(reached, 2, -1)).min(axis=1, initial=np.inf)
+
+        values, coins, damages = [], [], []
+        for first in range(0, len(candidates), self.chunk):
+            if first and deadline is not None and time.perf_counter() >= deadline:
+                break
+            chunk = candidates[first:first + self.chunk]
+            paths = travel(np.broadcast_to(start, chunk.shape), chunk, Consts.Player.SPEED, self.times)
+            gained, damage = self.rollout(paths, projectile_paths, enemy_paths, shooters, fire_times, blades,
+                                          coin_pos, coin_value, enemy_arrival)
+            progress = np.hypot(*(goal - start)) - np.hypot(*(paths[:, -1] - goal).T)
+
+            values.append(gained + self.progress_value * progress - self.damage_cost * damage)
+            coins.append(gained)
+            damages.append(damage)
+
+        values, coins, damages = np.concatenate(values), np.concatenate(coins), np.concatenate(damages)
+        best = int(np.argmax(values))
+        return LookaheadPlan(
+            dest=tuple(candidates[best].tolist()),
+            value=float(values[best]),
+            coins=float(coins[best]),
+            damage=float(damages[best]),
+            rollouts=len(values) * self.scenarios,
+        )
+
+    def plan_for(self, arrays: GameStateArrays, self_index: int, dest: Position, velocity: np.ndarray,
+                 deadline: Optional[float] = None) -> LookaheadPlan:
+        """
+        (fr) `plan` avec les ennemis, projectiles ennemis et pièces d'un `GameStateArrays`, `velocity` étant
+             la vitesse estimée de chaque joueur (voir `Targeting.estimated_velocities`).
+        (en) `plan` with the enemies, enemy projectiles and coins of a `GameStateArrays`, `velocity` being
+             the estimated velocity of every player (see `Targeting.estimated_velocities`).
+        """
+        enemies = np.arange(len(arrays.player_names)) != self_index
+        enemies &= arrays.player_health > 0
+        enemy_shots = arrays.projectile_owner != self_index
+        return self.plan(
+            tuple(arrays.player_pos[self_index]), dest,
+            arrays.player_pos[enemies], velocity[enemies], arrays.player_weapon[enemies],
+            arrays.projectile_pos[enemy_shots], arrays.projectile_dest[enemy_shots],
+            arrays.coin_pos, arrays.coin_value, deadline,
+        )
@@ -0,0 +1,68 @@
+import copy
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from core.map_state import MapState
+from src.map_geometry import MapGeometry
+from src.pathfinding import Pathfinder
+from src.wall_belief import WallBelief
+
+
+CompiledMap = Tuple[MapGeometry, Pathfinder]
+
+
+def compile_map(map_state: MapState) -> CompiledMap:
+    geometry = MapGeometry.from_map_state(map_state)
+    belief = WallBelief.from_map_state(map_state)
+    geometry.add_segments(belief.walls())
+    return geometry, Pathfinder(geometry, belief=belief)
+
+
+class MapCache:
+    """
+    (fr) Garde la géométrie et les tables de chemins des dernières cartes, pour que plusieurs bots d'un
+         même processus (ou une reconnexion) ne les recalculent pas. Chaque bot reçoit sa propre copie,
+         puisqu'il y ajoute les murs qu'il découvre.
+    (en) Keeps the geometry and path tables of the last maps, so that several bots of the same process
+         (or a reconnection) do not compute them again. Every bot gets its own copy, since it adds the
+         walls it discovers to it.
+    """
+
+    def __init__(self, size: int = 4):
+        self.size = size
+        self._maps: 'OrderedDict[Hashable, CompiledMap]' = OrderedDict()
+
+    @staticmethod
+    def key(map_state: MapState) -> Hashable:
+        return (
+            tuple(tuple(row) for row in map_state.discrete_grid),
+            tuple((wall.collider_type, tuple((p.x, p.y) for p in wall.positions)) for wall in map_state.walls),
+        )
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._maps
+
+    def get(self, map_state: MapState) -> Optional[CompiledMap]:
+        key = self.key(map_state)
+        if key not in self._maps:
+            return None
+
+        self._maps.move_to_end(key)
+        return copy.deepcopy(self._maps[key])
+
+    def put(self, map_state: MapState, compiled: CompiledMap) -> None:
+        key = self.key(map_state)
+        self._maps[key] = compiled
+        self._maps.move_to_end(key)
+        while len(self._maps) > self.size:
+            self._maps.popitem(last=False)
+
+    def compile(self, map_state: MapState) -> CompiledMap:
+        compiled = self.get(map_state)
+        if compiled is None:
+            self.put(map_state, compile_map(map_state))
+            compiled = self.get(map_state)
+        return compiled
+
+
+MAP_CACHE = MapCache()
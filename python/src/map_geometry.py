@@ -0,0 +1,274 @@
+import json
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.consts import Consts
+from core.map_state import ColliderType, MapState
+
+
+MAP_WIDTH = Consts.Map.WIDTH * Consts.Map.CELL_WIDTH
+MAP_HEIGHT = Consts.Map.HEIGHT * Consts.Map.CELL_HEIGHT
+
+Segment = Tuple[float, float, float, float]
+
+
+def segment_distance_sq(ax: float, ay: float, bx: float, by: float,
+                        cx: float, cy: float, dx: float, dy: float) -> float:
+    """
+    (fr) Distance au carré entre les segments AB et CD (0 s'ils se croisent).
+    (en) Squared distance between segments AB and CD (0 when they cross).
+    """
+    abx, aby = bx - ax, by - ay
+    cdx, cdy = dx - cx, dy - cy
+
+    denom = abx * cdy - aby * cdx
+    if denom != 0.0:
+        acx, acy = cx - ax, cy - ay
+        t = (acx * cdy - acy * cdx) / denom
+        u = (acx * aby - acy * abx) / denom
+        if 0.0 <= t <= 1.0 and 0.0 <= u <= 1.0:
+            return 0.0
+
+    return min(
+        point_segment_distance_sq(ax, ay, cx, cy, dx, dy),
+        point_segment_distance_sq(bx, by, cx, cy, dx, dy),
+        point_segment_distance_sq(cx, cy, ax, ay, bx, by),
+        point_segment_distance_sq(dx, dy, ax, ay, bx, by),
+    )
+
+
+def point_segment_distance_sq(px: float, py: float, ax: float, ay: float, bx: float, by: float) -> float:
+    abx, aby = bx - ax, by - ay
+    length_sq = abx * abx + aby * aby
+    t = 0.0 if length_sq == 0.0 else max(0.0, min(1.0, ((px - ax) * abx + (py - ay) * aby) / length_sq))
+    ex, ey = ax + abx * t - px, ay + aby * t - py
+    return ex * ex + ey * ey
+
+
+def _point_segment_distance_sq(p: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    ab = b - a
+    length_sq = np.sum(ab * ab, axis=-1)
+    t = np.sum((p - a) * ab, axis=-1) / np.where(length_sq > 0, length_sq, 1.0)
+    t = np.clip(t, 0.0, 1.0)
+    e = a + ab * t[..., None] - p
+    return np.sum(e * e, axis=-1)
+
+
+def points_segments_distance_sq(points: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    (fr) Distances (..., N, S) entre chaque point (..., N, 2) et chaque segment (..., S, 2).
+    (en) Distances (..., N, S) between every point (..., N, 2) and every segment (..., S, 2).
+    """
+    return _point_segment_distance_sq(points[..., :, None, :], starts[..., None, :, :], ends[..., None, :, :])
+
+
+def segments_distance_sq(a: np.ndarray, b: np.ndarray, c: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """
+    (fr) Version vectorisée de `segment_distance_sq` sur des tableaux (N, 2).
+    (en) Vectorized `segment_distance_sq` over (N, 2) arrays.
+    """
+    ab = b - a
+    cd = d - c
+    ac = c - a
+
+    denom = ab[:, 0] * cd[:, 1] - ab[:, 1] * cd[:, 0]
+    safe = np.where(denom != 0.0, denom, 1.0)
+    t = (ac[:, 0] * cd[:, 1] - ac[:, 1] * cd[:, 0]) / safe
+    u = (ac[:, 0] * ab[:, 1] - ac[:, 1] * ab[:, 0]) / safe
+    crossing = (denom != 0.0) & (t >= 0.0) & (t <= 1.0) & (u >= 0.0) & (u <= 1.0)
+
+    dist = np.minimum(
+        np.minimum(_point_segment_distance_sq(a, c, d), _point_segment_distance_sq(b, c, d)),
+        np.minimum(_point_segment_distance_sq(c, a, b), _point_segment_distance_sq(d, a, b)),
+    )
+    return np.where(crossing, 0.0, dist)
+
+
+class MapGeometry:
+    """
+    (fr) Géométrie des murs compilée une seule fois à partir du `MapState`: les murs sont découpés en
+         segments, rangés dans des tableaux NumPy et indexés dans une grille uniforme de seaux (un seau
+         par cellule de la carte). Une requête ne teste que les segments des cellules traversées.
+    (en) Wall geometry compiled once from the `MapState`: walls are split into segments, stored in
+         NumPy arrays and indexed in a uniform grid of buckets (one bucket per map cell). A query only
+         tests the segments of the cells it goes through.
+
+    Attributes:
+        starts      (np.ndarray) : (S, 2) (fr) Le début de chaque segment. (en) The start of each segment.
+        ends        (np.ndarray) : (S, 2) (fr) La fin de chaque segment.   (en) The end of each segment.
+        wall_counts (np.ndarray) : (fr) Le `discrete_grid` du `MapState`.   (en) The `MapState` discrete grid.
+        margin      (float)      : (fr) Rayon maximal supporté par les requêtes.
+                                   (en) Largest radius supported by queries.
+    """
+
+    def __init__(self, margin: float = Consts.Player.SIZE,
+                 cell_size: float = Consts.Map.CELL_WIDTH,
+                 columns: int = Consts.Map.WIDTH, rows: int = Consts.Map.HEIGHT,
+                 borders: bool = True):
+        self.margin = margin
+        self.cell_size = cell_size
+        self.columns = columns
+        self.rows = rows
+        self.width = columns * cell_size
+        self.height = rows * cell_size
+
+        self.segments: List[Segment] = []
+        self.starts = np.empty((0, 2), dtype=np.float64)
+        self.ends = np.empty((0, 2), dtype=np.float64)
+        self.buckets: List[List[int]] = [[] for _ in range(columns * rows)]
+        self.wall_counts = np.zeros((rows, columns), dtype=np.int32)
+
+        if borders:
+            self.add_segments([
+                (0.0, 0.0, self.width, 0.0),
+                (0.0, self.height, self.width, self.height),
+                (0.0, 0.0, 0.0, self.height),
+                (self.width, 0.0, self.width, self.height),
+            ])
+
+    @classmethod
+    def from_map_state(cls, map_state: MapState, margin: float = Consts.Player.SIZE) -> 'MapGeometry':
+        geometry = cls(margin=margin)
+
+        segments = []
+        for wall in map_state.walls:
+            if wall.collider_type != ColliderType.Wall:
+                continue
+            for start, end in zip(wall.positions, wall.positions[1:]):
+                segments.append((start.x, start.y, end.x, end.y))
+        geometry.add_segments(segments)
+
+        if map_state.discrete_grid:
+            geometry.wall_counts = np.array(map_state.discrete_grid, dtype=np.int32)
+
+        return geometry
+
+    def add_segments(self, segments: Sequence[Segment]) -> None:
+        """
+        (fr) Ajoute des murs (x0, y0, x1, y1), par exemple ceux découverts pendant la partie.
+        (en) Adds walls (x0, y0, x1, y1), for instance the ones discovered during the game.
+        """
+        if not segments:
+            return
+
+        for segment in segments:
+            index = len(self.segments)
+            self.segments.append(tuple(map(float, segment)))
+            for cell in self._cells_in_box(*segment):
+                self.buckets[cell].append(index)
+
+        array = np.array(segments, dtype=np.float64).reshape(-1, 4)
+        self.starts = np.concatenate([self.starts, array[:, :2]])
+        self.ends = np.concatenate([self.ends, array[:, 2:]])
+
+    def has_segment(self, segment: Segment) -> bool:
+        x0, y0, x1, y1 = map(float, segment)
+        return (x0, y0, x1, y1) in self.segments or (x1, y1, x0, y0) in self.segments
+
+    def _cells_in_box(self, x0: float, y0: float, x1: float, y1: float) -> List[int]:
+        m = self.margin
+        first_col, last_col = self._column(min(x0, x1) - m), self._column(max(x0, x1) + m)
+        first_row, last_row = self._row(min(y0, y1) - m), self._row(max(y0, y1) + m)
+        return [
+            row * self.columns + col
+            for row in range(first_row, last_row + 1)
+            for col in range(first_col, last_col + 1)
+        ]
+
+    def _column(self, x: float) -> int:
+        return min(max(int(x // self.cell_size), 0), self.columns - 1)
+
+    def _row(self, y: float) -> int:
+        return min(max(int(y // self.cell_size), 0), self.rows - 1)
+
+    def cells_on_segment(self, x0: float, y0: float, x1: float, y1: float) -> List[int]:
+        """
+        (fr) Les cellules traversées par le segment, dans l'ordre (parcours de grille DDA).
+        (en) The cells crossed by the segment, in order (DDA grid traversal).
+        """
+        col, row = self._column(x0), self._row(y0)
+        end_col, end_row = self._column(x1), self._row(y1)
+        dx, dy = x1 - x0, y1 - y0
+
+        step_col = 1 if dx > 0 else -1
+        step_row = 1 if dy > 0 else -1
+        t_max_x = ((col + (dx > 0)) * self.cell_size - x0) / dx if dx != 0 else math.inf
+        t_max_y = ((row + (dy > 0)) * self.cell_size - y0) / dy if dy != 0 else math.inf
+        t_delta_x = self.cell_size / abs(dx) if dx != 0 else math.inf
+        t_delta_y = self.cell_size / abs(dy) if dy != 0 else math.inf
+
+        cells = [row * self.columns + col]
+        for _ in range(self.columns + self.rows):
+            if col == end_col and row == end_row:
+                break
+            if t_max_x < t_max_y:
+                col += step_col
+                t_max_x += t_delta_x
+            else:
+                row += step_row
+                t_max_y += t_delta_y
+            if not (0 <= col < self.columns and 0 <= row < self.rows):
+                break
+            cells.append(row * self.columns + col)
+
+        return cells
+
+    def candidates(self, x0: float, y0: float, x1: float, y1: float) -> List[int]:
+        """
+        (fr) Les indices des segments qui peuvent être à moins de `margin` du segment donné.
+        (en) The indices of the segments that may lie within `margin` of the given segment.
+        """
+        seen = set()
+        for cell in self.cells_on_segment(x0, y0, x1, y1):
+            seen.update(self.buckets[cell])
+        return list(seen)
+
+    def first_hit(self, x0: float, y0: float, x1: float, y1: float, radius: float = 0.0) -> Optional[int]:
+        """
+        (fr) L'indice d'un segment à moins de `radius` du trajet, ou None si le trajet est libre.
+        (en) The index of a segment within `radius` of the path, or None when the path is clear.
+        """
+        radius_sq = radius * radius
+        for index in self.candidates(x0, y0, x1, y1):
+            if segment_distance_sq(x0, y0, x1, y1, *self.segments[index]) <= radius_sq:
+                return index
+        return None
+
+    def line_of_sight(self, start: Tuple[float, float], end: Tuple[float, float], radius: float = 0.0) -> bool:
+        return self.first_hit(start[0], start[1], end[0], end[1], radius) is None
+
+    def intersects_many(self, starts: np.ndarray, ends: np.ndarray, radius: float = 0.0) -> np.ndarray:
+        """
+        (fr) Version par lots de `line_of_sight`: retourne un booléen (N,) vrai si le trajet i touche un mur.
+             Les paires (trajet, segment) candidates sont testées en une seule opération vectorisée.
+        (en) Batched `line_of_sight`: returns a (N,) boolean, true when path i hits a wall. Candidate
+             (path, segment) pairs are tested in a single vectorized operation.
+        """
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+
+        path_index = []
+        segment_index = []
+        for i, (x0, y0, x1, y1) in enumerate(np.hstack([starts, ends]).tolist()):
+            candidates = self.candidates(x0, y0, x1, y1)
+            path_index.extend([i] * len(candidates))
+            segment_index.extend(candidates)
+
+        hit = np.zeros(len(starts), dtype=bool)
+        if not path_index:
+            return hit
+
+        path_index = np.array(path_index, dtype=np.intp)
+        segment_index = np.array(segment_index, dtype=np.intp)
+        dist = segments_distance_sq(starts[path_index], ends[path_index],
+                                    self.starts[segment_index], self.ends[segment_index])
+        np.logical_or.at(hit, path_index, dist <= radius * radius)
+        return hit
+
+    def __str__(self) -> str:
+        return json.dumps({
+            'segments': [list(segment) for segment in self.segments],
+            'wall_counts': self.wall_counts.tolist(),
+        })
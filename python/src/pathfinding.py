@@ -0,0 +1,232 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.consts import Consts
+from src.map_geometry import MapGeometry
+from src.wall_belief import WallBelief
+
+
+Position = Tuple[float, float]
+
+NEIGHBOURS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+class Pathfinder:
+    """
+    (fr) Recherche de chemin sur la grille discrète de la carte (10x10 cellules). Au début de la partie,
+         on calcule la table des plus courts chemins entre toutes les paires de cellules (Floyd-Warshall)
+         et la cellule suivante sur chacun de ces chemins. Pendant un tick, une distance ou un prochain
+         point de passage se lit donc directement dans la table. Avec une `WallBelief`, le coût d'un
+         passage entre deux cellules est multiplié par `1 + wall_penalty * p`, p étant la probabilité
+         qu'un mur invisible le bloque.
+    (en) Pathfinding over the discrete map grid (10x10 cells). At the start of the game, we compute the
+         all-pairs shortest path table between cells (Floyd-Warshall) together with the next cell on
+         each of those paths. During a tick, a distance or the next waypoint is a table lookup. With a
+         `WallBelief`, the cost of a move between two cells is multiplied by `1 + wall_penalty * p`, p
+         being the probability that an invisible wall blocks it.
+
+    Attributes:
+        dist      (np.ndarray) : (N, N) (fr) Coût du chemin entre les centres des cellules (inf si inaccessible).
+                                        (en) Path cost between cell centers (inf when unreachable).
+        length    (np.ndarray) : (N, N) (fr) Longueur de ce même chemin, sans pénalité.
+                                        (en) Length of that same path, without penalty.
+        next_cell (np.ndarray) : (N, N) (fr) La cellule suivante de i vers j (-1 si inaccessible).
+                                        (en) The next cell from i toward j (-1 when unreachable).
+    """
+
+    def __init__(self, geometry: MapGeometry, clearance: float = Consts.Player.SIZE / 2,
+                 belief: Optional[WallBelief] = None, wall_penalty: float = 4.0):
+        self.geometry = geometry
+        self.clearance = clearance
+        self.belief = belief
+        self.wall_penalty = wall_penalty
+        self.version = 0
+        self.columns = geometry.columns
+        self.rows = geometry.rows
+        self.cell_size = geometry.cell_size
+
+        cells = np.arange(self.columns * self.rows)
+        self.centers = np.stack([
+            (cells % self.columns + 0.5) * self.cell_size,
+            (cells // self.columns + 0.5) * self.cell_size,
+        ], axis=1)
+
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """
+        (fr) Recalcule les tables, par exemple après la découverte d'un nouveau mur.
+        (en) Recomputes the tables, for instance after a new wall was discovered.
+        """
+        n = self.columns * self.rows
+        dist = np.full((n, n), np.inf)
+        length = np.full((n, n), np.inf)
+        next_cell = np.full((n, n), -1, dtype=np.int32)
+
+        np.fill_diagonal(dist, 0.0)
+        np.fill_diagonal(length, 0.0)
+        np.fill_diagonal(next_cell, np.arange(n, dtype=np.int32))
+
+        for cell, neighbour, cost, edge_length in self._edges():
+            dist[cell, neighbour] = cost
+            length[cell, neighbour] = edge_length
+            next_cell[cell, neighbour] = neighbour
+
+        for k in range(n):
+            via = dist[:, k, None] + dist[None, k, :]
+            better = via < dist
+            dist = np.where(better, via, dist)
+            length = np.where(better, length[:, k, None] + length[None, k, :], length)
+            next_cell = np.where(better, next_cell[:, k, None], next_cell)
+
+        self.dist = dist
+        self.length = length
+        self.next_cell = next_cell
+        self.version += 1
+        self._waypoints: Dict[Tuple[int, int], List[Position]] = {}
+
+    def _edges(self) -> List[Tuple[int, int, float, float]]:
+        open_moves = set()
+        edges = []
+
+        for dx, dy in NEIGHBOURS:
+            diagonal = dx != 0 and dy != 0
+            for row in range(self.rows):
+                for col in range(self.columns):
+                    n_col, n_row = col + dx, row + dy
+                    if not (0 <= n_col < self.columns and 0 <= n_row < self.rows):
+                        continue
+
+                    cell = row * self.columns + col
+                    neighbour = n_row * self.columns + n_col
+                    if diagonal and not ((cell, row * self.columns + n_col) in open_moves and
+                                         (cell, n_row * self.columns + col) in open_moves):
+                        continue
+
+                    radius = self.clearance if diagonal else 0.0
+                    if self.geometry.line_of_sight(self.centers[cell], self.centers[neighbour], radius):
+                        open_moves.add((cell, neighbour))
+                        length = self.cell_size * math.hypot(dx, dy)
+                        cost = length
+                        if self.belief is not None:
+                            cost *= 1.0 + self.wall_penalty * self.belief.probability_between(cell, neighbour)
+                        edges.append((cell, neighbour, cost, length))
+
+        return edges
+
+    def cell_of(self, pos: Position) -> int:
+        col = min(max(int(pos[0] // self.cell_size), 0), self.columns - 1)
+        row = min(max(int(pos[1] // self.cell_size), 0), self.rows - 1)
+        return row * self.columns + col
+
+    def cells_of(self, positions: np.ndarray) -> np.ndarray:
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        cols = np.clip((positions[:, 0] // self.cell_size).astype(np.intp), 0, self.columns - 1)
+        rows = np.clip((positions[:, 1] // self.cell_size).astype(np.intp), 0, self.rows - 1)
+        return rows * self.columns + cols
+
+    def distances(self, start: Position, targets: np.ndarray) -> np.ndarray:
+        """
+        (fr) La longueur approximative du chemin de `start` vers chaque cible, en une seule lecture
+             vectorisée de la table (inf si la cible est inaccessible).
+        (en) The approximate path length from `start` to every target, as a single vectorized table
+             lookup (inf when the target is unreachable).
+        """
+        targets = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+        start_cell = self.cell_of(start)
+        target_cells = self.cells_of(targets)
+
+        through_centers = (
+            np.hypot(*(self.centers[start_cell] - start))
+            + self.dist[start_cell, target_cells]
+            + np.hypot(*(targets - self.centers[target_cells]).T)
+        )
+        direct = np.hypot(*(targets - start).T)
+        return np.where(target_cells == start_cell, direct, through_centers)
+
+    def pairwise_distances(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """
+        (fr) Comme `distances`, pour chaque paire (source, cible). Retourne un tableau (S, T).
+        (en) Like `distances`, for every (source, target) pair. Returns a (S, T) array.
+        """
+        sources = np.asarray(sources, dtype=np.float64).reshape(-1, 2)
+        targets = np.asarray(targets, dtype=np.float64).reshape(-1, 2)
+        source_cells = self.cells_of(sources)
+        target_cells = self.cells_of(targets)
+
+        through_centers = (
+            np.hypot(*(sources - self.centers[source_cells]).T)[:, None]
+            + self.dist[source_cells[:, None], target_cells[None, :]]
+            + np.hypot(*(targets - self.centers[target_cells]).T)[None, :]
+        )
+        direct = np.hypot(sources[:, None, 0] - targets[None, :, 0], sources[:, None, 1] - targets[None, :, 1])
+        return np.where(source_cells[:, None] == target_cells[None, :], direct, through_centers)
+
+    def distance(self, start: Position, goal: Position) -> float:
+        return float(self.distances(start, np.array(goal))[0])
+
+    def cell_path(self, start_cell: int, goal_cell: int) -> List[int]:
+        if self.next_cell[start_cell, goal_cell] < 0:
+            return []
+
+        path = [start_cell]
+        while path[-1] != goal_cell:
+            path.append(int(self.next_cell[path[-1], goal_cell]))
+        return path
+
+    def _cell_waypoints(self, start_cell: int, goal_cell: int) -> List[Position]:
+        key = (start_cell, goal_cell)
+        if key not in self._waypoints:
+            centers = [tuple(self.centers[cell].tolist()) for cell in self.cell_path(start_cell, goal_cell)]
+            self._waypoints[key] = self.smooth(centers)[1:-1] if len(centers) > 2 else []
+        return self._waypoints[key]
+
+    def smooth(self, points: List[Position]) -> List[Position]:
+        """
+        (fr) Retire les points de passage inutiles: on garde le point le plus loin visible sans mur.
+        (en) Drops redundant waypoints: we keep the farthest point visible without hitting a wall.
+        """
+        if len(points) <= 2:
+            return list(points)
+
+        smoothed = [points[0]]
+        i = 0
+        while i < len(points) - 1:
+            j = len(points) - 1
+            while j > i + 1 and not self.geometry.line_of_sight(points[i], points[j], self.clearance):
+                j -= 1
+            smoothed.append(points[j])
+            i = j
+        return smoothed
+
+    def path(self, start: Position, goal: Position) -> List[Position]:
+        """
+        (fr) Les points de passage de `start` vers `goal` (sans `start`), vide si `goal` est inaccessible.
+        (en) The waypoints from `start` to `goal` (without `start`), empty when `goal` is unreachable.
+        """
+        start_cell, goal_cell = self.cell_of(start), self.cell_of(goal)
+        if not np.isfinite(self.dist[start_cell, goal_cell]):
+            return []
+
+        if self.geometry.line_of_sight(start, goal, self.clearance):
+            return [goal]
+
+        waypoints = self._cell_waypoints(start_cell, goal_cell)
+        if not waypoints:
+            return [goal]
+
+        if len(waypoints) > 1 and self.geometry.line_of_sight(start, waypoints[1], self.clearance):
+            waypoints = waypoints[1:]
+        elif not self.geometry.line_of_sight(start, waypoints[0], self.clearance):
+            waypoints = [tuple(self.centers[start_cell].tolist())] + waypoints
+
+        if not self.geometry.line_of_sight(waypoints[-1], goal, self.clearance):
+            waypoints = waypoints + [tuple(self.centers[goal_cell].tolist())]
+
+        return waypoints + [goal]
+
+    def next_waypoint(self, start: Position, goal: Position) -> Optional[Position]:
+        path = self.path(start, goal)
+        return path[0] if path else None
@@ -0,0 +1,188 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.consts import Consts
+from core.game_arrays import GameStateArrays
+from src.pathfinding import Pathfinder
+
+
+Position = Tuple[float, float]
+
+UNREACHABLE = 1e6
+
+
+class RoutePlanner:
+    """
+    (fr) Planifie une tournée ordonnée sur les pièces présentes (et le trésor) selon les distances de
+         chemin du `Pathfinder`. La tournée est réparée à chaque tick: les pièces disparues sont retirées,
+         les nouvelles sont insérées au meilleur endroit, puis la tournée est améliorée (2-opt) tant
+         qu'il reste du temps dans le budget du tick.
+    (en) Plans an ordered tour over the current coins (and the treasure) using the `Pathfinder` path
+         distances. The tour is repaired on every tick: coins that disappeared are removed, new ones are
+         inserted at their cheapest position, then the tour is improved (2-opt) while the tick budget
+         allows it.
+
+    Attributes:
+        tour   (List[bytes]) : (fr) Les UUID bruts des pièces dans l'ordre de visite.
+                               (en) The raw coin UUIDs in visiting order.
+        budget (float)       : (fr) Le temps maximal d'une mise à jour, en secondes.
+                               (en) The maximum time of an update, in seconds.
+    """
+
+    def __init__(self, pathfinder: Pathfinder, budget: float = 0.005):
+        self.pathfinder = pathfinder
+        self.budget = budget
+        self.tour: List[bytes] = []
+
+        self._uids: List[bytes] = []
+        self._index: Dict[bytes, int] = {}
+        self._points = np.empty((0, 2), dtype=np.float64)
+        self._values = np.empty(0, dtype=np.int64)
+        self._matrix = np.empty((0, 0), dtype=np.float64)
+        self._version = pathfinder.version
+
+    def update(self, start: Position, coins: GameStateArrays, deadline: Optional[float] = None) -> Optional[int]:
+        """
+        (fr) Met la tournée à jour avec les pièces du tick et retourne l'indice (dans `coins`) de la prochaine
+             pièce à ramasser.
+        (en) Updates the tour with the coins of the tick and returns the index (in `coins`) of the next coin
+             to collect.
+
+        Arguments:
+            start    (Position)        : (fr) Notre position.
+                                         (en) Our position.
+            coins    (GameStateArrays) : (fr) Les tableaux du `GameState`.
+                                         (en) The `GameState` arrays.
+            deadline (float)           : (fr) Échéance `time.perf_counter()`, sinon `budget` à partir de maintenant.
+                                         (en) `time.perf_counter()` deadline, `budget` from now otherwise.
+        """
+        if deadline is None:
+            deadline = time.perf_counter() + self.budget
+
+        if self._version != self.pathfinder.version:
+            self._version = self.pathfinder.version
+            self._matrix = self._distances(self._points, self._points)
+
+        uids = [uid.tobytes() for uid in coins.coin_uid_bytes]
+        current = {uid: i for i, uid in enumerate(uids)}
+        self._remove([uid for uid in self._uids if uid not in current])
+        added = np.array([i for i, uid in enumerate(uids) if uid not in self._index], dtype=np.intp)
+        self._add([uids[i] for i in added], coins.coin_pos[added], coins.coin_value[added])
+
+        d_start = self._distances(np.array([start]), self._points)[0]
+        for i in added:
+            self._insert(uids[i], d_start)
+
+        self._improve(d_start, deadline)
+
+        return current[self.tour[0]] if self.tour else None
+
+    def _distances(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        if len(sources) == 0 or len(targets) == 0:
+            return np.empty((len(sources), len(targets)), dtype=np.float64)
+        return np.minimum(self.pathfinder.pairwise_distances(sources, targets), UNREACHABLE)
+
+    def _remove(self, uids: List[bytes]) -> None:
+        if not uids:
+            return
+
+        removed = set(uids)
+        keep = np.array([i for i, uid in enumerate(self._uids) if uid not in removed], dtype=np.intp)
+
+        self._uids = [self._uids[i] for i in keep]
+        self._index = {uid: i for i, uid in enumerate(self._uids)}
+        self._points = self._points[keep]
+        self._values = self._values[keep]
+        self._matrix = self._matrix[np.ix_(keep, keep)]
+        self.tour = [uid for uid in self.tour if uid not in removed]
+
+    def _add(self, uids: List[bytes], points: np.ndarray, values: np.ndarray) -> None:
+        if not uids:
+            return
+
+        old_to_new = self._distances(self._points, points)
+        new_to_old = self._distances(points, self._points)
+        new_to_new = self._distances(points, points)
+
+        self._matrix = np.block([[self._matrix, old_to_new], [new_to_old, new_to_new]])
+        self._points = np.concatenate([self._points, points])
+        self._values = np.concatenate([self._values, values])
+
+        for uid in uids:
+            self._index[uid] = len(self._uids)
+            self._uids.append(uid)
+
+    def _pinned(self) -> int:
+        """
+        The treasure is worth more than any tour, so it always stays first.
+        """
+        return int(bool(self.tour) and self._values[self._index[self.tour[0]]] >= Consts.Treasure.VALUE)
+
+    def _insert(self, uid: bytes, d_start: np.ndarray) -> None:
+        k = self._index[uid]
+        if self._values[k] >= Consts.Treasure.VALUE:
+            self.tour.insert(0, uid)
+            return
+
+        if not self.tour:
+            self.tour.append(uid)
+            return
+
+        tour = np.array([self._index[t] for t in self.tour], dtype=np.intp)
+        prev_to_k = np.concatenate([[d_start[k]], self._matrix[tour, k]])
+        k_to_next = np.concatenate([self._matrix[k, tour], [0.0]])
+        prev_to_next = np.concatenate([[d_start[tour[0]]], self._matrix[tour[:-1], tour[1:]], [0.0]])
+
+        cost = prev_to_k + k_to_next - prev_to_next
+        cost[:self._pinned()] = np.inf
+        self.tour.insert(int(np.argmin(cost)), uid)
+
+    def _improve(self, d_start: np.ndarray, deadline: float) -> None:
+        n = len(self.tour)
+        if n < 2:
+            return
+
+        d = (self._matrix + self._matrix.T) / 2
+        tour = np.array([self._index[t] for t in self.tour], dtype=np.intp)
+        first = self._pinned()
+
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for i in range(first, n - 1):
+                js = np.arange(i + 1, n)
+                after = tour[np.minimum(js + 1, n - 1)]
+                has_after = js < n - 1
+
+                old_in = d_start[tour[i]] if i == 0 else d[tour[i - 1], tour[i]]
+                new_in = d_start[tour[js]] if i == 0 else d[tour[i - 1], tour[js]]
+                old_out = np.where(has_after, d[tour[js], after], 0.0)
+                new_out = np.where(has_after, d[tour[i], after], 0.0)
+
+                delta = new_in + new_out - old_in - old_out
+                best = int(np.argmin(delta))
+                if delta[best] < -1e-9:
+                    j = js[best]
+                    tour[i:j + 1] = tour[i:j + 1][::-1].copy()
+                    improved = True
+
+                if time.perf_counter() >= deadline:
+                    break
+
+        self.tour = [self._uids[k] for k in tour]
+
+    def upcoming(self, count: int = 2) -> List[Position]:
+        """
+        (fr) Les positions des `count` prochaines pièces de la tournée.
+        (en) The positions of the next `count` coins of the tour.
+        """
+        return [tuple(self._points[self._index[uid]].tolist()) for uid in self.tour[:count]]
+
+    def tour_length(self, start: Position) -> float:
+        if not self.tour:
+            return 0.0
+        tour = np.array([self._index[t] for t in self.tour], dtype=np.intp)
+        d_start = self._distances(np.array([start]), self._points[tour[:1]])[0, 0]
+        return float(d_start + self._matrix[tour[:-1], tour[1:]].sum())
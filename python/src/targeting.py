@@ -0,0 +1,190 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from core.consts import Consts
+from core.game_arrays import GameStateArrays
+from src.map_geometry import MapGeometry
+
+
+Position = Tuple[float, float]
+
+HIT_RADIUS = (Consts.Player.SIZE + Consts.Projectile.SIZE) / 2
+
+
+class VelocityTracker:
+    """
+    (fr) Garde les dernières positions de chaque joueur dans des tampons circulaires (un par joueur,
+         tous dans le même tableau) et en déduit leur vitesse et l'incertitude sur cette vitesse.
+    (en) Keeps the last positions of every player in ring buffers (one per player, all in the same
+         array) and derives their velocity and how uncertain that velocity is.
+    """
+
+    def __init__(self, history: int = 6, capacity: int = 32):
+        self.history = history
+        self._rows: Dict[str, int] = {}
+        self._pos = np.zeros((capacity, history, 2), dtype=np.float64)
+        self._ticks = np.full((capacity, history), -1, dtype=np.int64)
+        self._head = np.zeros(capacity, dtype=np.intp)
+
+    def rows(self, arrays: GameStateArrays) -> np.ndarray:
+        for name in arrays.player_names:
+            if name not in self._rows:
+                self._rows[name] = len(self._rows)
+                if len(self._rows) > len(self._pos):
+                    self._grow()
+        return np.array([self._rows[name] for name in arrays.player_names], dtype=np.intp)
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._pos)
+        self._pos = np.concatenate([self._pos, np.zeros_like(self._pos)])
+        self._ticks = np.concatenate([self._ticks, np.full_like(self._ticks, -1)])
+        self._head = np.concatenate([self._head, np.zeros(capacity - len(self._head), dtype=np.intp)])
+
+    def observe(self, arrays: GameStateArrays) -> None:
+        rows = self.rows(arrays)
+        if len(rows) == 0:
+            return
+
+        alive = arrays.player_health > 0
+        rows = rows[alive]
+        self._head[rows] = (self._head[rows] + 1) % self.history
+        self._pos[rows, self._head[rows]] = arrays.player_pos[alive]
+        self._ticks[rows, self._head[rows]] = arrays.current_tick
+
+    def velocities(self, arrays: GameStateArrays) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (fr) Retourne la vitesse (P, 2) de chaque joueur, en unités par seconde, et l'écart-type (P,)
+             des vitesses mesurées entre deux ticks.
+        (en) Returns the velocity (P, 2) of every player, in units per second, and the standard
+             deviation (P,) of the velocities measured between two ticks.
+        """
+        rows = self.rows(arrays)
+        order = (self._head[rows, None] - np.arange(self.history)[None, :]) % self.history
+        pos = self._pos[rows[:, None], order]
+        ticks = self._ticks[rows[:, None], order]
+
+        dt = (ticks[:, :-1] - ticks[:, 1:]) * Consts.Game.TICK_DURATION
+        valid = (ticks[:, 1:] >= 0) & (dt > 0)
+        steps = (pos[:, :-1] - pos[:, 1:]) / np.where(valid, dt, 1.0)[..., None]
+        steps[~valid] = 0.0
+
+        count = np.maximum(valid.sum(axis=1), 1)
+        velocity = steps.sum(axis=1) / count[:, None]
+        spread = np.sqrt(np.sum((steps - velocity[:, None, :]) ** 2 * valid[..., None], axis=(1, 2)) / count)
+        spread[valid.sum(axis=1) == 0] = Consts.Player.SPEED
+        return velocity, spread
+
+
+@dataclass
+class TargetChoice:
+    """
+    (fr) La cible retenue: l'indice du joueur, le point visé et la probabilité estimée de toucher.
+    (en) The chosen target: the player index, the aim point and the estimated hit probability.
+    """
+    index: int
+    aim: Position
+    probability: float
+
+
+class Targeting:
+    """
+    (fr) Visée avec anticipation: on résout l'équation d'interception pour tous les ennemis à la fois,
+         on vérifie la ligne de tir contre l'index des murs et on choisit la cible avec la meilleure
+         probabilité de toucher plutôt que la plus proche.
+    (en) Lead targeting: solves the intercept equation for every enemy at once, checks the line of fire
+         against the wall index and picks the target with the best hit probability rather than the
+         closest one.
+    """
+
+    def __init__(self, geometry: Optional[MapGeometry] = None, min_probability: float = 0.05,
+                 base_error: float = 0.2, maneuver: float = 0.3):
+        self.geometry = geometry
+        self.tracker = VelocityTracker()
+        self.min_probability = min_probability
+        self.base_error = base_error
+        self.maneuver = maneuver
+
+    def observe(self, arrays: GameStateArrays) -> None:
+        self.tracker.observe(arrays)
+
+    def estimated_velocities(self, arrays: GameStateArrays) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (fr) La vitesse mesurée, orientée vers `dest` quand le joueur en a une, son incertitude et le
+             temps avant que le joueur n'arrive à `dest`.
+        (en) The measured velocity, pointed toward `dest` when the player has one, its uncertainty and
+             the time before the player reaches `dest`.
+        """
+        measured, spread = self.tracker.velocities(arrays)
+        to_dest = arrays.player_dest - arrays.player_pos
+        distance = np.hypot(to_dest[:, 0], to_dest[:, 1])
+        has_dest = (distance > 1e-6) & np.any(arrays.player_dest != 0.0, axis=1)
+
+        speed = np.minimum(np.hypot(measured[:, 0], measured[:, 1]), Consts.Player.SPEED)
+        heading = to_dest / np.where(distance > 0, distance, 1.0)[:, None]
+        velocity = np.where(has_dest[:, None], heading * speed[:, None], measured)
+
+        arrival = np.where(has_dest & (speed > 0), distance / np.where(speed > 0, speed, 1.0), np.inf)
+        return velocity, spread, arrival
+
+    def intercepts(self, shooter: np.ndarray, pos: np.ndarray, velocity: np.ndarray) -> np.ndarray:
+        """
+        (fr) Le plus petit temps t > 0 tel que |pos + velocity t - shooter| = SPEED t (inf sans solution).
+        (en) The smallest time t > 0 such that |pos + velocity t - shooter| = SPEED t (inf when none).
+        """
+        d = pos - shooter
+        a = np.sum(velocity * velocity, axis=1) - Consts.Projectile.SPEED ** 2
+        b = 2 * np.sum(velocity * d, axis=1)
+        c = np.sum(d * d, axis=1)
+
+        disc = b * b - 4 * a * c
+        root = np.sqrt(np.maximum(disc, 0.0))
+        safe_a = np.where(np.abs(a) > 1e-12, a, 1.0)
+        t1 = (-b - root) / (2 * safe_a)
+        t2 = (-b + root) / (2 * safe_a)
+        linear = np.where(np.abs(b) > 1e-12, -c / np.where(np.abs(b) > 1e-12, b, 1.0), np.inf)
+
+        t1 = np.where(t1 > 0, t1, np.inf)
+        t2 = np.where(t2 > 0, t2, np.inf)
+        t = np.where(np.abs(a) > 1e-12, np.minimum(t1, t2), np.where(linear > 0, linear, np.inf))
+        return np.where(disc >= 0, t, np.inf)
+
+    def choose(self, arrays: GameStateArrays, self_index: int,
+               priority: Optional[int] = None) -> Optional[TargetChoice]:
+        """
+        (fr) La meilleure cible, ou `priority` si on peut la toucher.
+        (en) The best target, or `priority` when it can be hit.
+        """
+        if len(arrays.player_names) < 2:
+            return None
+
+        shooter = arrays.player_pos[self_index]
+        velocity, spread, arrival = self.estimated_velocities(arrays)
+
+        t = self.intercepts(shooter, arrays.player_pos, velocity)
+        lead = np.minimum(np.where(np.isfinite(t), t, 0.0), arrival)
+        aim = arrays.player_pos + velocity * lead[:, None]
+
+        flight = np.hypot(*(aim - shooter).T) / Consts.Projectile.SPEED
+        error = self.base_error + (spread + self.maneuver) * flight
+        probability = 1.0 - np.exp(-HIT_RADIUS ** 2 / (2 * error ** 2))
+
+        probability[self_index] = 0.0
+        probability[arrays.player_health <= 0] = 0.0
+        probability[flight > Consts.Projectile.TTL] = 0.0
+
+        if self.geometry is not None:
+            candidates = np.nonzero(probability > 0)[0]
+            blocked = self.geometry.intersects_many(
+                np.broadcast_to(shooter, (len(candidates), 2)), aim[candidates], Consts.Projectile.SIZE / 2
+            )
+            probability[candidates[blocked]] = 0.0
+
+        best = int(np.argmax(probability))
+        if priority is not None and probability[priority] >= self.min_probability:
+            best = priority
+        if probability[best] < self.min_probability:
+            return None
+
+        return TargetChoice(best, tuple(aim[best].tolist()), float(probability[best]))
@@ -0,0 +1,158 @@
+import math
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Tuple
+
+import numpy as np
+
+from core.consts import Consts
+from core.game_arrays import GameStateArrays
+from src.pathfinding import Pathfinder
+
+
+Position = Tuple[float, float]
+
+
+class TreasureMode(Enum):
+    Race = "race"
+    Ambush = "ambush"
+
+
+@dataclass
+class TreasurePlan:
+    """
+    (fr) Ce qu'on fait pour le trésor pendant ce tick.
+    (en) What we do about the treasure during this tick.
+
+    Attributes:
+        mode     (TreasureMode)  : (fr) Course vers le trésor, ou embuscade sur le chemin d'un ennemi.
+                                   (en) Race to the treasure, or ambush on the path of an enemy.
+        dest     (Position)      : (fr) Le prochain point de passage.
+                                   (en) The next waypoint.
+        treasure (Position)      : (fr) La position du trésor.
+                                   (en) The position of the treasure.
+        margin   (float)         : (fr) L'avance (s) sur le premier ennemi, négative s'il arrive avant nous.
+                                   (en) Our lead (s) over the first enemy, negative when it arrives first.
+        rival    (Optional[int]) : (fr) L'indice de l'ennemi le plus rapide au trésor, à viser en priorité.
+                                   (en) The index of the enemy fastest to the treasure, to aim at first.
+    """
+    mode: TreasureMode
+    dest: Position
+    treasure: Position
+    margin: float
+    rival: Optional[int] = None
+
+
+class TreasurePlanner:
+    """
+    (fr) Planification de la phase du trésor. Dès que le trésor apparaît (une pièce de valeur
+         `Consts.Treasure.VALUE`), on calcule un champ de distances de chaque cellule vers lui à partir de
+         la table du `Pathfinder`; il n'est recalculé que si le trésor bouge ou si les tables changent.
+         Le temps d'arrivée de chaque joueur est alors une lecture du champ. Si on arrive au plus
+         `tolerance` secondes après le premier ennemi, on fait la course; sinon on se place sur son
+         chemin, là où on a le plus d'avance sur lui, pour le tirer de face avant qu'il n'atteigne le
+         trésor.
+    (en) Planning for the treasure phase. As soon as the treasure appears (a coin worth
+         `Consts.Treasure.VALUE`), a distance field from every cell to it is computed from the
+         `Pathfinder` table; it is only recomputed when the treasure moves or the tables change. The
+         arrival time of every player is then a lookup in the field. When we arrive at most `tolerance`
+         seconds after the first enemy, we race; otherwise we stand on its path, where our lead over it
+         is the largest, to shoot it head-on before it reaches the treasure.
+    """
+
+    def __init__(self, pathfinder: Pathfinder, tolerance: float = 1.0, sample_step: float = 1.0):
+        self.pathfinder = pathfinder
+        self.tolerance = tolerance
+        self.sample_step = sample_step
+        self.treasure: Optional[Position] = None
+        self.field: Optional[np.ndarray] = None
+        self.field_version = None
+
+    @staticmethod
+    def find(arrays: GameStateArrays) -> Optional[Position]:
+        treasures = np.nonzero(arrays.coin_value >= Consts.Treasure.VALUE)[0]
+        if len(treasures) == 0:
+            return None
+        return tuple(arrays.coin_pos[treasures[0]].tolist())
+
+    def distance_field(self, treasure: Position) -> np.ndarray:
+        """
+        (fr) La longueur du chemin de chaque centre de cellule jusqu'au trésor, en (N,).
+        (en) The path length from every cell center to the treasure, as (N,).
+        """
+        if treasure != self.treasure or self.pathfinder.version != self.field_version:
+            goal = self.pathfinder.cell_of(treasure)
+            last_leg = math.dist(self.pathfinder.centers[goal], treasure)
+            self.field = self.pathfinder.length[:, goal] + last_leg
+            self.field[goal] = 0.0
+            self.treasure = treasure
+            self.field_version = self.pathfinder.version
+        return self.field
+
+    def arrival_times(self, positions: np.ndarray, treasure: Position) -> np.ndarray:
+        """
+        (fr) Le temps (s) que met chaque position pour atteindre le trésor à pleine vitesse.
+        (en) The time (s) each position takes to reach the treasure at full speed.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        field = self.distance_field(treasure)
+        cells = self.pathfinder.cells_of(positions)
+        goal = self.pathfinder.cell_of(treasure)
+
+        through_center = np.hypot(*(positions - self.pathfinder.centers[cells]).T) + field[cells]
+        direct = np.hypot(*(positions - treasure).T)
+        distance = np.where(cells == goal, direct, through_center)
+        return distance / Consts.Player.SPEED
+
+    def plan(self, arrays: GameStateArrays, self_index: int) -> Optional[TreasurePlan]:
+        """
+        (fr) Le plan pour ce tick, None s'il n'y a pas de trésor.
+        (en) The plan for this tick, None when there is no treasure.
+        """
+        treasure = self.find(arrays)
+        if treasure is None:
+            return None
+
+        times = self.arrival_times(arrays.player_pos, treasure)
+        enemies = np.ones(len(times), dtype=bool)
+        enemies[self_index] = False
+        enemies &= arrays.player_health > 0
+
+        pos = tuple(arrays.player_pos[self_index].tolist())
+        race = self.pathfinder.next_waypoint(pos, treasure) or treasure
+        if not enemies.any():
+            return TreasurePlan(TreasureMode.Race, race, treasure, math.inf)
+
+        rival = int(np.argmin(np.where(enemies, times, np.inf)))
+        margin = float(times[rival] - times[self_index])
+        if margin >= -self.tolerance:
+            return TreasurePlan(TreasureMode.Race, race, treasure, margin, rival)
+
+        ambush = self.ambush_point(pos, tuple(arrays.player_pos[rival].tolist()), treasure)
+        if ambush is None:
+            return TreasurePlan(TreasureMode.Race, race, treasure, margin, rival)
+
+        dest = self.pathfinder.next_waypoint(pos, ambush) or ambush
+        return TreasurePlan(TreasureMode.Ambush, dest, treasure, margin, rival)
+
+    def ambush_point(self, pos: Position, rival: Position, treasure: Position) -> Optional[Position]:
+        """
+        (fr) Le point du chemin de l'ennemi vers le trésor où on arrive avec le plus d'avance sur lui,
+             None si on n'arrive avant lui nulle part.
+        (en) The point of the enemy's path to the treasure where we arrive with the largest lead over it,
+             None when we arrive before it nowhere.
+        """
+        path = np.array([rival] + self.pathfinder.path(rival, treasure), dtype=np.float64)
+        if len(path) < 2:
+            return None
+
+        legs = np.hypot(*np.diff(path, axis=0).T)
+        along = np.concatenate([[0.0], np.cumsum(legs)])
+        samples = np.arange(0.0, along[-1], self.sample_step)
+        points = np.stack([np.interp(samples, along, path[:, 0]), np.interp(samples, along, path[:, 1])], axis=1)
+
+        lead = samples / Consts.Player.SPEED - self.pathfinder.distances(pos, points) / Consts.Player.SPEED
+        best = int(np.argmax(lead))
+        if lead[best] <= 0:
+            return None
+        return tuple(points[best].tolist())
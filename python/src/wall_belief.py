@@ -0,0 +1,426 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.consts import Consts
+from core.logger import get_logger
+from core.map_state import MapState
+from src.map_geometry import _point_segment_distance_sq
+
+
+log = get_logger("bot.map")
+
+Position = Tuple[float, float]
+Segment = Tuple[float, float, float, float]
+
+UNKNOWN = -1
+OPEN = 0
+WALL = 1
+
+BLOCK = 2
+
+PROJECTILE_RANGE = Consts.Projectile.SPEED * Consts.Projectile.TTL
+
+
+class WallBelief:
+    """
+    (fr) Croyance sur les murs invisibles, par arête de cellule. Les murs sont sur les arêtes de la grille
+         10x10: `(H + 1) * W` arêtes horizontales puis `(W + 1) * H` verticales, rangées dans des tableaux
+         plats. Chaque arête est inconnue, ouverte ou un mur (`state`) et a une probabilité d'être un mur
+         (`probability`). Les bords de la carte sont des murs.
+
+         Chaque valeur du `discrete_grid` compte les murs des 12 arêtes d'un bloc de 2x2 cellules (bords
+         compris): ce sont des contraintes dures. On en déduit d'abord les arêtes forcées (il ne reste
+         plus de murs à placer dans un bloc, ou il en reste autant que d'arêtes inconnues), puis on ajuste
+         les probabilités des autres pour que chaque bloc ait le bon nombre de murs espéré, à partir des
+         indices recueillis (log-cotes par arête). Les indices sont des traversées (arêtes ouvertes), des
+         blocages du joueur et des projectiles arrêtés avant leur portée.
+
+         `update` recalcule les probabilités après des indices, en partant de la solution précédente.
+         Les requêtes (`probability_between`, `crossing`) sont des lectures de tableau en O(1).
+    (en) Belief over the invisible walls, per cell edge. Walls lie on the edges of the 10x10 grid:
+         `(H + 1) * W` horizontal edges then `(W + 1) * H` vertical ones, stored in flat arrays. Every edge
+         is unknown, open or a wall (`state`) and has a probability to be a wall (`probability`). The map
+         borders are walls.
+
+         Every value of the `discrete_grid` counts the walls on the 12 edges of a 2x2 block of cells
+         (borders included): these are hard constraints. The forced edges are deduced first (no walls
+         left to place in a block, or as many as unknown edges), then the probabilities of the others are
+         fitted so that every block has the right expected number of walls, starting from the gathered
+         evidence (log-odds per edge). The evidence comes from traversals (open edges), stalls of the
+         player and projectiles stopped before their range.
+
+         `update` recomputes the probabilities after new evidence, starting from the previous solution.
+         Queries (`probability_between`, `crossing`) are O(1) array lookups.
+    """
+
+    def __init__(self, discrete_grid: Optional[List[List[int]]] = None,
+                 columns: int = Consts.Map.WIDTH, rows: int = Consts.Map.HEIGHT,
+                 cell_size: float = Consts.Map.CELL_WIDTH, stall_odds: float = 8.0,
+                 projectile_odds: float = 30.0):
+        self.columns = columns
+        self.rows = rows
+        self.cell_size = cell_size
+        self.stall_odds = stall_odds
+        self.projectile_odds = projectile_odds
+
+        self.horizontal_count = (rows + 1) * columns
+        self.count = self.horizontal_count + (columns + 1) * rows
+
+        j, i = np.divmod(np.arange(self.horizontal_count), columns)
+        horizontal = np.stack([i, j, i + 1, j], axis=1)
+        i, j = np.divmod(np.arange(self.count - self.horizontal_count), rows)
+        vertical = np.stack([i, j, i, j + 1], axis=1)
+        self.segments = np.concatenate([horizontal, vertical]).astype(np.float64) * cell_size
+
+        self.border = np.zeros(self.count, dtype=bool)
+        self.border[self.border_edges()] = True
+        self.state = np.where(self.border, WALL, UNKNOWN).astype(np.int8)
+        self.evidence = np.zeros(self.count, dtype=np.float32)
+        self.probability = np.where(self.state == WALL, 1.0, 0.5).astype(np.float32)
+
+        self.block_edges = self._block_edges()
+        self.block_counts = np.full(len(self.block_edges), -1, dtype=np.int32)
+        self._scale = np.zeros(len(self.block_edges) + 1)
+        self._edge_blocks = self._edge_block_table()
+        self._cell_edges = self._cell_edge_table()
+
+        self.players: Dict[str, Position] = {}
+        self.projectiles: Dict[bytes, Tuple[Position, Position, Position]] = {}
+
+        self.version = 0
+        self.dirty = True
+        if discrete_grid:
+            self.set_counts(discrete_grid)
+        self.update()
+
+    @classmethod
+    def from_map_state(cls, map_state: MapState) -> 'WallBelief':
+        return cls(map_state.discrete_grid)
+
+    def horizontal(self, i: int, j: int) -> int:
+        """
+        (fr) L'arête y = j * CELL entre x = i * CELL et (i + 1) * CELL.
+        (en) The edge y = j * CELL between x = i * CELL and (i + 1) * CELL.
+        """
+        return j * self.columns + i
+
+    def vertical(self, i: int, j: int) -> int:
+        """
+        (fr) L'arête x = i * CELL entre y = j * CELL et (j + 1) * CELL.
+        (en) The edge x = i * CELL between y = j * CELL and (j + 1) * CELL.
+        """
+        return self.horizontal_count + i * self.rows + j
+
+    def border_edges(self) -> List[int]:
+        edges = []
+        for i in range(self.columns):
+            edges += [self.horizontal(i, 0), self.horizontal(i, self.rows)]
+        for j in range(self.rows):
+            edges += [self.vertical(0, j), self.vertical(self.columns, j)]
+        return edges
+
+    def _block_edges(self) -> np.ndarray:
+        blocks = []
+        for r in range(self.rows // BLOCK):
+            for c in range(self.columns // BLOCK):
+                x, y = c * BLOCK, r * BLOCK
+                blocks.append(
+                    [self.horizontal(x + di, y + dj) for dj in range(BLOCK + 1) for di in range(BLOCK)]
+                    + [self.vertical(x + di, y + dj) for di in range(BLOCK + 1) for dj in range(BLOCK)]
+                )
+        return np.array(blocks, dtype=np.intp)
+
+    def _edge_block_table(self) -> np.ndarray:
+        """
+        (fr) Les (au plus deux) blocs de chaque arête, le bloc fictif `len(blocks)` sinon.
+        (en) The (at most two) blocks of every edge, the dummy block `len(blocks)` otherwise.
+        """
+        table = np.full((self.count, 2), len(self.block_edges), dtype=np.intp)
+        filled = np.zeros(self.count, dtype=np.intp)
+        for block, edges in enumerate(self.block_edges):
+            for edge in edges:
+                table[edge, filled[edge]] = block
+                filled[edge] += 1
+        return table
+
+    def _cell_edge_table(self) -> np.ndarray:
+        """
+        (fr) Pour chaque cellule (`row * columns + col`), l'arête vers +x, -x, +y et -y.
+        (en) For every cell (`row * columns + col`), the edge toward +x, -x, +y and -y.
+        """
+        table = np.empty((self.rows * self.columns, 4), dtype=np.intp)
+        for row in range(self.rows):
+            for col in range(self.columns):
+                table[row * self.columns + col] = (
+                    self.vertical(col + 1, row), self.vertical(col, row),
+                    self.horizontal(col, row + 1), self.horizontal(col, row),
+                )
+        return table
+
+    def crossing(self, cell: int, neighbour: int) -> Optional[int]:
+        """
+        (fr) L'arête entre deux cellules voisines (sans diagonale), None sinon.
+        (en) The edge between two orthogonally adjacent cells, None otherwise.
+        """
+        row, col = divmod(cell, self.columns)
+        n_row, n_col = divmod(neighbour, self.columns)
+        direction = {(1, 0): 0, (-1, 0): 1, (0, 1): 2, (0, -1): 3}.get((n_col - col, n_row - row))
+        return None if direction is None else int(self._cell_edges[cell, direction])
+
+    def probability_between(self, cell: int, neighbour: int) -> float:
+        """
+        (fr) La probabilité qu'un mur bloque le passage entre deux cellules voisines. En diagonale, c'est
+             la plus forte des arêtes qui touchent le coin commun.
+        (en) The probability that a wall blocks the way between two neighbouring cells. Diagonally, it is
+             the highest of the edges touching the shared corner.
+        """
+        edge = self.crossing(cell, neighbour)
+        if edge is not None:
+            return float(self.probability[edge])
+
+        row, col = divmod(cell, self.columns)
+        n_row, n_col = divmod(neighbour, self.columns)
+        side_a, side_b = row * self.columns + n_col, n_row * self.columns + col
+        return max(self.probability_between(cell, side_a), self.probability_between(cell, side_b),
+                   self.probability_between(side_a, neighbour), self.probability_between(side_b, neighbour))
+
+    def walls(self, threshold: float = 0.95) -> List[Segment]:
+        """
+        (fr) Les arêtes intérieures qui sont des murs avec une probabilité d'au moins `threshold`.
+        (en) The inner edges that are walls with a probability of at least `threshold`.
+        """
+        walls = (self.probability >= threshold) & ~self.border
+        return [tuple(segment) for segment in self.segments[walls].tolist()]
+
+    @property
+    def unknown(self) -> np.ndarray:
+        return self.state == UNKNOWN
+
+    def set_counts(self, discrete_grid: List[List[int]]) -> None:
+        """
+        (fr) Les comptes de murs par bloc, ligne par ligne. Une grille qui n'a pas un compte par bloc est
+             ignorée: on continue sans ces contraintes.
+        (en) The wall counts per block, row by row. A grid that does not have one count per block is
+             ignored: we go on without these constraints.
+        """
+        counts = np.array(discrete_grid, dtype=np.int32)
+        if counts.shape != (self.rows // BLOCK, self.columns // BLOCK):
+            log.warning("Ignoring a discrete_grid of shape %s, expected %dx%d blocks", counts.shape,
+                        self.rows // BLOCK, self.columns // BLOCK)
+            counts = np.full(len(self.block_edges), -1, dtype=np.int32)
+        self.block_counts = counts.reshape(-1)
+        self.dirty = True
+
+    def set_state(self, edges: np.ndarray, state: int) -> bool:
+        """
+        (fr) Fixe l'état d'arêtes inconnues, retourne vrai si au moins une a changé.
+        (en) Sets the state of unknown edges, returns true when at least one changed.
+        """
+        edges = np.asarray(edges, dtype=np.intp)
+        edges = edges[self.state[edges] == UNKNOWN]
+        if len(edges) == 0:
+            return False
+        self.state[edges] = state
+        self.dirty = True
+        return True
+
+    def propagate(self) -> None:
+        """
+        (fr) Déduit les arêtes forcées par les comptes des blocs, jusqu'à ce que plus rien ne change.
+        (en) Deduces the edges forced by the block counts, until nothing changes.
+        """
+        constrained = self.block_counts >= 0
+        while True:
+            states = self.state[self.block_edges]
+            unknown = states == UNKNOWN
+            open_count = unknown.sum(axis=1)
+            remaining = self.block_counts - (states == WALL).sum(axis=1)
+
+            all_open = constrained & (open_count > 0) & (remaining <= 0)
+            all_walls = constrained & (open_count > 0) & (remaining >= open_count)
+            if not (all_open.any() or all_walls.any()):
+                return
+
+            self.state[self.block_edges[all_open][unknown[all_open]]] = OPEN
+            self.state[self.block_edges[all_walls][unknown[all_walls]]] = WALL
+
+    def update(self, iterations: int = 25) -> bool:
+        """
+        (fr) Recalcule les probabilités si des indices sont arrivés: propagation des contraintes puis, pour
+             les arêtes encore inconnues, log-cotes = indices + une correction par bloc, ajustée par Newton
+             pour que chaque bloc ait son nombre de murs en espérance. Retourne vrai si on a recalculé.
+        (en) Recomputes the probabilities when evidence arrived: constraint propagation then, for the
+             edges still unknown, log-odds = evidence + one correction per block, fitted with Newton steps
+             so that every block has its number of walls in expectation. Returns true when recomputed.
+        """
+        if not self.dirty:
+            return False
+
+        self.propagate()
+        unknown = self.state == UNKNOWN
+        constrained = np.append(self.block_counts >= 0, False)
+        states = self.state[self.block_edges]
+        remaining = self.block_counts - (states == WALL).sum(axis=1)
+        in_block = unknown[self.block_edges]
+
+        scale = self._scale
+        for _ in range(iterations):
+            logit = self.evidence + scale[self._edge_blocks].sum(axis=1)
+            p = np.where(unknown, 1.0 / (1.0 + np.exp(-logit)), self.state)
+            block_p = p[self.block_edges]
+            expected = np.where(in_block, block_p, 0.0).sum(axis=1)
+            slope = np.where(in_block, block_p * (1.0 - block_p), 0.0).sum(axis=1)
+            step = np.clip((remaining - expected) / np.maximum(slope, 1e-6), -2.0, 2.0)
+            scale[:-1] = np.where(constrained[:-1] & (in_block.sum(axis=1) > 0), scale[:-1] + step, scale[:-1])
+            if np.abs(remaining - expected)[constrained[:-1]].max(initial=0.0) < 1e-3:
+                break
+
+        logit = self.evidence + scale[self._edge_blocks].sum(axis=1)
+        self.probability = np.where(unknown, 1.0 / (1.0 + np.exp(-logit)), self.state).astype(np.float32)
+        self.dirty = False
+        self.version += 1
+        return True
+
+    def crossed_edges(self, start: Position, end: Position) -> np.ndarray:
+        """
+        (fr) Les arêtes que le segment `start` -> `end` traverse (en les coupant, pas en les longeant).
+        (en) The edges the `start` -> `end` segment crosses (cutting through, not running along them).
+        """
+        (x0, y0), (x1, y1) = start, end
+        edges = []
+        # (fr) Lignes x = k * CELL (arêtes verticales) puis y = k * CELL (horizontales)
+        # (en) Lines x = k * CELL (vertical edges) then y = k * CELL (horizontal ones)
+        for a0, a1, b0, b1, cells, index in (
+            (x0, x1, y0, y1, self.rows, self.vertical),
+            (y0, y1, x0, x1, self.columns, lambda k, cell: self.horizontal(cell, k)),
+        ):
+            for k in range(math.floor(min(a0, a1) / self.cell_size) + 1, math.ceil(max(a0, a1) / self.cell_size)):
+                t = (k * self.cell_size - a0) / (a1 - a0)
+                cell = math.floor((b0 + t * (b1 - b0)) / self.cell_size)
+                if 0 <= cell < cells:
+                    edges.append(index(k, cell))
+        return np.array(edges, dtype=np.intp)
+
+    def observe_traversal(self, start: Position, end: Position) -> bool:
+        """
+        (fr) Un objet est passé de `start` à `end`: les arêtes traversées sont ouvertes.
+        (en) An object went from `start` to `end`: the crossed edges are open.
+        """
+        return self.set_state(self.crossed_edges(start, end), OPEN)
+
+    def observe_stall(self, pos: Position, dest: Position, reach: float = Consts.Player.SIZE) -> bool:
+        """
+        (fr) Le joueur n'a pas bougé alors qu'il allait vers `dest`: une des arêtes inconnues à moins de
+             `reach` de `pos`, dans la direction du déplacement, est probablement un mur.
+        (en) The player did not move while going to `dest`: one of the unknown edges within `reach` of
+             `pos`, in the direction of the move, is probably a wall.
+        """
+        p = np.asarray(pos, dtype=np.float64)
+        direction = np.asarray(dest, dtype=np.float64) - p
+        if not np.any(direction):
+            return False
+
+        a, b = self.segments[:, :2], self.segments[:, 2:]
+        close = _point_segment_distance_sq(p, a, b) <= reach * reach
+        closest = np.clip(p, np.minimum(a, b), np.maximum(a, b))
+        ahead = (closest - p) @ direction > 0
+        candidates = np.nonzero(close & ahead & (self.state == UNKNOWN))[0]
+        if len(candidates) == 0:
+            return False
+
+        self.evidence[candidates] += math.log(self.stall_odds) / len(candidates)
+        self.dirty = True
+        return True
+
+    def observe_projectile_stop(self, pos: Position, direction: Position,
+                                reach: float = Consts.Projectile.SPEED * Consts.Game.TICK_DURATION
+                                + Consts.Projectile.SIZE) -> bool:
+        """
+        (fr) Un projectile vu en `pos` a disparu avant sa portée sans toucher de joueur: la première arête
+             non ouverte qu'il traverse dans `reach` est probablement un mur.
+        (en) A projectile seen at `pos` vanished before its range without hitting a player: the first
+             edge that is not open it crosses within `reach` is probably a wall.
+        """
+        d = np.asarray(direction, dtype=np.float64)
+        length = math.hypot(*d)
+        if length == 0:
+            return False
+
+        end = tuple((np.asarray(pos) + d / length * reach).tolist())
+        edges = self.crossed_edges(pos, end)
+        if len(edges) == 0:
+            return False
+
+        a, b = self.segments[edges, :2], self.segments[edges, 2:]
+        order = np.argsort(_point_segment_distance_sq(np.asarray(pos, dtype=np.float64), a, b))
+        for edge in edges[order]:
+            if self.state[edge] == OPEN:
+                continue
+            if self.state[edge] == UNKNOWN:
+                self.evidence[edge] += math.log(self.projectile_odds)
+                self.dirty = True
+                return True
+            return False
+        return False
+
+    def observe_players(self, names: List[str], player_pos: np.ndarray) -> bool:
+        """
+        (fr) Les déplacements de tous les joueurs d'un tick à l'autre ouvrent les arêtes qu'ils traversent
+             (sauf les sauts d'une réapparition).
+        (en) The moves of every player from one tick to the next open the edges they cross (except the
+             jumps of a respawn).
+        """
+        step = 2 * Consts.Player.SPEED * Consts.Game.TICK_DURATION
+        current = {name: (float(x), float(y)) for name, (x, y) in zip(names, player_pos.tolist())}
+
+        changed = False
+        for name, pos in current.items():
+            previous = self.players.get(name)
+            if previous is not None and previous != pos and math.dist(previous, pos) <= step:
+                changed |= self.observe_traversal(previous, pos)
+
+        self.players = current
+        return changed
+
+    def observe_projectiles(self, projectile_uid: np.ndarray, projectile_pos: np.ndarray,
+                            projectile_dest: np.ndarray, player_pos: np.ndarray) -> bool:
+        """
+        (fr) Suit les projectiles d'un tick à l'autre par leur uid: leurs déplacements ouvrent des arêtes,
+             et un projectile disparu loin de tout joueur, avant son point visé et avant le bout de sa
+             portée, a probablement heurté un mur. `dest` est le point visé: un tir visé au-delà de
+             `PROJECTILE_RANGE` disparaît au bout de sa portée, ce qui ne dit rien. La distance parcourue
+             est comptée depuis la première position vue, qui peut avoir un tick de vol de retard.
+        (en) Follows the projectiles from one tick to the next by their uid: their moves open edges, and
+             a projectile that vanished far from every player, short of its aimed point and of the end of
+             its range, probably hit a wall. `dest` is the aimed point: a shot aimed past
+             `PROJECTILE_RANGE` vanishes at the end of its range, which tells nothing. The distance
+             flown is counted from the first position seen, which can be one tick of flight late.
+        """
+        step = Consts.Projectile.SPEED * Consts.Game.TICK_DURATION
+        hit_reach = Consts.Player.SIZE + Consts.Projectile.SIZE + step
+
+        current = {}
+        changed = False
+        for uid, pos, dest in zip(projectile_uid, projectile_pos.tolist(), projectile_dest.tolist()):
+            uid, pos, dest = uid.tobytes(), tuple(pos), tuple(dest)
+            previous = self.projectiles.get(uid)
+            origin = pos
+            if previous is not None:
+                origin = previous[0]
+                if math.dist(previous[1], pos) <= 1.5 * step:
+                    changed |= self.observe_traversal(previous[1], pos)
+            current[uid] = (origin, pos, dest)
+
+        for uid, (origin, pos, dest) in self.projectiles.items():
+            if uid in current or math.dist(pos, dest) <= 1.5 * step:
+                continue
+            if math.dist(origin, pos) + 2.5 * step >= PROJECTILE_RANGE:
+                continue
+            if len(player_pos) and np.min(np.hypot(*(player_pos - pos).T)) <= hit_reach:
+                continue
+            changed |= self.observe_projectile_stop(pos, (dest[0] - pos[0], dest[1] - pos[1]))
+
+        self.projectiles = current
+        return changed
@@ -0,0 +1,80 @@
+import struct
+import zlib
+from typing import Optional
+
+import numpy as np
+
+from core.logger import get_logger
+from src.wall_belief import OPEN, WALL, WallBelief
+
+
+log = get_logger("bot.map")
+
+VERSION = 1
+
+HEADER = struct.Struct("<BI")
+CHECKSUM = struct.Struct("<I")
+
+
+def map_fingerprint(belief: WallBelief) -> int:
+    """
+    (fr) Une empreinte des comptes de murs de la carte, pour ne pas relire la sauvegarde d'une autre carte.
+    (en) A fingerprint of the map wall counts, so that the save of another map is not read back.
+    """
+    return zlib.crc32(belief.block_counts.astype('<i4').tobytes())
+
+
+def encode_walls(belief: WallBelief, threshold: float = 0.95) -> bytes:
+    """
+    (fr) Encode ce qu'on sait des arêtes intérieures de la carte: une version, l'empreinte de la carte,
+         un bit « connue » et un bit « mur » par arête, puis un CRC32 du tout. Les arêtes dont la
+         probabilité d'être un mur dépasse `threshold` comptent comme des murs connus. Pour une carte
+         10x10, cela fait 55 des 100 octets de `SaveAction`.
+    (en) Encodes what we know of the inner edges of the map: a version, the map fingerprint, a "known"
+         bit and a "wall" bit per edge, then a CRC32 of it all. The edges whose probability to be a wall
+         is above `threshold` count as known walls. For a 10x10 map, it takes 55 of the 100 bytes of
+         `SaveAction`.
+    """
+    inner = ~belief.border
+    walls = (belief.state == WALL) | (belief.probability >= threshold)
+    known = walls | (belief.state == OPEN)
+
+    data = HEADER.pack(VERSION, map_fingerprint(belief))
+    data += np.packbits(known[inner]).tobytes() + np.packbits(walls[inner]).tobytes()
+    return data + CHECKSUM.pack(zlib.crc32(data))
+
+
+def decode_walls(data: Optional[bytes], belief: WallBelief) -> bool:
+    """
+    (fr) Applique à `belief` les arêtes d'une sauvegarde de `encode_walls`. Retourne faux, sans rien
+         changer, si la sauvegarde est vide, corrompue, d'une autre version ou d'une autre carte.
+    (en) Applies the edges of an `encode_walls` save to `belief`. Returns false, changing nothing, when
+         the save is empty, corrupted, of another version or of another map.
+    """
+    inner = np.nonzero(~belief.border)[0]
+    bitmap = (len(inner) + 7) // 8
+    size = HEADER.size + 2 * bitmap + CHECKSUM.size
+
+    data = bytes(data or b'')
+    if len(data) < size or data[0] != VERSION:
+        return False
+
+    (checksum,) = CHECKSUM.unpack_from(data, size - CHECKSUM.size)
+    if checksum != zlib.crc32(data[:size - CHECKSUM.size]):
+        log.warning("Ignoring a corrupted wall save")
+        return False
+
+    _, fingerprint = HEADER.unpack_from(data)
+    if fingerprint != map_fingerprint(belief):
+        log.debug("Ignoring the wall save of another map")
+        return False
+
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8, count=2 * bitmap, offset=HEADER.size))
+    known = bits[:len(inner)].astype(bool)
+    walls = bits[bitmap * 8:bitmap * 8 + len(inner)].astype(bool)
+
+    belief.set_state(inner[known & walls], WALL)
+    belief.set_state(inner[known & ~walls], OPEN)
+    belief.update()
+    log.debug("Restored %d known edges from the save", int(known.sum()))
+    return True
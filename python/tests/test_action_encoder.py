@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from core.action import MoveAction, RotateBladeAction, SaveAction, ShootAction, SwitchWeaponAction
+from core.game_state import PlayerWeapon
+from network.action_encoder import ACTIONS_MESSAGE, ActionEncoder
+
+
+def json_dumps_message(actions) -> bytes:
+    """
+    The message as it was built before `ActionEncoder`: every `serialize()` merged with
+    `dict.update`, then `json.dumps`.
+    """
+    merged = {}
+    for action in actions:
+        merged.update(action.serialize())
+    return bytes([ACTIONS_MESSAGE]) + json.dumps(merged).encode('utf-8')
+
+
+CASES = [
+    [],
+    [MoveAction((1.5, 2.25))],
+    [MoveAction((10, 3))],
+    [ShootAction((0.1, 1e-05)), MoveAction((99.99, 0.0))],
+    [SwitchWeaponAction(PlayerWeapon.PlayerWeaponCanon), ShootAction((4.0, 5.0))],
+    [SwitchWeaponAction(PlayerWeapon.PlayerWeaponBlade), RotateBladeAction(3.141592653589793)],
+    [MoveAction((1.0, 1.0)), MoveAction((2.0, 2.0)), ShootAction((3.0, 3.0)), ShootAction((4.0, 4.0))],
+    [SaveAction(b"Hello World"), MoveAction((7.0, 8.0))],
+    [SaveAction(bytes(range(100)))],
+    [MoveAction((1.0, 2.0)), ShootAction((3.0, 4.0)), SwitchWeaponAction(PlayerWeapon.PlayerWeaponNone),
+     RotateBladeAction(-0.5), SaveAction(b"\x00\xff")],
+]
+
+
+@pytest.mark.parametrize("actions", CASES)
+def test_encode_matches_json_dumps(actions):
+    encoded = ActionEncoder().encode(actions)
+    expected = json_dumps_message(actions)
+
+    assert encoded[0] == expected[0] == ACTIONS_MESSAGE
+    assert json.loads(encoded[1:]) == json.loads(expected[1:])
+
+
+def test_integer_coordinates_are_written_as_floats():
+    encoded = ActionEncoder().encode([MoveAction((10, 3))])
+    assert json.loads(encoded[1:]) == {"dest": {"x": 10.0, "y": 3.0}}
+    assert b'"x":10.0' in encoded
+
+
+def test_reused_encoder_does_not_leak_previous_actions():
+    encoder = ActionEncoder()
+    encoder.encode([MoveAction((1.0, 1.0)), ShootAction((2.0, 2.0))])
+    assert json.loads(encoder.encode([SwitchWeaponAction(PlayerWeapon.PlayerWeaponCanon)])[1:]) == {"switch": 1}
+
+
+@pytest.mark.parametrize("value", [float('nan'), float('inf'), -float('inf')])
+def test_non_finite_actions_are_dropped(value):
+    encoded = ActionEncoder().encode([ShootAction((value, 1.0)), MoveAction((2.0, 3.0)), RotateBladeAction(value)])
+    assert json.loads(encoded[1:]) == {"dest": {"x": 2.0, "y": 3.0}}
@@ -0,0 +1,109 @@
+import random
+import uuid
+
+import numpy as np
+import pytest
+
+from server.maps import random_map
+from src.wall_belief import OPEN, UNKNOWN, WALL, WallBelief
+from tests.test_wall_codec import truth_of
+
+
+NO_PLAYERS = np.empty((0, 2))
+
+
+def uids(count: int) -> np.ndarray:
+    return np.frombuffer(b"".join(uuid.uuid4().bytes for _ in range(count)), dtype="V16")
+
+
+def fly(belief: WallBelief, uid: np.ndarray, path, dest) -> None:
+    """
+    Shows the projectile `uid` at every position of `path`, one tick each, then makes it vanish.
+    """
+    for pos in path:
+        belief.observe_projectiles(uid, np.array([pos], dtype=np.float64),
+                                   np.array([dest], dtype=np.float64), NO_PLAYERS)
+    belief.observe_projectiles(uid[:0], NO_PLAYERS, NO_PLAYERS, NO_PLAYERS)
+
+
+def test_stall_raises_the_edge_ahead():
+    belief = WallBelief()
+    edge = belief.vertical(2, 0)
+
+    assert belief.observe_stall((19.6, 5.0), (30.0, 5.0))
+    belief.update()
+    assert belief.probability[edge] > 0.5
+    assert belief.probability[belief.vertical(1, 0)] == pytest.approx(0.5)
+
+
+def test_traversal_opens_the_crossed_edges():
+    belief = WallBelief()
+
+    assert belief.observe_traversal((15.0, 5.0), (25.0, 12.0))
+    assert belief.state[belief.vertical(2, 0)] == OPEN
+    assert belief.state[belief.horizontal(2, 1)] == OPEN
+    assert not belief.observe_traversal((15.0, 5.0), (25.0, 12.0))
+
+
+def test_projectiles_with_the_same_dest_are_tracked_apart():
+    belief = WallBelief()
+    uid = uids(2)
+    dest = np.array([[40.0, 10.0], [40.0, 10.0]])
+
+    belief.observe_projectiles(uid, np.array([[19.5, 5.0], [19.5, 15.0]]), dest, NO_PLAYERS)
+    assert belief.observe_projectiles(uid, np.array([[20.4, 5.0], [20.4, 15.0]]), dest, NO_PLAYERS)
+    assert belief.state[belief.vertical(2, 0)] == OPEN
+    assert belief.state[belief.vertical(2, 1)] == OPEN
+
+
+def test_projectile_stopped_early_is_wall_evidence():
+    belief = WallBelief()
+    edge = belief.vertical(2, 0)
+
+    fly(belief, uids(1), [(17.0, 5.0), (17.9, 5.0), (18.8, 5.0), (19.5, 5.0)], (50.0, 5.0))
+    assert belief.evidence[edge] > 0
+    belief.update()
+    assert belief.probability[edge] > 0.9
+
+
+def test_projectile_vanishing_at_the_end_of_its_range_is_ignored():
+    belief = WallBelief()
+    path = [(6.0 + 0.9 * k, 5.0) for k in range(16)]
+    assert path[-1][0] == pytest.approx(19.5)
+
+    fly(belief, uids(1), path, (50.0, 5.0))
+    assert not belief.evidence.any()
+    assert belief.state[belief.vertical(1, 0)] == OPEN
+
+
+def test_projectile_vanishing_near_a_player_is_ignored():
+    belief = WallBelief()
+    uid = uids(1)
+    dest = np.array([[50.0, 5.0]])
+
+    belief.observe_projectiles(uid, np.array([[19.5, 5.0]]), dest, NO_PLAYERS)
+    belief.observe_projectiles(uid[:0], NO_PLAYERS, NO_PLAYERS, np.array([[20.5, 5.0]]))
+    assert not belief.evidence.any()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_counts_are_fitted_on_a_known_grid(seed):
+    map_state, walls = random_map(random.Random(seed))
+    belief = WallBelief.from_map_state(map_state)
+    truth = truth_of(belief, walls)
+
+    known = belief.state != UNKNOWN
+    assert np.array_equal(belief.state[known], truth[known])
+
+    expected = belief.probability[belief.block_edges].sum(axis=1)
+    assert expected == pytest.approx(belief.block_counts, abs=1e-2)
+
+
+def test_wrongly_shaped_grid_drops_the_counts():
+    belief = WallBelief([[1, 2], [3, 4]])
+
+    assert (belief.block_counts == -1).all()
+    inner = ~belief.border
+    assert (belief.state[inner] == UNKNOWN).all()
+    assert belief.probability[inner] == pytest.approx(0.5)
+    assert (belief.state[belief.border] == WALL).all()
@@ -0,0 +1,98 @@
+import random
+
+import numpy as np
+import pytest
+
+from server.maps import random_map
+from src.wall_belief import OPEN, UNKNOWN, WALL, WallBelief
+from src.wall_codec import decode_walls, encode_walls
+
+
+SAVE_SIZE = 100
+
+
+def truth_of(belief: WallBelief, walls) -> np.ndarray:
+    """
+    The true state (WALL or OPEN) of every edge of `belief` on a map with `walls`.
+    """
+    walls = {tuple(round(v, 6) for v in wall) for wall in walls}
+    walls |= {(x1, y1, x0, y0) for x0, y0, x1, y1 in walls}
+    return np.array([WALL if tuple(round(v, 6) for v in segment) in walls else OPEN
+                     for segment in belief.segments.tolist()], dtype=np.int8)
+
+
+def random_case(seed: int, known: float = 0.5):
+    """
+    A map, a belief on it that knows a random `known` share of its inner edges, and the truth.
+    """
+    rng = random.Random(seed)
+    map_state, walls = random_map(rng)
+    belief = WallBelief.from_map_state(map_state)
+    truth = truth_of(belief, walls)
+    assert (truth == WALL).sum() == len(walls)
+
+    inner = np.nonzero(~belief.border)[0]
+    picked = inner[np.array([rng.random() < known for _ in inner])]
+    belief.set_state(picked[truth[picked] == WALL], WALL)
+    belief.set_state(picked[truth[picked] == OPEN], OPEN)
+    belief.update()
+    return map_state, belief, truth
+
+
+def padded(data: bytes) -> bytearray:
+    assert len(data) <= SAVE_SIZE
+    return bytearray(data) + bytearray(SAVE_SIZE - len(data))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_round_trip_through_a_padded_save(seed):
+    map_state, belief, _ = random_case(seed)
+    data = encode_walls(belief)
+
+    restored = WallBelief.from_map_state(map_state)
+    assert decode_walls(padded(data), restored)
+
+    known = ~belief.border & (belief.state != UNKNOWN)
+    assert np.array_equal(restored.state[known], belief.state[known])
+    assert encode_walls(restored) == data
+
+
+def test_corrupted_save_is_ignored():
+    map_state, belief, _ = random_case(0)
+    data = bytearray(encode_walls(belief))
+    data[10] ^= 0x01
+
+    restored = WallBelief.from_map_state(map_state)
+    before = restored.state.copy()
+    assert not decode_walls(padded(bytes(data)), restored)
+    assert np.array_equal(restored.state, before)
+
+
+def test_save_of_another_map_is_ignored():
+    _, belief, _ = random_case(0)
+    other_map, _, _ = random_case(1)
+    assert other_map.discrete_grid != belief.block_counts.tolist()
+
+    restored = WallBelief.from_map_state(other_map)
+    before = restored.state.copy()
+    assert not decode_walls(padded(encode_walls(belief)), restored)
+    assert np.array_equal(restored.state, before)
+
+
+@pytest.mark.parametrize("data", [b'', bytes(SAVE_SIZE), None])
+def test_empty_save_is_ignored(data):
+    map_state, _, _ = random_case(0)
+    restored = WallBelief.from_map_state(map_state)
+    before = restored.state.copy()
+    assert not decode_walls(data, restored)
+    assert np.array_equal(restored.state, before)
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("known", [0.0, 0.3, 0.7])
+def test_propagation_never_contradicts_the_map(seed, known):
+    _, belief, truth = random_case(seed, known)
+
+    decided = belief.state != UNKNOWN
+    assert np.array_equal(belief.state[decided], truth[decided])
+    assert (belief.state[belief.border] == WALL).all()